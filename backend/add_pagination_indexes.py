@@ -0,0 +1,46 @@
+"""
+Migration script to add the composite indexes used by keyset (cursor) pagination.
+init_db only creates missing tables, so existing databases need this once.
+Works with both SQLite and MySQL (uses the configured DATABASE_URL).
+"""
+import asyncio
+
+from app.db.database import engine
+from app.models import User, Notification, Activity, LostItem, UserNotification
+from app.models.activity_registration import ActivityRegistration
+
+INDEX_NAMES = {
+    "ix_notifications_created",
+    "ix_notifications_creator_created",
+    "ix_activities_created",
+    "ix_activities_creator_created",
+    "ix_lost_items_review_created",
+    "ix_lost_items_creator_created",
+    "ix_users_created",
+    "ix_user_notifications_user_created",
+    "ix_activity_registrations_activity_created",
+}
+
+
+def create_indexes(conn):
+    for model in (Notification, Activity, LostItem, User, UserNotification, ActivityRegistration):
+        table = model.__table__
+        for index in table.indexes:
+            if index.name not in INDEX_NAMES:
+                continue
+            print(f"[*] Creating index {index.name} on {table.name}...")
+            index.create(conn, checkfirst=True)
+            print(f"[OK] Index {index.name} ready.")
+
+
+async def migrate():
+    print("[*] Connecting to database...")
+    async with engine.begin() as conn:
+        await conn.run_sync(create_indexes)
+    await engine.dispose()
+    print("\n[OK] Migration completed successfully!")
+    print("[INFO] You can now restart the backend server.")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
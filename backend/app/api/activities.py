@@ -1,15 +1,18 @@
 from typing import List, Optional, Annotated
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, status, Depends, Query, Body
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Body, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete as sql_delete
 
 from app.db.database import get_db
 from app.models.user import User
 from app.models.activity import Activity
-from app.models.user_notification import UserNotification
 from app.schemas.activity import ActivityCreate, ActivityUpdate, ActivityResponse
 from app.api.deps import get_current_user, get_current_admin
+from app.api.fanout import fanout_engine
+from app.api.feed_cache import feed_cache
+from app.api.activity_status import activity_scheduler
+from app.api.pagination import CursorParam, keyset_query, page_rows, set_next_cursor
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 CurrentAdmin = Annotated[User, Depends(get_current_admin)]
@@ -18,6 +21,18 @@ DatabaseSession = Annotated[AsyncSession, Depends(get_db)]
 router = APIRouter(prefix="/api/activities", tags=["Activities"])
 
 
+def activity_response(activity: Activity) -> ActivityResponse:
+    """Serialize an activity with its status derived from the current time.
+
+    The stored column is kept current by the status scheduler; computing it
+    here as well avoids showing a stale status between scheduler ticks
+    without turning reads into writes.
+    """
+    response = ActivityResponse.model_validate(activity)
+    response.status = activity.calculate_status()
+    return response
+
+
 @router.get("", response_model=List[ActivityResponse])
 async def get_activities(
     category: Optional[str] = Query(None, description="Filter by category"),
@@ -25,34 +40,35 @@ async def get_activities(
     created_by: Optional[int] = Query(None, description="Filter by user ID who created the activity"),
     skip: int = 0,
     limit: int = 100,
+    cursor: CursorParam = None,
+    response: Response = None,
     db: DatabaseSession = None,
 ):
-    """Get all activities (public access)."""
-    query = select(Activity).order_by(Activity.created_at.desc())
+    """Get all activities (public access).
+
+    Pass ``cursor`` to use keyset pagination; the next page's cursor is
+    returned in the X-Next-Cursor header.
+    """
+    query = select(Activity)
 
     if category:
         query = query.where(Activity.category == category)
     if status_filter:
-        query = query.where(Activity.status == status_filter)
+        query = query.where(Activity.status_expression(datetime.now()) == status_filter)
     if created_by is not None:
         query = query.where(Activity.created_by == created_by)
 
-    query = query.offset(skip).limit(limit)
+    if cursor is not None:
+        query = keyset_query(query, Activity.created_at, Activity.id, cursor, limit)
+    else:
+        query = query.order_by(Activity.created_at.desc(), Activity.id.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     activities = result.scalars().all()
+    if cursor is not None:
+        activities, next_cursor = page_rows(activities, limit)
+        set_next_cursor(response, next_cursor)
 
-    # Recalculate status for all activities to ensure they're up-to-date
-    status_updated = False
-    for activity in activities:
-        new_status = activity.calculate_status()
-        if activity.status != new_status:
-            activity.status = new_status
-            status_updated = True
-
-    if status_updated:
-        await db.commit()
-
-    return [ActivityResponse.model_validate(a) for a in activities]
+    return [activity_response(a) for a in activities]
 
 
 @router.get("/{activity_id}", response_model=ActivityResponse)
@@ -72,13 +88,7 @@ async def get_activity(
             detail="Activity not found"
         )
 
-    # Recalculate status to ensure it's up-to-date
-    new_status = activity.calculate_status()
-    if activity.status != new_status:
-        activity.status = new_status
-        await db.commit()
-
-    return ActivityResponse.model_validate(activity)
+    return activity_response(activity)
 
 
 @router.post("", response_model=ActivityResponse, status_code=status.HTTP_201_CREATED)
@@ -98,44 +108,24 @@ async def create_activity(
     new_activity.status = new_activity.calculate_status()
 
     db.add(new_activity)
+    await db.flush()
+    await activity_scheduler.schedule(db, new_activity)
     await db.commit()
+    await feed_cache.invalidate()
     await db.refresh(new_activity)
 
-    # Create user notifications for all active users
-    result = await db.execute(
-        select(User).where(User.is_active == True)
+    # 后台扇出用户通知，请求立即返回
+    job = fanout_engine.submit(
+        type="activity",
+        title=f"新活动发布：{new_activity.title}",
+        content=new_activity.description or f"快来报名参加{new_activity.title}！",
+        link_url=f"/activities/{new_activity.id}",
+        related_id=new_activity.id,
     )
-    users = result.scalars().all()
-
-    for user in users:
-        user_notification = UserNotification(
-            user_id=user.id,
-            type="activity",
-            title=f"新活动发布：{new_activity.title}",
-            content=new_activity.description or f"快来报名参加{new_activity.title}！",
-            link_url=f"/activities/{new_activity.id}",
-            is_read=False,
-            created_at=datetime.utcnow(),
-            related_id=new_activity.id,
-        )
-        db.add(user_notification)
-
-    await db.commit()
-
-    # WebSocket 广播推送
-    from app.api.ws import manager
-    for user in users:
-        await manager.send_to_user(user.id, {
-            "type": "new_notification",
-            "data": {
-                "type": "activity",
-                "title": f"新活动发布：{new_activity.title}",
-                "content": new_activity.description or f"快来报名参加{new_activity.title}！",
-                "link_url": f"/activities/{new_activity.id}",
-            },
-        })
 
-    return ActivityResponse.model_validate(new_activity)
+    response = ActivityResponse.model_validate(new_activity)
+    response.fanout_job_id = job.id
+    return response
 
 
 @router.delete("/{activity_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -162,9 +152,11 @@ async def delete_activity(
         sql_delete(ActivityRegistration).where(ActivityRegistration.activity_id == activity_id)
     )
 
-    # Then delete the activity
+    # Then delete the activity (and its pending status transition)
+    await activity_scheduler.unschedule(db, [activity_id])
     await db.delete(activity)
     await db.commit()
+    await feed_cache.invalidate()
 
 
 @router.patch("/{activity_id}", response_model=ActivityResponse)
@@ -198,8 +190,10 @@ async def update_activity(
     )
     if time_fields_updated:
         activity.status = activity.calculate_status()
+        await activity_scheduler.schedule(db, activity)
 
     await db.commit()
+    await feed_cache.invalidate()
     await db.refresh(activity)
 
     return ActivityResponse.model_validate(activity)
@@ -224,10 +218,12 @@ async def batch_delete_activities(
         sql_delete(ActivityRegistration).where(ActivityRegistration.activity_id.in_(activity_ids))
     )
 
-    # Then delete the activities
+    # Then delete the activities (and their pending status transitions)
+    await activity_scheduler.unschedule(db, activity_ids)
     await db.execute(
         sql_delete(Activity).where(Activity.id.in_(activity_ids))
     )
     await db.commit()
+    await feed_cache.invalidate()
 
     return {"deleted": len(activity_ids)}
@@ -17,6 +17,9 @@ from app.schemas.activity_registration import (
     RegistrationListResponse,
 )
 from app.api.deps import get_current_user, get_current_admin
+from app.api.pagination import CursorParam, keyset_query, page_rows
+from app.api.exports import ExportColumn, ExportFormat, export_response, format_datetime
+from app.api.export_jobs import ExportJobResponse, export_job_engine
 
 
 # Type aliases for this file
@@ -26,6 +29,47 @@ DatabaseSession = Annotated[AsyncSession, Depends(get_db)]
 
 router = APIRouter(prefix="/api/activities", tags=["Activity-Registrations"])
 
+
+def registration_report_query(activity_id: int, status_filter: Optional[str] = None):
+    """Select an activity's registrations joined with the registrant's account.
+
+    Each row carries the ``ActivityRegistration`` plus ``user_name`` and
+    ``user_email`` projected from ``users`` in the same statement (outer join,
+    so registrations of deleted accounts still appear with ``None``). Use it
+    for any registration report instead of looking users up per row.
+    """
+    query = (
+        select(
+            ActivityRegistration,
+            User.name.label("user_name"),
+            User.email.label("user_email"),
+        )
+        .outerjoin(User, User.id == ActivityRegistration.user_id)
+        .where(ActivityRegistration.activity_id == activity_id)
+    )
+    if status_filter:
+        query = query.where(ActivityRegistration.status == status_filter)
+    return query
+
+
+REGISTRATION_STATUS_LABELS = {
+    "confirmed": "已确认",
+    "cancelled": "已取消",
+    "attended": "已参加",
+}
+
+# Columns of the registration export; rows come from registration_report_query()
+REGISTRATION_EXPORT_COLUMNS = [
+    ExportColumn("姓名", lambda row: row.ActivityRegistration.name),
+    ExportColumn("学号", lambda row: row.ActivityRegistration.student_id),
+    ExportColumn("邮箱", lambda row: row.user_email or ""),
+    ExportColumn("联系电话", lambda row: row.ActivityRegistration.phone or ""),
+    ExportColumn("备注", lambda row: row.ActivityRegistration.remark or ""),
+    ExportColumn("状态", lambda row: REGISTRATION_STATUS_LABELS.get(row.ActivityRegistration.status, row.ActivityRegistration.status)),
+    ExportColumn("报名时间", lambda row: format_datetime(row.ActivityRegistration.created_at)),
+    ExportColumn("取消时间", lambda row: format_datetime(row.ActivityRegistration.cancelled_at)),
+]
+
 # IMPORTANT: my-registrations must be defined BEFORE {activity_id} routes
 @router.get("/my-registrations", response_model=List[ActivityRegistrationResponse])
 async def get_my_registrations(
@@ -142,10 +186,15 @@ async def get_activity_registrations(
     skip: int = 0,
     limit: int = 100,
     status_filter: Optional[str] = Query(None, description="Filter by status"),
+    cursor: CursorParam = None,
     current_admin: CurrentAdmin = None,
     db: DatabaseSession = None,
 ):
-    """Get all registrations for an activity (admin only)."""
+    """Get all registrations for an activity (admin only).
+
+    Pass ``cursor`` to use keyset pagination; ``next_cursor`` in the
+    response points at the next page.
+    """
     # Check if activity exists
     result = await db.execute(select(Activity).where(Activity.id == activity_id))
     activity = result.scalar_one_or_none()
@@ -156,11 +205,8 @@ async def get_activity_registrations(
             detail="Activity not found"
         )
 
-    # Build query
-    query = select(ActivityRegistration).where(ActivityRegistration.activity_id == activity_id)
-
-    if status_filter:
-        query = query.where(ActivityRegistration.status == status_filter)
+    # Build query (registrations joined with user name/email)
+    query = registration_report_query(activity_id, status_filter)
 
     # Get total count
     count_query = select(func.count(ActivityRegistration.id)).where(ActivityRegistration.activity_id == activity_id)
@@ -171,17 +217,22 @@ async def get_activity_registrations(
     total = count_result.scalar() or 0
 
     # Get registrations with user info
-    query = query.order_by(ActivityRegistration.created_at.desc()).offset(skip).limit(limit)
+    next_cursor = None
+    if cursor is not None:
+        query = keyset_query(query, ActivityRegistration.created_at, ActivityRegistration.id, cursor, limit)
+    else:
+        query = query.order_by(ActivityRegistration.created_at.desc(), ActivityRegistration.id.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
-    registrations = result.scalars().all()
+    rows = result.all()
+    if cursor is not None:
+        rows, next_cursor = page_rows(
+            rows, limit,
+            key=lambda row: (row.ActivityRegistration.created_at, row.ActivityRegistration.id),
+        )
 
     # Build response with user info
     registration_list = []
-    for reg in registrations:
-        # Get user info
-        user_result = await db.execute(select(User).where(User.id == reg.user_id))
-        user = user_result.scalar_one_or_none()
-
+    for reg, user_name, user_email in rows:
         reg_dict = {
             "id": reg.id,
             "activity_id": reg.activity_id,
@@ -193,15 +244,16 @@ async def get_activity_registrations(
             "status": reg.status,
             "created_at": reg.created_at,
             "cancelled_at": reg.cancelled_at,
-            "user_name": user.name if user else None,
-            "user_email": user.email if user else None,
+            "user_name": user_name,
+            "user_email": user_email,
         }
         registration_list.append(ActivityRegistrationResponse(**reg_dict))
 
     return RegistrationListResponse(
         registrations=registration_list,
         total=total,
-        activity_name=activity.title
+        activity_name=activity.title,
+        next_cursor=next_cursor,
     )
 
 
@@ -246,93 +298,36 @@ async def cancel_registration(
 async def export_activity_registrations(
     activity_id: int,
     status_filter: Optional[str] = Query(None, description="Filter by status"),
+    export_format: ExportFormat = "xlsx",
     current_admin: CurrentAdmin = None,
     db: DatabaseSession = None,
 ):
-    """Export activity registrations as Excel file (admin only)."""
-    try:
-        # Check if activity exists
-        result = await db.execute(select(Activity).where(Activity.id == activity_id))
-        activity = result.scalar_one_or_none()
+    """Export activity registrations as an Excel or CSV file (admin only).
 
-        if not activity:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Activity not found"
-            )
+    Rows are streamed from the database in chunks; see ``app.api.exports``.
+    """
+    # Check if activity exists
+    result = await db.execute(select(Activity).where(Activity.id == activity_id))
+    activity = result.scalar_one_or_none()
 
-        # Build query
-        query = select(ActivityRegistration).where(ActivityRegistration.activity_id == activity_id)
-
-        if status_filter:
-            query = query.where(ActivityRegistration.status == status_filter)
-
-        # Get registrations
-        query = query.order_by(ActivityRegistration.created_at.desc())
-        result = await db.execute(query)
-        registrations = result.scalars().all()
-
-        # Get user info for each registration
-        export_data = []
-        for reg in registrations:
-            user_result = await db.execute(select(User).where(User.id == reg.user_id))
-            user = user_result.scalar_one_or_none()
-
-            status_map = {
-                "confirmed": "已确认",
-                "cancelled": "已取消",
-                "attended": "已参加"
-            }
-
-            export_data.append({
-                "姓名": reg.name,
-                "学号": reg.student_id,
-                "邮箱": user.email if user else "",
-                "联系电话": reg.phone or "",
-                "备注": reg.remark or "",
-                "状态": status_map.get(reg.status, reg.status),
-                "报名时间": reg.created_at.strftime("%Y-%m-%d %H:%M:%S") if reg.created_at else "",
-                "取消时间": reg.cancelled_at.strftime("%Y-%m-%d %H:%M:%S") if reg.cancelled_at else "",
-            })
-
-        # Create Excel file using pandas
-        import pandas as pd
-        from io import BytesIO
-        from fastapi.responses import StreamingResponse
-
-        df = pd.DataFrame(export_data)
-
-        # Create Excel file
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Registrations')
-            # Auto-adjust column widths
-            worksheet = writer.sheets['Registrations']
-            for idx, col in enumerate(worksheet.columns, 1):
-                max_length = 0
-                column = col[0].column_letter
-                for cell in col:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column].width = adjusted_width
-
-        output.seek(0)
+    if not activity:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Activity not found"
+        )
+
+    try:
+        query = registration_report_query(activity_id, status_filter)
+        query = query.order_by(ActivityRegistration.created_at.desc(), ActivityRegistration.id.desc())
 
         # Create filename (use ASCII-safe filename)
         timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
-        filename = f"registrations_{activity_id}_{timestamp}.xlsx"
-
-        # Return file response
-        return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename=\"{filename}\""
-            }
+        return await export_response(
+            query,
+            REGISTRATION_EXPORT_COLUMNS,
+            export_format,
+            f"registrations_{activity_id}_{timestamp}",
+            sheet_name="Registrations",
         )
     except Exception as e:
         # Log error for debugging
@@ -343,3 +338,39 @@ async def export_activity_registrations(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Export failed: {str(e)}"
         )
+
+
+@router.post("/{activity_id}/registrations/export", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_registrations_export(
+    activity_id: int,
+    status_filter: Optional[str] = Query(None, description="Filter by status"),
+    export_format: ExportFormat = "xlsx",
+    current_admin: CurrentAdmin = None,
+    db: DatabaseSession = None,
+):
+    """Start a background registration export (admin only).
+
+    Poll ``/api/exports/{id}`` or wait for the ``export_ready`` WebSocket
+    event, then download from ``/api/exports/{id}/download``.
+    """
+    result = await db.execute(select(Activity.id).where(Activity.id == activity_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Activity not found"
+        )
+
+    query = registration_report_query(activity_id, status_filter)
+    query = query.order_by(ActivityRegistration.created_at.desc(), ActivityRegistration.id.desc())
+    timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+    job = export_job_engine.submit(
+        "registrations",
+        {"activity_id": activity_id, "status_filter": status_filter},
+        export_format,
+        query,
+        REGISTRATION_EXPORT_COLUMNS,
+        f"registrations_{activity_id}_{timestamp}",
+        requested_by=current_admin.id,
+        sheet_name="Registrations",
+    )
+    return job.to_response()
@@ -0,0 +1,260 @@
+"""活动状态调度。
+
+活动状态完全由时间字段决定，只会在 registration_start / registration_end / activity_start / activity_end
+这几个时刻发生变化。原实现在活动列表、详情和首页动态的 GET 请求中逐行重算状态并提交，
+读请求变成了写事务（SQLite 下还会争用写锁），status 过滤也基于可能已过期的列。这里改为：
+- 读接口不写库：status 过滤使用 Activity.status_expression（SQL CASE），返回的状态在内存中计算
+- 每个活动的下一个状态变化时刻保存在 activity_transitions 表中，ActivityStatusScheduler 用最小堆按时刻排队，
+  到点后更新一次活动的 status 列、使首页动态缓存失效，并通过 WebSocket 向已报名的用户推送 activity_status 消息
+- 多 worker 时各自排队，通过把 fire_at 从旧值改为下一时刻（乐观锁）认领，只有认领成功的 worker 更新和推送
+- 重启后从表中恢复队列，停机期间错过的时刻立即补发；其余活动的过期状态用一条 UPDATE 追平，
+  没有调度记录的活动（如升级前创建的）补建记录；每 MAX_SLEEP 秒重新加载一次，获取其他 worker 登记的时刻
+- 创建 / 修改活动时间后调用 schedule，删除活动时调用 unschedule
+"""
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import async_session_maker
+from app.models.activity import Activity
+from app.models.activity_registration import ActivityRegistration
+from app.models.activity_transition import ActivityTransition
+from app.api.feed_cache import feed_cache
+from app.api.ws import manager
+
+logger = logging.getLogger(__name__)
+
+_TIME_COLUMNS = (
+    Activity.registration_start,
+    Activity.registration_end,
+    Activity.activity_start,
+    Activity.activity_end,
+)
+# 单次等待的上限（秒），也是重新加载调度表的间隔
+MAX_SLEEP = 3600.0
+# 更新失败后的重试间隔（秒）
+RETRY_DELAY = 5.0
+
+
+async def refresh_statuses(db: AsyncSession, now: datetime, activity_ids: Optional[Iterable[int]] = None) -> int:
+    """把 status 列与时间字段对齐（一条 UPDATE，只改动已过期的行），返回更新的行数。"""
+    expression = Activity.status_expression(now)
+    statement = update(Activity).where(Activity.status != expression)
+    if activity_ids is not None:
+        statement = statement.where(Activity.id.in_(list(activity_ids)))
+    result = await db.execute(
+        statement.values(status=expression).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def push_status_change(db: AsyncSession, activity: Activity, previous_status: str):
+    """向已报名（未取消）的用户推送活动状态变化。"""
+    result = await db.execute(
+        select(ActivityRegistration.user_id)
+        .where(ActivityRegistration.activity_id == activity.id, ActivityRegistration.status != "cancelled")
+    )
+    await manager.send_to_users(result.scalars().all(), {
+        "type": "activity_status",
+        "data": {
+            "activity_id": activity.id,
+            "title": activity.title,
+            "status": activity.status,
+            "previous_status": previous_status,
+            "link_url": f"/activities/{activity.id}",
+        },
+    })
+
+
+class ActivityStatusScheduler:
+    """在活动的时间边界更新 activities.status 并推送状态变化。"""
+
+    def __init__(self, session_factory=async_session_maker):
+        self.session_factory = session_factory
+        # (fire_at, activity_id)；与 _planned 不一致的条目已过期，出堆时丢弃
+        self._heap: list[tuple[datetime, int]] = []
+        self._planned: dict[int, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._loaded_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._planned)
+
+    async def start(self):
+        if self._task is None:
+            await self.sync()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def schedule(self, db: AsyncSession, activity: Activity):
+        """活动创建或时间字段修改后，在同一事务中保存它的下一个状态变化时刻并登记（由调用方提交）。
+
+        事务回滚时登记的时刻到点后在表中找不到对应记录，不做任何事。
+        """
+        fire_at = activity.next_transition(datetime.now())
+        if fire_at is None:
+            await db.execute(delete(ActivityTransition).where(ActivityTransition.activity_id == activity.id))
+        else:
+            await db.merge(ActivityTransition(activity_id=activity.id, fire_at=fire_at))
+        self._plan(activity.id, fire_at)
+
+    async def unschedule(self, db: AsyncSession, activity_ids: Iterable[int]):
+        """删除活动前调用（与删除在同一事务中提交）。"""
+        activity_ids = list(activity_ids)
+        await db.execute(delete(ActivityTransition).where(ActivityTransition.activity_id.in_(activity_ids)))
+        for activity_id in activity_ids:
+            self._plan(activity_id, None)
+
+    async def load(self):
+        """把 activity_transitions 表中的时刻合并进队列。
+
+        查询期间 schedule 登记的时刻不会被覆盖：同一活动保留较早的时刻，
+        到点时 _fire 按表中的当前值处理或重新登记。
+        """
+        async with self.session_factory() as db:
+            result = await db.execute(select(ActivityTransition.activity_id, ActivityTransition.fire_at))
+            rows = result.all()
+        for activity_id, fire_at in rows:
+            planned = self._planned.get(activity_id)
+            if planned is None or fire_at < planned:
+                self._plan(activity_id, fire_at)
+        self._loaded_at = time.monotonic()
+
+    async def sync(self) -> int:
+        """启动时补发错过的状态变化、追平其余活动的状态并补建调度记录，返回更新的活动数。"""
+        await self.load()
+        changed = await self.fire_due()
+
+        now = datetime.now()
+        async with self.session_factory() as db:
+            updated = await refresh_statuses(db, now)
+            result = await db.execute(
+                select(Activity.id, *_TIME_COLUMNS)
+                .outerjoin(ActivityTransition, ActivityTransition.activity_id == Activity.id)
+                .where(ActivityTransition.activity_id.is_(None), or_(*(column > now for column in _TIME_COLUMNS)))
+            )
+            missing = [(row.id, Activity.next_transition(row, now)) for row in result.all()]
+            db.add_all([
+                ActivityTransition(activity_id=activity_id, fire_at=fire_at)
+                for activity_id, fire_at in missing if fire_at is not None
+            ])
+            try:
+                await db.commit()
+            except IntegrityError:
+                # 其他 worker 同时在补建
+                await db.rollback()
+        await self.load()
+
+        if updated:
+            await feed_cache.invalidate()
+        return changed + updated
+
+    async def fire_due(self) -> int:
+        """处理所有已到时刻的活动，返回状态发生变化的活动数。"""
+        now = datetime.now()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, activity_id = heapq.heappop(self._heap)
+            if self._planned.get(activity_id) == fire_at:
+                del self._planned[activity_id]
+                due.append(activity_id)
+
+        changed = 0
+        try:
+            for index, activity_id in enumerate(due):
+                try:
+                    changed += await self._fire(activity_id, now)
+                except Exception:
+                    # 未处理的稍后重试
+                    for remaining in due[index:]:
+                        self._plan(remaining, now)
+                    raise
+        finally:
+            if changed:
+                await feed_cache.invalidate()
+        return changed
+
+    async def _fire(self, activity_id: int, now: datetime) -> int:
+        async with self.session_factory() as db:
+            transition = await db.get(ActivityTransition, activity_id)
+            if transition is None:
+                # 活动已删除，或已没有后续状态变化
+                return 0
+            if transition.fire_at > now:
+                # 已被其他 worker 处理，或活动时间已修改
+                self._plan(activity_id, transition.fire_at)
+                return 0
+
+            activity = await db.get(Activity, activity_id)
+            next_fire = activity.next_transition(now) if activity is not None else None
+            claim = ActivityTransition.__table__
+            condition = (claim.c.activity_id == activity_id) & (claim.c.fire_at == transition.fire_at)
+            if next_fire is None:
+                statement = delete(claim).where(condition)
+            else:
+                statement = update(claim).where(condition).values(fire_at=next_fire)
+            if (await db.execute(statement)).rowcount == 0:
+                # 其他 worker 抢先认领
+                await db.rollback()
+                transition = await db.get(ActivityTransition, activity_id, populate_existing=True)
+                self._plan(activity_id, transition.fire_at if transition else None)
+                return 0
+
+            previous_status = activity.status if activity is not None else None
+            if activity is not None:
+                activity.status = activity.calculate_status()
+            await db.commit()
+            self._plan(activity_id, next_fire)
+
+            if activity is None or activity.status == previous_status:
+                return 0
+            await push_status_change(db, activity, previous_status)
+            return 1
+
+    def _plan(self, activity_id: int, fire_at: Optional[datetime]):
+        if fire_at is None:
+            self._planned.pop(activity_id, None)
+            return
+        if self._planned.get(activity_id) != fire_at:
+            self._planned[activity_id] = fire_at
+            heapq.heappush(self._heap, (fire_at, activity_id))
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            if time.monotonic() - self._loaded_at >= MAX_SLEEP:
+                try:
+                    await self.load()
+                except Exception as e:
+                    logger.error("Activity schedule reload failed: %s", e)
+            delay = (self._heap[0][0] - datetime.now()).total_seconds() if self._heap else MAX_SLEEP
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self.fire_due()
+            except Exception as e:
+                logger.error("Activity status update failed: %s", e)
+                await asyncio.sleep(RETRY_DELAY)
+
+
+# 模块级单例
+activity_scheduler = ActivityStatusScheduler()
@@ -2,11 +2,11 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.db.database import get_db
 from app.models.user import User
 from app.core.security import decode_access_token
+from app.api.principal_cache import principal_cache
 
 
 security = HTTPBearer()
@@ -27,15 +27,15 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user_id: int = payload.get("sub")
-    if user_id is None:
+    sub = payload.get("sub")
+    if sub is None or not str(sub).isdigit():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
         )
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    # Served from the principal cache when possible (no SELECT)
+    user = await principal_cache.load(db, int(sub))
 
     if user is None:
         raise HTTPException(
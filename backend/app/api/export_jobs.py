@@ -0,0 +1,284 @@
+"""后台导出任务。
+
+即使改为流式输出，大型导出（/api/users/export、/api/activities/{id}/registrations/export）
+仍会在整个下载期间占用一个 worker。本模块把导出改为后台任务：
+1. POST 导出接口登记任务并立即返回 job_id（202）
+2. 后台用 app.api.exports 把文件写入 EXPORT_DIR
+3. 完成后通过 WebSocket 向发起者推送 {"type": "export_ready"}，也可轮询 GET /api/exports/{job_id}
+4. 通过 GET /api/exports/{job_id}/download 从磁盘下载生成的文件
+
+EXPORT_REUSE_WINDOW 秒内相同的导出请求（类型、参数、格式都相同）复用同一个任务和文件，
+不重复生成；超过 EXPORT_RETENTION 秒的任务及其文件会被清理。
+任务状态保存在进程内存中（与扇出任务相同），多 worker 部署时需由同一 worker 查询。
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Annotated, Optional, Sequence
+
+from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.db.database import async_session_maker
+from app.models.user import User
+from app.api.deps import get_current_admin
+from app.api.exports import ExportColumn, MEDIA_TYPES, write_export
+from app.api.ws import manager
+
+logger = logging.getLogger(__name__)
+
+CurrentAdmin = Annotated[User, Depends(get_current_admin)]
+
+router = APIRouter(prefix="/api/exports", tags=["Exports"])
+
+# 内存中保留的任务数；超出时淘汰最早结束的任务，全部未结束时拒绝新的导出
+MAX_TRACKED_JOBS = 200
+# 引擎生成的文件名（<uuid4 hex>.<格式>）；清理遗留文件时只删除匹配的，导出目录中的其他文件不受影响
+ARTIFACT_NAME = re.compile(r"[0-9a-f]{32}\.(%s)" % "|".join(MEDIA_TYPES))
+
+
+class ExportJobResponse(BaseModel):
+    """导出任务状态响应。"""
+    id: str
+    kind: str
+    format: str
+    status: str
+    filename: str
+    download_url: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+@dataclass
+class ExportJob:
+    """一次后台导出任务的状态。"""
+    id: str
+    kind: str
+    key: tuple
+    format: str
+    filename: str
+    path: Path
+    subscribers: set[int] = field(default_factory=set)
+    status: str = "pending"  # pending, running, completed, failed
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    submitted_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def download_url(self) -> Optional[str]:
+        if self.status != "completed":
+            return None
+        return f"{router.prefix}/{self.id}/download"
+
+    def to_response(self) -> ExportJobResponse:
+        return ExportJobResponse(
+            id=self.id,
+            kind=self.kind,
+            format=self.format,
+            status=self.status,
+            filename=self.filename,
+            download_url=self.download_url,
+            error=self.error,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+        )
+
+
+class ExportJobEngine:
+    """在后台生成导出文件，按请求参数去重并清理过期文件。"""
+
+    def __init__(
+        self,
+        directory: str = settings.EXPORT_DIR,
+        reuse_window: float = settings.EXPORT_REUSE_WINDOW,
+        retention: float = settings.EXPORT_RETENTION,
+        session_factory=async_session_maker,
+    ):
+        self.directory = Path(directory)
+        self.session_factory = session_factory
+        self.reuse_window = reuse_window
+        self.retention = retention
+        self.jobs: OrderedDict[str, ExportJob] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(
+        self,
+        kind: str,
+        params: dict,
+        fmt: str,
+        query,
+        columns: Sequence[ExportColumn],
+        filename_stem: str,
+        requested_by: int,
+        sheet_name: str = "Sheet1",
+    ) -> ExportJob:
+        """登记导出任务；窗口期内已有相同请求（未失败）时直接复用。"""
+        self.purge()
+        key = (kind, tuple(sorted(params.items())), fmt)
+        job = self._find_reusable(key)
+        if job is not None:
+            job.subscribers.add(requested_by)
+            return job
+
+        if len(self.jobs) >= MAX_TRACKED_JOBS and not self._evict_finished():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many export jobs in progress"
+            )
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        job_id = uuid.uuid4().hex
+        job = ExportJob(
+            id=job_id,
+            kind=kind,
+            key=key,
+            format=fmt,
+            filename=f"{filename_stem}.{fmt}",
+            path=self.directory / f"{job_id}.{fmt}",
+            subscribers={requested_by},
+        )
+        self.jobs[job.id] = job
+
+        task = asyncio.create_task(self._run(job, query, columns, sheet_name))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        return self.jobs.get(job_id)
+
+    def purge(self, now: Optional[float] = None):
+        """删除超过保留期的任务，以及导出目录中超过保留期的遗留导出文件（如进程重启前生成的）。"""
+        now = time.monotonic() if now is None else now
+        for job_id, job in list(self.jobs.items()):
+            if job.status in ("completed", "failed") and now - job.submitted_at > self.retention:
+                del self.jobs[job_id]
+                self._remove_file(job.path)
+
+        if not self.directory.is_dir():
+            return
+        tracked = {job.path.name for job in self.jobs.values()}
+        cutoff = time.time() - self.retention
+        for path in self.directory.iterdir():
+            try:
+                if (
+                    ARTIFACT_NAME.fullmatch(path.name)
+                    and path.name not in tracked
+                    and path.stat().st_mtime < cutoff
+                ):
+                    path.unlink()
+            except OSError:
+                pass
+
+    async def shutdown(self):
+        """应用关闭时取消仍在运行的导出任务。"""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _find_reusable(self, key: tuple) -> Optional[ExportJob]:
+        now = time.monotonic()
+        for job in reversed(self.jobs.values()):
+            if now - job.submitted_at > self.reuse_window:
+                break
+            if job.key == key and job.status != "failed":
+                return job
+        return None
+
+    def _evict_finished(self) -> bool:
+        """淘汰最早提交的已结束任务（运行中的任务仍在写文件并会推送结果，不能淘汰）。"""
+        for job_id, job in self.jobs.items():
+            if job.status in ("completed", "failed"):
+                del self.jobs[job_id]
+                self._remove_file(job.path)
+                return True
+        return False
+
+    @staticmethod
+    def _remove_file(path: Path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    async def _run(self, job: ExportJob, query, columns: Sequence[ExportColumn], sheet_name: str):
+        job.status = "running"
+        try:
+            await write_export(
+                query, columns, job.format, str(job.path),
+                sheet_name=sheet_name, session_factory=self.session_factory,
+            )
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "cancelled"
+            self._remove_file(job.path)
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            self._remove_file(job.path)
+            logger.error("Export job %s failed: %s", job.id, e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            logger.info("Export job %s %s: %s", job.id, job.status, job.filename)
+
+        await manager.send_to_users(job.subscribers, {
+            "type": "export_ready",
+            "data": job.to_response().model_dump(mode="json"),
+        })
+
+
+# 模块级单例
+export_job_engine = ExportJobEngine()
+
+
+def get_export_job(job_id: str) -> ExportJob:
+    job = export_job_engine.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found"
+        )
+    return job
+
+
+@router.get("/{job_id}", response_model=ExportJobResponse)
+async def get_export_job_status(
+    job_id: str,
+    current_admin: CurrentAdmin = None,
+):
+    """查询导出任务状态（admin only）。"""
+    return get_export_job(job_id).to_response()
+
+
+@router.get("/{job_id}/download")
+async def download_export(
+    job_id: str,
+    current_admin: CurrentAdmin = None,
+):
+    """下载已完成的导出文件（admin only）。"""
+    job = get_export_job(job_id)
+    if job.status != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export job is {job.status}"
+        )
+    if not job.path.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export file has expired"
+        )
+    return FileResponse(job.path, media_type=MEDIA_TYPES[job.format], filename=job.filename)
@@ -0,0 +1,205 @@
+"""通知扇出（fan-out）引擎。
+
+发布课程通知 / 活动时，需要让每个在校用户都收到一条通知。
+原实现在请求内加载全部 User ORM 对象，并为每个用户写入一条内容相同的 UserNotification，
+3 万用户时请求耗时数十秒，user_notifications 表也按 O(用户数) 膨胀。
+
+本模块将扇出改为后台任务：
+1. 请求内只登记任务并立即返回 job_id
+2. 后台写入一条 BroadcastNotification（所有用户共享，已读状态见 BroadcastReceipt / 水位线），
+   并在同一事务中为所有用户的物化未读数 +1（total / processed 为更新的计数行数）
+3. 通过 ConnectionManager.broadcast 推送给所有在线用户（经 backplane 覆盖全部 worker）
+   广播消息对所有人只编码一次，因此不携带个人未读数；客户端收到后本地 +1，服务端缓存同步 +1
+"""
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, HTTPException, status, Depends
+from pydantic import BaseModel
+
+from app.db.database import async_session_maker
+from app.models.user import User
+from app.models.broadcast_notification import BroadcastNotification
+from app.api.deps import get_current_admin
+from app.api.ws import manager, encode_message
+from app.api.unread_counts import unread_counter, increment_all_unread_counters
+
+logger = logging.getLogger(__name__)
+
+CurrentAdmin = Annotated[User, Depends(get_current_admin)]
+
+router = APIRouter(prefix="/api/fanout", tags=["Fan-out"])
+
+# 内存中保留的历史任务数
+MAX_TRACKED_JOBS = 200
+
+
+class FanoutJobResponse(BaseModel):
+    """扇出任务进度响应。"""
+    id: str
+    type: str
+    related_id: Optional[int] = None
+    broadcast_id: Optional[int] = None
+    status: str
+    total: int
+    processed: int
+    progress: float
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+@dataclass
+class FanoutJob:
+    """一次通知扇出任务的状态。"""
+    id: str
+    type: str
+    title: str
+    content: str
+    link_url: Optional[str]
+    related_id: Optional[int]
+    broadcast_id: Optional[int] = None
+    status: str = "pending"  # pending, running, completed, failed
+    total: int = 0
+    processed: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    @property
+    def progress(self) -> float:
+        if self.total == 0:
+            return 1.0 if self.status == "completed" else 0.0
+        return round(self.processed / self.total, 4)
+
+    def to_response(self) -> FanoutJobResponse:
+        return FanoutJobResponse(
+            id=self.id,
+            type=self.type,
+            related_id=self.related_id,
+            broadcast_id=self.broadcast_id,
+            status=self.status,
+            total=self.total,
+            processed=self.processed,
+            progress=self.progress,
+            error=self.error,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+        )
+
+
+class FanoutEngine:
+    """在后台发布广播通知并推送给在线用户，记录任务进度。"""
+
+    def __init__(self, session_factory=async_session_maker):
+        self.session_factory = session_factory
+        self.jobs: OrderedDict[str, FanoutJob] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(
+        self,
+        type: str,
+        title: str,
+        content: str,
+        link_url: Optional[str] = None,
+        related_id: Optional[int] = None,
+    ) -> FanoutJob:
+        """登记扇出任务并在后台启动，立即返回任务对象。"""
+        job = FanoutJob(
+            id=uuid.uuid4().hex,
+            type=type,
+            title=title,
+            content=content,
+            link_url=link_url,
+            related_id=related_id,
+        )
+        self.jobs[job.id] = job
+        while len(self.jobs) > MAX_TRACKED_JOBS:
+            self.jobs.popitem(last=False)
+
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[FanoutJob]:
+        return self.jobs.get(job_id)
+
+    async def shutdown(self):
+        """应用关闭时取消仍在运行的扇出任务。"""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, job: FanoutJob):
+        job.status = "running"
+        message = encode_message({
+            "type": "new_notification",
+            "data": {
+                "type": job.type,
+                "title": job.title,
+                "content": job.content,
+                "link_url": job.link_url,
+            },
+        })
+        try:
+            async with self.session_factory() as db:
+                broadcast = BroadcastNotification(
+                    type=job.type,
+                    title=job.title,
+                    content=job.content,
+                    link_url=job.link_url,
+                    related_id=job.related_id,
+                    created_at=datetime.utcnow(),
+                )
+                db.add(broadcast)
+                # 与广播写入同一事务：一条 UPDATE 为所有已有计数行 +1
+                job.total = await increment_all_unread_counters(db)
+                await db.commit()
+                job.broadcast_id = broadcast.id
+                job.processed = job.total
+            await unread_counter.broadcast_published()
+
+            # 离线用户下次拉取列表时即可看到广播，这里只需推送给在线用户
+            await manager.broadcast(message)
+
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error("Fan-out job %s failed: %s", job.id, e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            logger.info(
+                "Fan-out job %s %s: broadcast_id=%s",
+                job.id, job.status, job.broadcast_id,
+            )
+
+
+# 模块级单例
+fanout_engine = FanoutEngine()
+
+
+@router.get("/{job_id}", response_model=FanoutJobResponse)
+async def get_fanout_job(
+    job_id: str,
+    current_admin: CurrentAdmin = None,
+):
+    """查询扇出任务进度（admin only）。"""
+    job = fanout_engine.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Fan-out job not found"
+        )
+    return job.to_response()
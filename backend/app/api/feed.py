@@ -1,13 +1,13 @@
+from datetime import datetime, timezone
 from typing import Annotated, List, Literal
-from fastapi import APIRouter, Depends
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_db
-from app.models.notification import Notification
-from app.models.activity import Activity
-from app.models.lost_item import LostItem
 from app.models.user import User
+from app.api.feed_cache import feed_cache
+from app.api.feed_merge import FEED_SOURCES, merge_feed, resume_after
+from app.api.pagination import CursorParam, decode_cursor, page_rows
 
 # Type aliases for this file
 CurrentUser = Annotated[User, Depends(lambda: None)]  # Optional auth
@@ -16,6 +16,66 @@ DatabaseSession = Annotated[AsyncSession, Depends(get_db)]
 router = APIRouter(prefix="/api/feed", tags=["feed"])
 
 
+def time_label(created_at: str) -> str:
+    """相对时间显示（"3分钟前"），每次读取时重新计算。"""
+    # Handle both naive and aware datetimes
+    created = datetime.fromisoformat(created_at)
+    if created.tzinfo is None:
+        # Naive datetime - assume UTC
+        now = datetime.utcnow()
+    else:
+        # Aware datetime - use current time with same timezone
+        now = datetime.now(timezone.utc)
+
+    diff = now - created
+
+    # Calculate total seconds for proper comparison
+    total_seconds = diff.total_seconds()
+    days = int(total_seconds // 86400)
+    hours = int(total_seconds // 3600)
+    minutes = int(total_seconds // 60)
+
+    if days > 0:
+        return f"{days}天前"
+    elif hours > 0:
+        return f"{hours}小时前"
+    elif minutes > 0:
+        return f"{minutes}分钟前"
+    return "刚刚"
+
+
+@router.get("")
+async def get_feed(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: CursorParam = None,
+    db: DatabaseSession = None
+):
+    """
+    按游标分页的动态信息流（无限滚动）
+
+    条目按 (created_at, 来源, id) 降序排列；第一页不传 cursor，
+    之后传上一页响应中的 next_cursor，没有更多数据时 next_cursor 为 null。
+    """
+    starts = None
+    if cursor:
+        created_at, source_type, row_id = decode_cursor(cursor, sources={source.type for source in FEED_SOURCES})
+        starts = resume_after(created_at, source_type, row_id)
+
+    merged = await merge_feed(db, limit + 1, starts=starts)
+    merged, next_cursor = page_rows(merged, limit, key=lambda entry: (entry[1].created_at, entry[0].type, entry[1].id))
+
+    feed_items = []
+    for source, row in merged:
+        item = source.to_item(row)
+        item["time"] = time_label(item["created_at"])
+        feed_items.append(item)
+    return {
+        "items": feed_items,
+        "total": len(feed_items),
+        "next_cursor": next_cursor,
+    }
+
+
 @router.get("/latest")
 async def get_latest_feed(
     limit: int = 10,
@@ -24,134 +84,24 @@ async def get_latest_feed(
     """
     获取最新动态聚合信息
     整合通知、活动和失物招领，按时间排序返回
-    """
-    # 获取最新通知
-    notif_result = await db.execute(
-        select(Notification)
-        .order_by(Notification.created_at.desc())
-        .limit(limit)
-    )
-    notifications = notif_result.scalars().all()
-
-    # 获取最新活动
-    activity_result = await db.execute(
-        select(Activity)
-        .order_by(Activity.created_at.desc())
-        .limit(limit)
-    )
-    activities = activity_result.scalars().all()
-
-    # Update activity statuses to ensure they're current
-    status_updated = False
-    for activity in activities:
-        new_status = activity.calculate_status()
-        if activity.status != new_status:
-            activity.status = new_status
-            status_updated = True
-
-    if status_updated:
-        await db.commit()
-
-    # 获取最新失物招领
-    lost_result = await db.execute(
-        select(LostItem)
-        .order_by(LostItem.created_at.desc())
-        .limit(limit)
-    )
-    lost_items = lost_result.scalars().all()
-
-    # 聚合并转换为统一格式
-    feed_items = []
-
-    # 添加通知
-    for notif in notifications:
-        feed_items.append({
-            "id": f"notification-{notif.id}",
-            "type": "notification",
-            "tag": "重要" if notif.is_important else "通知",
-            "tag_color": "bg-blue-100 text-blue-700" if notif.is_important else "bg-slate-100 text-slate-700",
-            "title": notif.title,
-            "description": notif.content[:100] + "..." if len(notif.content) > 100 else notif.content,
-            "created_at": notif.created_at.isoformat(),
-            "link_url": f"/notifications",
-        })
-
-    # 添加活动
-    for activity in activities:
-        # Status colors
-        status_colors = {
-            "进行中": "bg-blue-100 text-blue-700",
-            "已结束": "bg-slate-100 text-slate-700",
-            "报名中": "bg-emerald-100 text-emerald-700",
-            "报名截止": "bg-amber-100 text-amber-700",
-            "即将开始报名": "bg-purple-100 text-purple-700",
-        }
-
-        feed_items.append({
-            "id": f"activity-{activity.id}",
-            "type": "activity",
-            "tag": activity.status,  # Show current status instead of category
-            "tag_color": status_colors.get(activity.status, "bg-emerald-100 text-emerald-700"),
-            "title": activity.title,
-            "description": activity.description[:100] + "..." if len(activity.description) > 100 else activity.description,
-            "created_at": activity.created_at.isoformat(),
-            "link_url": f"/activities/{activity.id}",
-        })
-
-    # 添加失物招领
-    for item in lost_items:
-        tag_map = {
-            "lost": "遗失",
-            "found": "招领"
-        }
-        feed_items.append({
-            "id": f"lost-{item.id}",
-            "type": "lost_item",
-            "tag": tag_map.get(item.type, "其他"),
-            "tag_color": "bg-amber-100 text-amber-700",
-            "title": item.title,
-            "description": item.description[:100] + "..." if len(item.description) > 100 else item.description,
-            "created_at": item.created_at.isoformat(),
-            "link_url": f"/lost-and-found/{item.id}",
-        })
-
-    # 按时间排序（最新的在前）
-    feed_items.sort(key=lambda x: x["created_at"], reverse=True)
-
-    # 限制返回数量
-    feed_items = feed_items[:limit]
-
-    # 格式化时间显示（简化版）
-    for item in feed_items:
-        from datetime import datetime, timezone
-
-        # Handle both naive and aware datetimes
-        created = datetime.fromisoformat(item["created_at"])
-        if created.tzinfo is None:
-            # Naive datetime - assume UTC
-            now = datetime.utcnow()
-        else:
-            # Aware datetime - use current time with same timezone
-            now = datetime.now(timezone.utc)
-
-        diff = now - created
-
-        # Calculate total seconds for proper comparison
-        total_seconds = diff.total_seconds()
-        days = int(total_seconds // 86400)
-        hours = int(total_seconds // 3600)
-        minutes = int(total_seconds // 60)
-
-        if days > 0:
-            item["time"] = f"{days}天前"
-        elif hours > 0:
-            item["time"] = f"{hours}小时前"
-        elif minutes > 0:
-            item["time"] = f"{minutes}分钟前"
-        else:
-            item["time"] = "刚刚"
 
+    合并结果按 limit 档位缓存（见 app/api/feed_cache.py），读取时只重新计算相对时间。
+    """
+    bucket = feed_cache.bucket_for(limit)
+    items = feed_cache.get(bucket) if bucket else None
+    if items is None:
+        generation = feed_cache.generation
+        items = await build_feed(db, bucket or limit)
+        if bucket:
+            feed_cache.put(bucket, items, generation)
+
+    feed_items = [{**item, "time": time_label(item["created_at"])} for item in items[:limit]]
     return {
         "items": feed_items,
         "total": len(feed_items)
     }
+
+
+async def build_feed(db: AsyncSession, limit: int) -> list[dict]:
+    """归并最新的 limit 条动态（不含相对时间），见 app/api/feed_merge.py。"""
+    return [source.to_item(row) for source, row in await merge_feed(db, limit)]
@@ -0,0 +1,47 @@
+"""首页动态（feed）缓存。
+
+/api/feed/latest 是所有学生的首页，原实现每次请求都要查三张表、重新计算活动状态、
+构造并排序字典。这里缓存合并排序后的前 N 条（按 limit 取整到 FEED_LIMIT_BUCKETS 中的档位），
+读取时只截取并重新计算相对时间（"3分钟前"），首页延迟与表大小无关：
+- 通知、活动、失物招领的创建 / 修改 / 删除 / 审核接口提交后调用 invalidate
+- 多 worker 时通过 backplane 频道 campus_hub:feed 同步失效
+- 活动状态随时间变化，条目最多缓存 FEED_CACHE_TTL 秒（0 表示关闭缓存）
+"""
+from typing import Optional
+
+from app.core.cache import BackplaneCache
+from app.core.config import settings
+
+FEED_CHANNEL = "campus_hub:feed"
+# limit 向上取整到这些档位后缓存；超过最大档位的请求不走缓存
+FEED_LIMIT_BUCKETS = (10, 20, 50, 100)
+# 其他 worker 发来的目标：丢弃全部档位
+ALL_TARGET = "*"
+
+
+class FeedCache(BackplaneCache):
+    """进程内的 limit 档位 -> 合并后的动态条目缓存。"""
+
+    channel = FEED_CHANNEL
+
+    def __init__(self, ttl: float | None = None):
+        super().__init__(settings.FEED_CACHE_TTL if ttl is None else ttl)
+
+    @staticmethod
+    def bucket_for(limit: int) -> Optional[int]:
+        for bucket in FEED_LIMIT_BUCKETS:
+            if limit <= bucket:
+                return bucket
+        return None
+
+    async def invalidate(self):
+        """动态来源数据变化后调用（本进程立即生效，并通知其他 worker）。"""
+        self.clear()
+        await self._publish(ALL_TARGET)
+
+    def _on_remote(self, target: str):
+        self.clear()
+
+
+# 模块级单例
+feed_cache = FeedCache()
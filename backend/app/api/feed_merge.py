@@ -0,0 +1,220 @@
+"""首页动态的多来源归并。
+
+原实现从三张表各取 limit 行整行数据（3×limit 行），全部转换为字典、按 ISO 字符串排序后丢弃三分之二。
+这里每个来源（通知、活动、审核通过的失物招领）按 (created_at DESC, id DESC) 走各自的
+(过滤列..., created_at, id) 索引分页读取，只投影首页需要的列（描述只取前 101 个字符）；
+merge_feed 用最小堆对各来源的行流做 k 路归并，某个来源的已读行用完且仍需要更多条目时才读取它的下一页：
+- 取 limit 条最多读取 limit + k × 每页行数，增加来源不会成倍增加查询量
+- 归并顺序为 (created_at DESC, 来源顺序, id DESC)，created_at 相同的条目顺序稳定
+- 活动状态由时间字段在 Python 中计算，读取动态不会写数据库
+- 游标 (created_at, 来源, id) 通过 resume_after 换算为每个来源的索引范围条件，任意深度的一页代价相同
+"""
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.notification import Notification
+from app.models.activity import Activity
+from app.models.lost_item import LostItem
+from app.api.pagination import after_key
+
+# 每个来源每次最多读取的行数
+FEED_PAGE_SIZE = 20
+DESCRIPTION_LENGTH = 100
+
+ACTIVITY_STATUS_COLORS = {
+    "进行中": "bg-blue-100 text-blue-700",
+    "已结束": "bg-slate-100 text-slate-700",
+    "报名中": "bg-emerald-100 text-emerald-700",
+    "报名截止": "bg-amber-100 text-amber-700",
+    "即将开始报名": "bg-purple-100 text-purple-700",
+}
+LOST_ITEM_TAGS = {
+    "lost": "遗失",
+    "found": "招领",
+}
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def description_column(column):
+    """描述截取前 DESCRIPTION_LENGTH + 1 个字符，多出的一个字符用于判断是否需要省略号。"""
+    return func.substr(column, 1, DESCRIPTION_LENGTH + 1).label("description")
+
+
+def excerpt(text: str) -> str:
+    return text[:DESCRIPTION_LENGTH] + "..." if len(text) > DESCRIPTION_LENGTH else text
+
+
+def notification_item(row) -> dict:
+    return {
+        "id": f"notification-{row.id}",
+        "type": "notification",
+        "tag": "重要" if row.is_important else "通知",
+        "tag_color": "bg-blue-100 text-blue-700" if row.is_important else "bg-slate-100 text-slate-700",
+        "title": row.title,
+        "description": excerpt(row.description),
+        "created_at": row.created_at.isoformat(),
+        "link_url": "/notifications",
+    }
+
+
+def activity_item(row) -> dict:
+    # 行中包含计算状态所需的时间字段
+    activity_status = Activity.calculate_status(row)
+    return {
+        "id": f"activity-{row.id}",
+        "type": "activity",
+        "tag": activity_status,  # Show current status instead of category
+        "tag_color": ACTIVITY_STATUS_COLORS.get(activity_status, "bg-emerald-100 text-emerald-700"),
+        "title": row.title,
+        "description": excerpt(row.description),
+        "created_at": row.created_at.isoformat(),
+        "link_url": f"/activities/{row.id}",
+    }
+
+
+def lost_item_item(row) -> dict:
+    return {
+        "id": f"lost-{row.id}",
+        "type": "lost_item",
+        "tag": LOST_ITEM_TAGS.get(row.type, "其他"),
+        "tag_color": "bg-amber-100 text-amber-700",
+        "title": row.title,
+        "description": excerpt(row.description),
+        "created_at": row.created_at.isoformat(),
+        "link_url": f"/lost-and-found/{row.id}",
+    }
+
+
+@dataclass(frozen=True)
+class FeedSource:
+    """一个动态来源：投影的列、过滤条件和行到动态条目的转换。"""
+    type: str
+    model: Any
+    columns: tuple
+    to_item: Callable[[Any], dict]
+    criteria: tuple = field(default=())
+
+    def query(self, page_size: int, start=None):
+        """来源的一页查询（start 为额外的起始条件）。"""
+        query = select(*self.columns).where(*self.criteria)
+        if start is not None:
+            query = query.where(start)
+        return query.order_by(self.model.created_at.desc(), self.model.id.desc()).limit(page_size)
+
+
+# 顺序即 created_at 相同时的归并顺序
+FEED_SOURCES = (
+    FeedSource(
+        type="notification",
+        model=Notification,
+        columns=(
+            Notification.id, Notification.title, description_column(Notification.content),
+            Notification.is_important, Notification.created_at,
+        ),
+        to_item=notification_item,
+    ),
+    FeedSource(
+        type="activity",
+        model=Activity,
+        columns=(
+            Activity.id, Activity.title, description_column(Activity.description), Activity.created_at,
+            Activity.registration_start, Activity.registration_end,
+            Activity.activity_start, Activity.activity_end,
+        ),
+        to_item=activity_item,
+    ),
+    FeedSource(
+        type="lost_item",
+        model=LostItem,
+        columns=(
+            LostItem.id, LostItem.title, description_column(LostItem.description),
+            LostItem.type, LostItem.created_at,
+        ),
+        to_item=lost_item_item,
+        # 与失物招领列表一致，只展示审核通过的（走 ix_lost_items_review_created）
+        criteria=(LostItem.review_status == "approved",),
+    ),
+)
+
+
+async def source_rows(db: AsyncSession, source: FeedSource, page_size: int, start=None):
+    """按 (created_at DESC, id DESC) 逐页读取一个来源的行。"""
+    query = source.query(page_size, start)
+    page = query
+    while True:
+        rows = (await db.execute(page)).all()
+        for row in rows:
+            yield row
+        if len(rows) < page_size:
+            return
+        last = rows[-1]
+        page = query.where(after_key(source.model.created_at, source.model.id, last.created_at, last.id))
+
+
+def resume_after(created_at: datetime, source_type: str, row_id: int, sources: tuple = FEED_SOURCES) -> list:
+    """归并顺序中位于 (created_at, source_type, row_id) 之后的、每个来源的起始条件。
+
+    created_at 相同时排在游标来源之前的来源已全部读过，之后的来源从该时间（含）开始。
+    """
+    cursor_rank = next(rank for rank, source in enumerate(sources) if source.type == source_type)
+    starts = []
+    for rank, source in enumerate(sources):
+        created_col = source.model.created_at
+        if rank < cursor_rank:
+            starts.append(created_col < created_at)
+        elif rank == cursor_rank:
+            starts.append(after_key(created_col, source.model.id, created_at, row_id))
+        else:
+            starts.append(created_col <= created_at)
+    return starts
+
+
+def merge_key(created_at: datetime, rank: int, row_id: int) -> tuple:
+    """最小堆的排序键：created_at 越新、来源越靠前、id 越大越先出堆。"""
+    return (-((created_at - _EPOCH) // _MICROSECOND), rank, -row_id)
+
+
+async def merge_feed(
+    db: AsyncSession,
+    limit: int,
+    sources: tuple = FEED_SOURCES,
+    page_size: int = FEED_PAGE_SIZE,
+    starts: Optional[list] = None,
+) -> list[tuple[FeedSource, Any]]:
+    """k 路归并各来源，返回最新的 limit 个 (来源, 行)。
+
+    starts 为每个来源的起始条件（游标分页时使用）。
+    """
+    page_size = max(1, min(limit, page_size))
+    streams = [
+        source_rows(db, source, page_size, starts[rank] if starts else None)
+        for rank, source in enumerate(sources)
+    ]
+    heap = []
+
+    async def advance(rank: int):
+        row = await anext(streams[rank], None)
+        if row is not None:
+            heapq.heappush(heap, (merge_key(row.created_at, rank, row.id), rank, row))
+
+    merged = []
+    try:
+        if limit > 0:
+            for rank in range(len(streams)):
+                await advance(rank)
+        while heap and len(merged) < limit:
+            _, rank, row = heapq.heappop(heap)
+            merged.append((sources[rank], row))
+            if len(merged) < limit:
+                await advance(rank)
+    finally:
+        for stream in streams:
+            await stream.aclose()
+    return merged
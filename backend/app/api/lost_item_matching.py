@@ -26,6 +26,7 @@ from app.models.lost_item import LostItem
 from app.models.user_notification import UserNotification
 from app.api.deps import get_current_user
 from app.api.ws import manager
+from app.api.unread_counts import unread_counter, adjust_unread_counter
 
 logger = logging.getLogger(__name__)
 
@@ -259,9 +260,11 @@ async def notify_matches(db: AsyncSession, item: LostItem, matches: list[dict]):
         related_id=item.id,
     )
     db.add(notification)
+    await adjust_unread_counter(db, item.created_by, 1)
     await db.commit()
+    unread_count = await unread_counter.apply(db, item.created_by, 1)
 
-    # WebSocket 推送
+    # WebSocket 推送（附带最新未读数，前端无需再查询）
     await manager.send_to_user(item.created_by, {
         "type": "new_notification",
         "data": {
@@ -269,6 +272,7 @@ async def notify_matches(db: AsyncSession, item: LostItem, matches: list[dict]):
             "title": notification.title,
             "content": notification.content,
             "link_url": notification.link_url,
+            "unread_count": unread_count,
         },
     })
 
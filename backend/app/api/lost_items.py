@@ -1,5 +1,5 @@
 from typing import List, Optional, Annotated
-from fastapi import APIRouter, HTTPException, status, Depends, Query, Body
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Body, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_, delete as sql_delete
 
@@ -7,7 +7,10 @@ from app.db.database import get_db
 from app.models.user import User
 from app.models.lost_item import LostItem
 from app.schemas.lost_item import LostItemCreate, LostItemUpdate, LostItemResponse, PublisherInfo
+from app.api.publishers import publisher_info, load_publisher, load_publishers
 from app.api.deps import get_current_user, get_current_admin
+from app.api.feed_cache import feed_cache
+from app.api.pagination import CursorParam, keyset_query, page_rows, set_next_cursor
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 CurrentAdmin = Annotated[User, Depends(get_current_admin)]
@@ -16,6 +19,25 @@ DatabaseSession = Annotated[AsyncSession, Depends(get_db)]
 router = APIRouter(prefix="/api/lost-items", tags=["Lost & Found"])
 
 
+def lost_item_response(item: LostItem, publisher: Optional[PublisherInfo]) -> LostItemResponse:
+    """Build the API response for a lost item with its resolved publisher."""
+    return LostItemResponse(
+        id=item.id,
+        title=item.title,
+        type=item.type,
+        category=item.category,
+        description=item.description,
+        location=item.location,
+        time=item.time,
+        images=item.images or [],
+        tags=item.tags or [],
+        status=item.status,
+        review_status=item.review_status,
+        publisher=publisher.model_dump() if publisher else None,
+        created_at=item.created_at,
+    )
+
+
 @router.get("", response_model=List[LostItemResponse])
 async def get_lost_items(
     item_type: Optional[str] = Query(None, alias="type", description="Filter by type: lost or found"),
@@ -24,17 +46,22 @@ async def get_lost_items(
     review_status: Optional[str] = Query(None, description="Filter by review status (admin only)"),
     skip: int = 0,
     limit: int = 100,
+    cursor: CursorParam = None,
+    response: Response = None,
     current_user: CurrentUser = None,
     db: DatabaseSession = None,
 ):
     """Get all lost and found items.
 
+    Pass ``cursor`` to use keyset pagination; the next page's cursor is
+    returned in the X-Next-Cursor header.
+
     Access rules:
     - By default: ONLY show approved items to everyone (including admins)
     - Admins can use review_status param to see pending/rejected items
     - Regular users can only see approved items
     """
-    query = select(LostItem).order_by(LostItem.created_at.desc())
+    query = select(LostItem)
 
     if item_type:
         query = query.where(LostItem.type == item_type)
@@ -59,44 +86,19 @@ async def get_lost_items(
         # Default: only show approved items
         query = query.where(LostItem.review_status == "approved")
 
-    query = query.offset(skip).limit(limit)
+    if cursor is not None:
+        query = keyset_query(query, LostItem.created_at, LostItem.id, cursor, limit)
+    else:
+        query = query.order_by(LostItem.created_at.desc(), LostItem.id.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     items = result.scalars().all()
+    if cursor is not None:
+        items, next_cursor = page_rows(items, limit)
+        set_next_cursor(response, next_cursor)
 
-    # Get publisher info for each item
-    response = []
-    for item in items:
-        publisher = None
-        if item.created_by:
-            user_result = await db.execute(select(User).where(User.id == item.created_by))
-            user = user_result.scalar_one_or_none()
-            if user:
-                publisher = PublisherInfo(
-                    id=user.id,
-                    name=user.name if user.show_name_in_lost_item else None,
-                    avatar=user.avatar if user.show_avatar_in_lost_item else None,
-                    email=user.email if user.show_email_in_lost_item else None,
-                    phone=user.phone if user.show_phone_in_lost_item else None,
-                )
-
-        item_dict = {
-            "id": item.id,
-            "title": item.title,
-            "type": item.type,
-            "category": item.category,
-            "description": item.description,
-            "location": item.location,
-            "time": item.time,
-            "images": item.images or [],
-            "tags": item.tags or [],
-            "status": item.status,
-            "review_status": item.review_status,
-            "publisher": publisher.model_dump() if publisher else None,
-            "created_at": item.created_at,
-        }
-        response.append(LostItemResponse(**item_dict))
-
-    return response
+    # Resolve all publishers of the page in one query
+    publishers = await load_publishers(db, (item.created_by for item in items))
+    return [lost_item_response(item, publishers.get(item.created_by)) for item in items]
 
 
 @router.get("/{item_id}", response_model=LostItemResponse)
@@ -120,35 +122,7 @@ async def get_lost_item(
             detail="Item not found"
         )
 
-    # Get publisher info
-    publisher = None
-    if item.created_by:
-        user_result = await db.execute(select(User).where(User.id == item.created_by))
-        user = user_result.scalar_one_or_none()
-        if user:
-            publisher = PublisherInfo(
-                id=user.id,
-                name=user.name if user.show_name_in_lost_item else None,
-                avatar=user.avatar if user.show_avatar_in_lost_item else None,
-                email=user.email if user.show_email_in_lost_item else None,
-                phone=user.phone if user.show_phone_in_lost_item else None,
-            )
-
-    return LostItemResponse(
-        id=item.id,
-        title=item.title,
-        type=item.type,
-        category=item.category,
-        description=item.description,
-        location=item.location,
-        time=item.time,
-        images=item.images or [],
-        tags=item.tags or [],
-        status=item.status,
-        review_status=item.review_status,
-        publisher=publisher.model_dump() if publisher else None,
-        created_at=item.created_at,
-    )
+    return lost_item_response(item, await load_publisher(db, item.created_by))
 
 
 @router.post("", response_model=LostItemResponse, status_code=status.HTTP_201_CREATED)
@@ -165,32 +139,10 @@ async def create_lost_item(
 
     db.add(new_item)
     await db.commit()
+    await feed_cache.invalidate()
     await db.refresh(new_item)
 
-    # Get publisher info
-    publisher = PublisherInfo(
-        id=current_user.id,
-        name=current_user.name if current_user.show_name_in_lost_item else None,
-        avatar=current_user.avatar if current_user.show_avatar_in_lost_item else None,
-        email=current_user.email if current_user.show_email_in_lost_item else None,
-        phone=current_user.phone if current_user.show_phone_in_lost_item else None,
-    )
-
-    return LostItemResponse(
-        id=new_item.id,
-        title=new_item.title,
-        type=new_item.type,
-        category=new_item.category,
-        description=new_item.description,
-        location=new_item.location,
-        time=new_item.time,
-        images=new_item.images or [],
-        tags=new_item.tags or [],
-        status=new_item.status,
-        review_status=new_item.review_status,
-        publisher=publisher.model_dump(),
-        created_at=new_item.created_at,
-    )
+    return lost_item_response(new_item, publisher_info(current_user))
 
 
 @router.patch("/{item_id}", response_model=LostItemResponse)
@@ -225,37 +177,10 @@ async def update_lost_item(
         setattr(item, field, value)
 
     await db.commit()
+    await feed_cache.invalidate()
     await db.refresh(item)
 
-    # Get publisher info
-    publisher = None
-    if item.created_by:
-        user_result = await db.execute(select(User).where(User.id == item.created_by))
-        user = user_result.scalar_one_or_none()
-        if user:
-            publisher = PublisherInfo(
-                id=user.id,
-                name=user.name if user.show_name_in_lost_item else None,
-                avatar=user.avatar if user.show_avatar_in_lost_item else None,
-                email=user.email if user.show_email_in_lost_item else None,
-                phone=user.phone if user.show_phone_in_lost_item else None,
-            )
-
-    return LostItemResponse(
-        id=item.id,
-        title=item.title,
-        type=item.type,
-        category=item.category,
-        description=item.description,
-        location=item.location,
-        time=item.time,
-        images=item.images or [],
-        tags=item.tags or [],
-        status=item.status,
-        review_status=item.review_status,
-        publisher=publisher.model_dump() if publisher else None,
-        created_at=item.created_at,
-    )
+    return lost_item_response(item, await load_publisher(db, item.created_by))
 
 
 @router.post("/{item_id}/review", response_model=LostItemResponse)
@@ -281,6 +206,7 @@ async def review_lost_item(
     item.review_status = "approved" if approve else "rejected"
 
     await db.commit()
+    await feed_cache.invalidate()
     await db.refresh(item)
 
     # 审批通过后触发智能匹配
@@ -295,35 +221,7 @@ async def review_lost_item(
             logger = __import__("logging").getLogger(__name__)
             logger.error("Failed to run matching for item %d: %s", item.id, e)
 
-    # Get publisher info
-    publisher = None
-    if item.created_by:
-        user_result = await db.execute(select(User).where(User.id == item.created_by))
-        user = user_result.scalar_one_or_none()
-        if user:
-            publisher = PublisherInfo(
-                id=user.id,
-                name=user.name if user.show_name_in_lost_item else None,
-                avatar=user.avatar if user.show_avatar_in_lost_item else None,
-                email=user.email if user.show_email_in_lost_item else None,
-                phone=user.phone if user.show_phone_in_lost_item else None,
-            )
-
-    return LostItemResponse(
-        id=item.id,
-        title=item.title,
-        type=item.type,
-        category=item.category,
-        description=item.description,
-        location=item.location,
-        time=item.time,
-        images=item.images or [],
-        tags=item.tags or [],
-        status=item.status,
-        review_status=item.review_status,
-        publisher=publisher.model_dump() if publisher else None,
-        created_at=item.created_at,
-    )
+    return lost_item_response(item, await load_publisher(db, item.created_by))
 
 
 @router.post("/batch-delete", response_model=dict)
@@ -344,6 +242,7 @@ async def batch_delete_lost_items(
         sql_delete(LostItem).where(LostItem.id.in_(item_ids))
     )
     await db.commit()
+    await feed_cache.invalidate()
 
     return {"deleted": len(item_ids)}
 
@@ -375,3 +274,4 @@ async def delete_lost_item(
 
     await db.delete(item)
     await db.commit()
+    await feed_cache.invalidate()
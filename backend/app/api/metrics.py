@@ -0,0 +1,36 @@
+"""运行时指标。
+
+汇总各进程内缓存的命中情况、在线连接数与数据库连接池占用，用于观察缓存效果和确定连接池大小（指标按 worker 统计）。
+"""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from app.core.security import token_cache
+from app.db.database import engine
+from app.db.pool import pool_metrics
+from app.models.user import User
+from app.api.deps import get_current_admin
+from app.api.feed_cache import feed_cache
+from app.api.principal_cache import principal_cache
+from app.api.unread_counts import unread_counter
+from app.api.ws import manager
+
+CurrentAdmin = Annotated[User, Depends(get_current_admin)]
+
+router = APIRouter(prefix="/api/metrics", tags=["Metrics"])
+
+
+@router.get("")
+async def get_metrics(
+    current_admin: CurrentAdmin = None,
+):
+    """本 worker 的缓存、连接与连接池指标（admin only）。"""
+    return {
+        "token_cache": token_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "unread_counter": unread_counter.stats(),
+        "feed_cache": feed_cache.stats(),
+        "websocket": {"connections": manager.connection_count},
+        "db_pool": pool_metrics(engine),
+    }
@@ -1,15 +1,17 @@
 from typing import List, Optional, Annotated
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, status, Depends, Query, Body
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Body, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete as sql_delete
 
 from app.db.database import get_db
 from app.models.user import User
 from app.models.notification import Notification
-from app.models.user_notification import UserNotification
 from app.schemas.notification import NotificationCreate, NotificationResponse
 from app.api.deps import get_current_user, get_current_admin
+from app.api.fanout import fanout_engine
+from app.api.feed_cache import feed_cache
+from app.api.pagination import CursorParam, keyset_query, page_rows, set_next_cursor
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 CurrentAdmin = Annotated[User, Depends(get_current_admin)]
@@ -23,20 +25,32 @@ async def get_notifications(
     created_by: Optional[int] = Query(None, description="Filter by user ID who created the notification"),
     skip: int = 0,
     limit: int = 100,
+    cursor: CursorParam = None,
+    response: Response = None,
     db: DatabaseSession = None,
 ):
-    """Get all notifications (public access)."""
-    query = select(Notification).order_by(Notification.created_at.desc())
+    """Get all notifications (public access).
+
+    Pass ``cursor`` to use keyset pagination; the next page's cursor is
+    returned in the X-Next-Cursor header.
+    """
+    query = select(Notification)
 
     if created_by is not None:
         query = query.where(Notification.created_by == created_by)
 
-    query = query.offset(skip).limit(limit)
+    if cursor is not None:
+        query = keyset_query(query, Notification.created_at, Notification.id, cursor, limit)
+    else:
+        query = query.order_by(Notification.created_at.desc(), Notification.id.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     notifications = result.scalars().all()
+    if cursor is not None:
+        notifications, next_cursor = page_rows(notifications, limit)
+        set_next_cursor(response, next_cursor)
 
     # Format time for display
-    response = []
+    items = []
     for n in notifications:
         notification_dict = {
             "id": n.id,
@@ -52,9 +66,9 @@ async def get_notifications(
             "time": format_time(n.created_at),
             "created_at": n.created_at,
         }
-        response.append(NotificationResponse(**notification_dict))
+        items.append(NotificationResponse(**notification_dict))
 
-    return response
+    return items
 
 
 @router.get("/{notification_id}", response_model=NotificationResponse)
@@ -104,41 +118,17 @@ async def create_notification(
 
     db.add(new_notification)
     await db.commit()
+    await feed_cache.invalidate()
     await db.refresh(new_notification)
 
-    # Create user notifications for all active users
-    result = await db.execute(
-        select(User).where(User.is_active == True)
+    # 后台扇出用户通知，请求立即返回
+    job = fanout_engine.submit(
+        type="course",
+        title=f"新课程通知：{new_notification.title}",
+        content=f"{new_notification.course or '课程'}发布了新通知：{new_notification.title}",
+        link_url="/notifications",
+        related_id=new_notification.id,
     )
-    users = result.scalars().all()
-
-    for user in users:
-        user_notification = UserNotification(
-            user_id=user.id,
-            type="course",
-            title=f"新课程通知：{new_notification.title}",
-            content=f"{new_notification.course or '课程'}发布了新通知：{new_notification.title}",
-            link_url="/notifications",
-            is_read=False,
-            created_at=datetime.utcnow(),
-            related_id=new_notification.id,
-        )
-        db.add(user_notification)
-
-    await db.commit()
-
-    # WebSocket 广播推送
-    from app.api.ws import manager
-    for user in users:
-        await manager.send_to_user(user.id, {
-            "type": "new_notification",
-            "data": {
-                "type": "course",
-                "title": f"新课程通知：{new_notification.title}",
-                "content": f"{new_notification.course or '课程'}发布了新通知：{new_notification.title}",
-                "link_url": "/notifications",
-            },
-        })
 
     return NotificationResponse(
         id=new_notification.id,
@@ -151,6 +141,7 @@ async def create_notification(
         is_important=new_notification.is_important,
         time=format_time(new_notification.created_at),
         created_at=new_notification.created_at,
+        fanout_job_id=job.id,
     )
 
 
@@ -174,6 +165,7 @@ async def delete_notification(
 
     await db.delete(notification)
     await db.commit()
+    await feed_cache.invalidate()
 
 
 @router.patch("/{notification_id}", response_model=NotificationResponse)
@@ -200,6 +192,7 @@ async def update_notification(
         setattr(notification, field, value)
 
     await db.commit()
+    await feed_cache.invalidate()
     await db.refresh(notification)
 
     return NotificationResponse(
@@ -236,6 +229,7 @@ async def batch_delete_notifications(
         sql_delete(Notification).where(Notification.id.in_(notification_ids))
     )
     await db.commit()
+    await feed_cache.invalidate()
 
     return {"deleted": len(notification_ids)}
 
@@ -0,0 +1,87 @@
+"""列表接口的键集（cursor）分页。
+
+offset(skip) 分页需要数据库先扫描并丢弃前 skip 行，翻得越深越慢。
+游标模式按 (created_at DESC, id DESC) 排序，用上一页最后一行的 (created_at, id)
+作为下一页的起点（WHERE created_at < ? OR (created_at = ? AND id < ?)），
+配合 (过滤列..., created_at, id) 复合索引，任意深度的分页代价都与第一页相同。
+
+使用方式（可选开启，不传 cursor 时仍是原来的 skip/limit）：
+- 第一页传 cursor=（空字符串），之后传响应中的下一页游标
+- 列表接口通过响应头 X-Next-Cursor 返回下一页游标，对象响应另有 next_cursor 字段
+- 没有更多数据时不返回游标
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Annotated, Any, Collection, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+CursorParam = Annotated[
+    Optional[str],
+    Query(description="Opaque cursor for keyset pagination; pass an empty value for the first page"),
+]
+
+
+def encode_cursor(created_at: datetime, *keys: Any) -> str:
+    """把排序键编码为不透明的游标字符串。"""
+    payload = json.dumps([created_at.isoformat(), *keys], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sources: Optional[Collection[str]] = None) -> tuple:
+    """解析游标，格式错误时返回 400。
+
+    游标为 (created_at, id)；给出 sources 时为 (created_at, 来源, id)，来源必须是其中之一。
+    id 必须是整数，不会把任意 JSON 值带进 SQL 参数。
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != (2 if sources is None else 3):
+            raise ValueError("unexpected cursor size")
+        row_id = values[-1]
+        if not isinstance(row_id, int) or isinstance(row_id, bool):
+            raise ValueError("cursor id must be an integer")
+        if sources is not None and (not isinstance(values[1], str) or values[1] not in sources):
+            raise ValueError("unknown cursor source")
+        return (datetime.fromisoformat(values[0]), *values[1:])
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def after_key(created_col, id_col, created_at: datetime, row_id: int):
+    """(created_at, id) 降序中位于给定位置之后的行。"""
+    return or_(
+        created_col < created_at,
+        and_(created_col == created_at, id_col < row_id),
+    )
+
+
+def keyset_query(query, created_col, id_col, cursor: str, limit: int):
+    """为查询加上游标条件、稳定排序，并多取一行用于判断是否还有下一页。"""
+    query = query.order_by(created_col.desc(), id_col.desc())
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.where(after_key(created_col, id_col, created_at, row_id))
+    return query.limit(limit + 1)
+
+
+def page_rows(rows: Sequence, limit: int, key=lambda row: (row.created_at, row.id)):
+    """截取一页数据，返回 (当前页, 下一页游标或 None)。"""
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    return page, encode_cursor(*key(page[-1]))
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """通过响应头返回下一页游标（列表响应体保持不变）。"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
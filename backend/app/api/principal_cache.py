@@ -0,0 +1,70 @@
+"""已认证用户（principal）缓存。
+
+每个需要登录的请求都会在 get_current_user 中执行 select(User).where(User.id == ...)，
+这是系统中执行次数最多的查询。这里按 user_id 缓存用户行的快照（PRINCIPAL_CACHE_TTL 秒，0 表示关闭）：
+- 命中时用 session.merge(..., load=False) 把快照挂到本次请求的会话上，不发 SELECT；
+  接口对 current_user 的修改照常随会话提交（按主键 UPDATE）
+- 修改用户的接口（资料、密码、状态、批量更新、删除）在提交后调用 invalidate；
+  多 worker 时通过 backplane 频道 campus_hub:principals 同步失效
+- 令牌本身（签名、过期）每次请求仍会校验；令牌不含 jti，因此缓存只按 user_id 区分
+"""
+from typing import Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import BackplaneCache
+from app.core.config import settings
+from app.models.user import User
+
+PRINCIPAL_CHANNEL = "campus_hub:principals"
+# 缓存的用户数上限，超出时先淘汰过期条目，仍不足则清空（见 BackplaneCache）
+MAX_CACHED_PRINCIPALS = 10000
+
+_USER_COLUMNS = [attr.key for attr in inspect(User).column_attrs]
+
+
+def _snapshot(user: User) -> User:
+    """复制用户行为一个脱离会话、状态干净的实例，可安全地在多个会话间 merge。"""
+    copy = User(**{key: getattr(user, key) for key in _USER_COLUMNS})
+    make_transient_to_detached(copy)
+    return copy
+
+
+class PrincipalCache(BackplaneCache):
+    """进程内的 user_id -> 用户快照缓存。"""
+
+    channel = PRINCIPAL_CHANNEL
+
+    def __init__(self, ttl: float | None = None):
+        super().__init__(
+            settings.PRINCIPAL_CACHE_TTL if ttl is None else ttl,
+            max_entries=MAX_CACHED_PRINCIPALS,
+        )
+
+    def put(self, user: User, generation: int):
+        """缓存用户快照（generation 为开始加载前读取的 self.generation）。"""
+        super().put(user.id, _snapshot(user), generation)
+
+    async def load(self, db: AsyncSession, user_id: int) -> Optional[User]:
+        """返回挂在 db 会话上的用户：缓存命中时不查询数据库。"""
+        cached = self.get(user_id)
+        if cached is not None:
+            return await db.merge(cached, load=False)
+        generation = self.generation
+        user = await db.get(User, user_id)
+        if user is not None:
+            self.put(user, generation)
+        return user
+
+    async def invalidate(self, *user_ids: int):
+        """用户被修改或删除后调用（本进程立即生效，并通知其他 worker）。"""
+        if not user_ids:
+            return
+        self._drop(user_ids)
+        await self._publish(",".join(str(user_id) for user_id in user_ids))
+
+
+# 模块级单例
+principal_cache = PrincipalCache()
@@ -0,0 +1,52 @@
+"""失物招领发布者信息解析。
+
+列表接口过去对每个物品单独执行一次 select(User)，一页 100 条需要 101 次查询。
+这里统一按 created_by 批量解析：收集一页中的全部用户 ID，用一条 IN 查询只取
+隐私相关的列，再按用户的隐私设置生成 PublisherInfo。
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.schemas.lost_item import PublisherInfo
+
+# 构造 PublisherInfo 所需的列（不加载完整的 User 对象）
+PUBLISHER_COLUMNS = (
+    User.id,
+    User.name,
+    User.avatar,
+    User.email,
+    User.phone,
+    User.show_name_in_lost_item,
+    User.show_avatar_in_lost_item,
+    User.show_email_in_lost_item,
+    User.show_phone_in_lost_item,
+)
+
+
+def publisher_info(user) -> PublisherInfo:
+    """按隐私设置生成发布者信息（user 可以是 User 对象或 PUBLISHER_COLUMNS 查询行）。"""
+    return PublisherInfo(
+        id=user.id,
+        name=user.name if user.show_name_in_lost_item else None,
+        avatar=user.avatar if user.show_avatar_in_lost_item else None,
+        email=user.email if user.show_email_in_lost_item else None,
+        phone=user.phone if user.show_phone_in_lost_item else None,
+    )
+
+
+async def load_publishers(db: AsyncSession, user_ids: Iterable[Optional[int]]) -> dict[int, PublisherInfo]:
+    """一次 IN 查询解析一组发布者，返回 user_id -> PublisherInfo。"""
+    ids = {user_id for user_id in user_ids if user_id}
+    if not ids:
+        return {}
+    result = await db.execute(select(*PUBLISHER_COLUMNS).where(User.id.in_(ids)))
+    return {row.id: publisher_info(row) for row in result.all()}
+
+
+async def load_publisher(db: AsyncSession, user_id: Optional[int]) -> Optional[PublisherInfo]:
+    """解析单个发布者（用户不存在时返回 None）。"""
+    publishers = await load_publishers(db, [user_id])
+    return publishers.get(user_id)
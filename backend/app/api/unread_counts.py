@@ -0,0 +1,368 @@
+"""未读通知计数。
+
+count_unread 每次执行两条 COUNT 查询（个人通知 + 广播），是调用最频繁的查询之一。现在分两层：
+
+1. 物化计数表 user_unread_counters：新通知、标记已读、全部已读、删除、广播扇出在同一事务内
+   原子增减（UPDATE ... SET unread_count = unread_count ± 1），读取只需一次主键查询；
+   用户还没有计数行时从源表计算一次并写入，repair_unread_counters 按批次重算修正偏差
+2. 进程内 UnreadCounter 缓存：
+
+- 首次使用或超过 UNREAD_COUNT_TTL 后重新读取计数行（对账），其余时间按增量更新
+- 写操作（新通知、标记已读、删除）提交后调用 apply / reset 得到新的未读数，随推送和响应一起返回
+- 多 worker 部署时通过 backplane 通知其他进程：单个用户的变更使其缓存失效，广播使所有缓存 +1
+"""
+import asyncio
+import logging
+from typing import Annotated, Iterable
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+from sqlalchemy import select, update, delete, func, case, and_, or_, bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import BackplaneCache
+from app.core.config import settings
+from app.db.database import get_db, async_session_maker
+from app.models.user import User
+from app.models.user_notification import UserNotification
+from app.models.broadcast_notification import BroadcastNotification
+from app.models.broadcast_receipt import BroadcastReceipt
+from app.models.user_notification_state import UserNotificationState
+from app.models.user_unread_counter import UserUnreadCounter
+from app.api.deps import get_current_admin
+
+logger = logging.getLogger(__name__)
+
+CurrentAdmin = Annotated[User, Depends(get_current_admin)]
+DatabaseSession = Annotated[AsyncSession, Depends(get_db)]
+
+router = APIRouter(prefix="/api/unread-counters", tags=["Unread-Counters"])
+
+# backplane 频道名：消息格式为 "<来源进程>\n<目标>"，目标为 "*"（广播 +1）或 user_id（失效）
+UNREAD_CHANNEL = "campus_hub:unread"
+BROADCAST_TARGET = "*"
+
+# 缓存条目超过该数量时先清理过期条目，仍不足则清空（见 BackplaneCache）
+MAX_CACHED_USERS = 10000
+
+# 修复任务每批处理的用户数
+REPAIR_BATCH_SIZE = 1000
+
+
+async def get_broadcast_watermark(db: AsyncSession, user_id: int) -> int:
+    """Return the id up to which the user has read all broadcasts."""
+    result = await db.execute(
+        select(UserNotificationState.broadcast_read_upto)
+        .where(UserNotificationState.user_id == user_id)
+    )
+    return result.scalar() or 0
+
+
+def visible_broadcasts(user: User):
+    """Broadcasts visible to a user, joined with the user's receipt (if any).
+
+    Users only see broadcasts published after they registered, and never
+    see broadcasts they dismissed.
+    """
+    return (
+        select(BroadcastNotification, BroadcastReceipt.is_read)
+        .outerjoin(
+            BroadcastReceipt,
+            and_(
+                BroadcastReceipt.broadcast_id == BroadcastNotification.id,
+                BroadcastReceipt.user_id == user.id,
+            ),
+        )
+        .where(BroadcastNotification.created_at >= user.created_at)
+        .where(or_(BroadcastReceipt.id.is_(None), BroadcastReceipt.is_dismissed == False))
+    )
+
+
+async def count_unread(db: AsyncSession, user: User) -> int:
+    """Count unread personal notifications plus unread visible broadcasts."""
+    personal_result = await db.execute(
+        select(func.count(UserNotification.id))
+        .where(UserNotification.user_id == user.id)
+        .where(UserNotification.is_read == False)
+    )
+
+    watermark = await get_broadcast_watermark(db, user.id)
+    broadcast_result = await db.execute(
+        visible_broadcasts(user)
+        .with_only_columns(func.count(BroadcastNotification.id))
+        .where(BroadcastNotification.id > watermark)
+        .where(or_(BroadcastReceipt.id.is_(None), BroadcastReceipt.is_read == False))
+    )
+    return (personal_result.scalar() or 0) + (broadcast_result.scalar() or 0)
+
+
+async def read_unread_counter(db: AsyncSession, user_id: int, user: User | None = None) -> int:
+    """主键读取物化未读数；用户还没有计数行时从源表计算并写入（不提交，由调用方提交）。"""
+    result = await db.execute(
+        select(UserUnreadCounter.unread_count).where(UserUnreadCounter.user_id == user_id)
+    )
+    count = result.scalar()
+    if count is not None:
+        return count
+
+    if user is None:
+        user = await db.get(User, user_id)
+        if user is None:
+            return 0
+    count = await count_unread(db, user)
+    try:
+        async with db.begin_nested():
+            db.add(UserUnreadCounter(user_id=user_id, unread_count=count))
+    except IntegrityError:
+        # 并发请求已初始化计数行，以已写入的值为准
+        result = await db.execute(
+            select(UserUnreadCounter.unread_count).where(UserUnreadCounter.user_id == user_id)
+        )
+        return result.scalar() or 0
+    return count
+
+
+async def adjust_unread_counter(db: AsyncSession, user_id: int, delta: int) -> None:
+    """在当前事务中原子增减未读数（不提交，不会减到负数）。
+
+    用户还没有计数行时跳过：首次读取时会从源表计算，已包含本次变更。
+    """
+    if not delta:
+        return
+    new_count = UserUnreadCounter.unread_count + delta
+    await db.execute(
+        update(UserUnreadCounter)
+        .where(UserUnreadCounter.user_id == user_id)
+        .values(unread_count=case((new_count < 0, 0), else_=new_count))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def reset_unread_counter(db: AsyncSession, user_id: int, count: int = 0) -> None:
+    """在当前事务中直接设置未读数（全部已读）。"""
+    await db.merge(UserUnreadCounter(user_id=user_id, unread_count=count))
+
+
+async def delete_notification_state(db: AsyncSession, user_ids: Iterable[int]) -> None:
+    """删除用户前调用：在同一事务中删除计数行、广播已读水位与回执（不提交）。
+
+    这些表的外键没有 ON DELETE，留着它们会使删除用户违反外键约束。
+    """
+    user_ids = list(user_ids)
+    for model in (UserUnreadCounter, UserNotificationState, BroadcastReceipt):
+        await db.execute(delete(model).where(model.user_id.in_(user_ids)))
+
+
+async def increment_all_unread_counters(db: AsyncSession) -> int:
+    """新广播对所有现有用户可见：一条 UPDATE 为全部计数行 +1，返回更新的行数。"""
+    result = await db.execute(
+        update(UserUnreadCounter)
+        .values(unread_count=UserUnreadCounter.unread_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+_counters = UserUnreadCounter.__table__
+GUARDED_COUNTER_UPDATE = (
+    update(_counters)
+    .where(_counters.c.user_id == bindparam("counter_user_id"))
+    .where(_counters.c.unread_count == bindparam("observed"))
+    .values(unread_count=bindparam("expected"))
+)
+
+
+async def repair_unread_counters(db: AsyncSession, batch_size: int = REPAIR_BATCH_SIZE) -> dict:
+    """按用户 ID 分批从源表重算未读数，修正偏差并补齐缺失的计数行。
+
+    每批三条聚合查询（现有计数、个人未读、广播未读），与用户数无关。
+    修正时以读取到的计数为条件（WHERE unread_count = 读取值）：重算期间有并发
+    adjust_unread_counter 提交的行不会被旧的重算结果覆盖，留待下一次修复。
+    """
+    checked = created = corrected = 0
+    last_id = 0
+    while True:
+        user_result = await db.execute(
+            select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+        )
+        user_ids = list(user_result.scalars().all())
+        if not user_ids:
+            break
+        last_id = user_ids[-1]
+
+        # 先读取现有计数，再重算；两者之间提交的变更会让下面的条件更新不匹配
+        counter_result = await db.execute(
+            select(UserUnreadCounter.user_id, UserUnreadCounter.unread_count)
+            .where(UserUnreadCounter.user_id.in_(user_ids))
+        )
+        current = dict(counter_result.all())
+
+        personal_result = await db.execute(
+            select(UserNotification.user_id, func.count(UserNotification.id))
+            .where(UserNotification.user_id.in_(user_ids))
+            .where(UserNotification.is_read == False)
+            .group_by(UserNotification.user_id)
+        )
+        expected = dict(personal_result.all())
+
+        broadcast_result = await db.execute(
+            select(User.id, func.count(BroadcastNotification.id))
+            .join(BroadcastNotification, BroadcastNotification.created_at >= User.created_at)
+            .outerjoin(UserNotificationState, UserNotificationState.user_id == User.id)
+            .outerjoin(
+                BroadcastReceipt,
+                and_(
+                    BroadcastReceipt.broadcast_id == BroadcastNotification.id,
+                    BroadcastReceipt.user_id == User.id,
+                ),
+            )
+            .where(User.id.in_(user_ids))
+            .where(BroadcastNotification.id > func.coalesce(UserNotificationState.broadcast_read_upto, 0))
+            .where(or_(
+                BroadcastReceipt.id.is_(None),
+                and_(BroadcastReceipt.is_read == False, BroadcastReceipt.is_dismissed == False),
+            ))
+            .group_by(User.id)
+        )
+        for user_id, count in broadcast_result.all():
+            expected[user_id] = expected.get(user_id, 0) + count
+
+        updates = []
+        for user_id in user_ids:
+            count = expected.get(user_id, 0)
+            if user_id not in current:
+                db.add(UserUnreadCounter(user_id=user_id, unread_count=count))
+                created += 1
+            elif current[user_id] != count:
+                updates.append({"counter_user_id": user_id, "observed": current[user_id], "expected": count})
+        if updates:
+            result = await db.execute(GUARDED_COUNTER_UPDATE, updates)
+            corrected += result.rowcount
+        await db.commit()
+        checked += len(user_ids)
+
+    unread_counter.clear()
+    logger.info(
+        "Unread counter repair: checked=%d, created=%d, corrected=%d",
+        checked, created, corrected,
+    )
+    return {"checked": checked, "created": created, "corrected": corrected}
+
+
+class UnreadCounter(BackplaneCache):
+    """进程内的每用户未读数缓存，定期与数据库对账。
+
+    条目的写入时间即上次从数据库对账的时间，增量更新不改变它。
+    """
+
+    channel = UNREAD_CHANNEL
+
+    def __init__(self, ttl: float | None = None):
+        super().__init__(
+            settings.UNREAD_COUNT_TTL if ttl is None else ttl,
+            max_entries=MAX_CACHED_USERS,
+        )
+
+    def _store(self, user_id: int, count: int, reconciled_at: float | None = None):
+        super()._store(user_id, max(0, count), reconciled_at)
+
+    async def _load(self, db: AsyncSession, user_id: int, user: User | None) -> int:
+        self.misses += 1
+        count = await read_unread_counter(db, user_id, user)
+        self._store(user_id, count)
+        return count
+
+    async def get(self, db: AsyncSession, user_id: int, user: User | None = None) -> int:
+        """返回用户未读数：缓存有效时直接返回，否则读取物化计数行。"""
+        count = self._fresh(user_id)
+        if count is not None:
+            self.hits += 1
+            return count
+        return await self._load(db, user_id, user)
+
+    async def apply(self, db: AsyncSession, user_id: int, delta: int, user: User | None = None) -> int:
+        """在已提交的变更之后调整缓存中的未读数并返回新值。
+
+        计数行已由 adjust_unread_counter 在同一事务中更新；缓存未命中时直接读取计数行
+        （结果已包含本次变更，不再叠加 delta）。
+        """
+        count = self._fresh(user_id)
+        if count is None:
+            count = await self._load(db, user_id, user)
+        else:
+            self.hits += 1
+            count = max(0, count + delta)
+            self._entries[user_id] = (count, self._entries[user_id][1])
+        await self._publish(str(user_id))
+        return count
+
+    async def reset(self, user_id: int, count: int = 0) -> int:
+        """全部已读等操作后直接设置未读数。"""
+        self._store(user_id, count)
+        await self._publish(str(user_id))
+        return count
+
+    async def broadcast_published(self):
+        """新广播对所有现有用户可见：所有缓存条目 +1。"""
+        self._bump_all()
+        await self._publish(BROADCAST_TARGET)
+
+    def _bump_all(self):
+        for user_id, (count, reconciled_at) in list(self._entries.items()):
+            self._entries[user_id] = (count + 1, reconciled_at)
+
+    def _on_remote(self, target: str):
+        if target == BROADCAST_TARGET:
+            self._bump_all()
+        else:
+            super()._on_remote(target)
+
+
+# 模块级单例
+unread_counter = UnreadCounter()
+
+
+class RepairScheduler:
+    """按 UNREAD_COUNTER_REPAIR_INTERVAL 周期运行修复任务（0 表示关闭）。"""
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        if settings.UNREAD_COUNTER_REPAIR_INTERVAL > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run(settings.UNREAD_COUNTER_REPAIR_INTERVAL))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with async_session_maker() as db:
+                    await repair_unread_counters(db)
+            except Exception as e:
+                logger.error("Unread counter repair failed: %s", e)
+
+
+repair_scheduler = RepairScheduler()
+
+
+class RepairResponse(BaseModel):
+    """未读数修复结果。"""
+    checked: int
+    created: int
+    corrected: int
+
+
+@router.post("/repair", response_model=RepairResponse)
+async def repair_counters(
+    current_admin: CurrentAdmin = None,
+    db: DatabaseSession = None,
+):
+    """从源表重算所有用户的未读数（admin only）。"""
+    return RepairResponse(**await repair_unread_counters(db))
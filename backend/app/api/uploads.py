@@ -4,17 +4,11 @@ File upload API endpoint for handling image uploads.
 import os
 import uuid
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Annotated
+from fastapi import APIRouter, UploadFile, File, HTTPException
 
-from app.db.database import get_db
 from app.core.config import settings
 
 
-# Type aliases for this file
-DatabaseSession = Annotated[AsyncSession, Depends(get_db)]
-
 router = APIRouter(prefix="/api/upload", tags=["upload"])
 
 # Allowed image file types
@@ -66,7 +60,6 @@ def generate_unique_filename(original_filename: str) -> str:
 @router.post("/image")
 async def upload_image(
     file: UploadFile = File(...),
-    db: DatabaseSession = None,
 ) -> dict:
     """
     Upload a single image file.
@@ -110,7 +103,6 @@ async def upload_image(
 @router.post("/document")
 async def upload_document(
     file: UploadFile = File(...),
-    db: DatabaseSession = None,
 ) -> dict:
     """
     Upload a document file (PDF, PPT, PPTX, DOC, DOCX).
@@ -153,7 +145,6 @@ async def upload_document(
 @router.delete("/image/{filename}")
 async def delete_image(
     filename: str,
-    db: DatabaseSession = None,
 ) -> dict:
     """
     Delete an uploaded image file.
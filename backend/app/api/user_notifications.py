@@ -1,14 +1,37 @@
 """
 User notification API endpoints for personal notifications.
+
+A user's inbox merges personal UserNotification rows with shared
+BroadcastNotification rows; broadcast read state comes from the user's
+watermark plus sparse BroadcastReceipt rows.
+
+Unread counts are served from the materialised user_unread_counters row
+(adjusted in the same transaction as each write) behind the in-memory
+UnreadCounter, see app/api/unread_counts.py; every write returns the new
+count and pushes it to the user's other devices.
 """
-from typing import List, Annotated
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from datetime import datetime, timezone
+from typing import List, Annotated, Literal, Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, update, func
 
 from app.db.database import get_db
 from app.models.user import User
 from app.models.user_notification import UserNotification
+from app.models.broadcast_notification import BroadcastNotification
+from app.models.broadcast_receipt import BroadcastReceipt
+from app.models.user_notification_state import UserNotificationState
+from app.api.unread_counts import (
+    get_broadcast_watermark,
+    visible_broadcasts,
+    count_unread,
+    unread_counter,
+    adjust_unread_counter,
+    reset_unread_counter,
+)
+from app.api.ws import push_unread_count
+from app.api.pagination import CursorParam, decode_cursor, after_key, page_rows, set_next_cursor
 from app.schemas.user_notification import (
     UserNotificationResponse,
     UserNotificationUpdate,
@@ -20,27 +43,142 @@ from app.api.deps import get_current_user
 # Type aliases for this file
 CurrentUser = Annotated[User, Depends(get_current_user)]
 DatabaseSession = Annotated[AsyncSession, Depends(get_db)]
+NotificationSource = Literal["personal", "broadcast"]
 
 router = APIRouter(prefix="/api/notifications/me", tags=["user-notifications"])
 
 
+def broadcast_response(
+    broadcast: BroadcastNotification,
+    user_id: int,
+    receipt_read: bool | None,
+    watermark: int,
+) -> UserNotificationResponse:
+    """Build the per-user view of a broadcast notification."""
+    return UserNotificationResponse(
+        id=broadcast.id,
+        user_id=user_id,
+        type=broadcast.type,
+        title=broadcast.title,
+        content=broadcast.content,
+        link_url=broadcast.link_url,
+        is_read=broadcast.id <= watermark or bool(receipt_read),
+        created_at=broadcast.created_at,
+        related_id=broadcast.related_id,
+        source="broadcast",
+    )
+
+
+async def get_visible_broadcast(db: AsyncSession, user: User, broadcast_id: int):
+    """Fetch a single visible broadcast with the user's receipt read flag."""
+    result = await db.execute(
+        visible_broadcasts(user).where(BroadcastNotification.id == broadcast_id)
+    )
+    row = result.first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification not found"
+        )
+    return row
+
+
+async def broadcast_is_read(
+    db: AsyncSession,
+    user_id: int,
+    broadcast: BroadcastNotification,
+    receipt_read: bool | None,
+) -> bool:
+    """Whether the user has already read a broadcast (watermark or receipt)."""
+    if receipt_read:
+        return True
+    return broadcast.id <= await get_broadcast_watermark(db, user_id)
+
+
+async def update_unread_count(db: AsyncSession, user: User, delta: int) -> int:
+    """Apply a committed change to the user's unread count and sync their devices."""
+    unread_count = await unread_counter.apply(db, user.id, delta, user)
+    if delta:
+        await push_unread_count(user.id, unread_count)
+    return unread_count
+
+
+async def upsert_receipt(db: AsyncSession, user_id: int, broadcast_id: int, **values) -> None:
+    """Create or update the user's receipt for a broadcast."""
+    result = await db.execute(
+        select(BroadcastReceipt)
+        .where(BroadcastReceipt.user_id == user_id)
+        .where(BroadcastReceipt.broadcast_id == broadcast_id)
+    )
+    receipt = result.scalar_one_or_none()
+    if receipt is None:
+        receipt = BroadcastReceipt(user_id=user_id, broadcast_id=broadcast_id)
+        db.add(receipt)
+    for field, value in values.items():
+        setattr(receipt, field, value)
+
+
 @router.get("", response_model=List[UserNotificationResponse])
 async def get_my_notifications(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 10,
+    cursor: CursorParam = None,
+    response: Response = None,
 ):
-    """Get current user's notifications."""
-    result = await db.execute(
-        select(UserNotification)
-        .where(UserNotification.user_id == current_user.id)
-        .order_by(UserNotification.created_at.desc())
-        .offset(skip)
-        .limit(limit)
+    """Get current user's notifications (personal + broadcast, newest first).
+
+    Items are ordered by (created_at, source, id) descending, personal
+    before broadcast on equal timestamps. Pass ``cursor`` to use keyset
+    pagination; the next page's cursor is returned in the X-Next-Cursor
+    header.
+    """
+    personal_query = select(UserNotification).where(UserNotification.user_id == current_user.id)
+    broadcast_query = visible_broadcasts(current_user)
+
+    if cursor is not None:
+        window = limit + 1
+        if cursor:
+            created_at, source, row_id = decode_cursor(cursor, sources=("personal", "broadcast"))
+            if source == "personal":
+                personal_query = personal_query.where(
+                    after_key(UserNotification.created_at, UserNotification.id, created_at, row_id)
+                )
+                broadcast_query = broadcast_query.where(BroadcastNotification.created_at <= created_at)
+            else:
+                personal_query = personal_query.where(UserNotification.created_at < created_at)
+                broadcast_query = broadcast_query.where(
+                    after_key(BroadcastNotification.created_at, BroadcastNotification.id, created_at, row_id)
+                )
+    else:
+        window = skip + limit
+
+    personal_result = await db.execute(
+        personal_query
+        .order_by(UserNotification.created_at.desc(), UserNotification.id.desc())
+        .limit(window)
     )
-    notifications = result.scalars().all()
-    return [UserNotificationResponse.model_validate(n) for n in notifications]
+    items = [UserNotificationResponse.model_validate(n) for n in personal_result.scalars().all()]
+
+    watermark = await get_broadcast_watermark(db, current_user.id)
+    broadcast_result = await db.execute(
+        broadcast_query
+        .order_by(BroadcastNotification.created_at.desc(), BroadcastNotification.id.desc())
+        .limit(window)
+    )
+    for broadcast, receipt_read in broadcast_result.all():
+        items.append(broadcast_response(broadcast, current_user.id, receipt_read, watermark))
+
+    items.sort(key=lambda n: (n.created_at, n.source == "personal", n.id), reverse=True)
+
+    if cursor is not None:
+        items, next_cursor = page_rows(
+            items[:window], limit, key=lambda n: (n.created_at, n.source, n.id)
+        )
+        set_next_cursor(response, next_cursor)
+        return items
+    return items[skip:window]
 
 
 @router.get("/unread-count", response_model=UnreadCountResponse)
@@ -49,22 +187,29 @@ async def get_unread_count(
     db: DatabaseSession = None,
 ):
     """Get current user's unread notification count."""
-    result = await db.execute(
-        select(func.count(UserNotification.id))
-        .where(UserNotification.user_id == current_user.id)
-        .where(UserNotification.is_read == False)
+    return UnreadCountResponse(
+        unread_count=await unread_counter.get(db, current_user.id, current_user)
     )
-    count = result.scalar() or 0
-    return UnreadCountResponse(unread_count=count)
 
 
 @router.patch("/{notification_id}/read", response_model=UserNotificationResponse)
 async def mark_notification_read(
     notification_id: int,
+    source: NotificationSource = Query("personal", description="personal or broadcast"),
     current_user: CurrentUser = None,
     db: DatabaseSession = None,
 ):
     """Mark a notification as read."""
+    if source == "broadcast":
+        broadcast, receipt_read = await get_visible_broadcast(db, current_user, notification_id)
+        delta = 0 if await broadcast_is_read(db, current_user.id, broadcast, receipt_read) else -1
+        await upsert_receipt(db, current_user.id, notification_id, is_read=True)
+        await adjust_unread_counter(db, current_user.id, delta)
+        await db.commit()
+        response = broadcast_response(broadcast, current_user.id, True, 0)
+        response.unread_count = await update_unread_count(db, current_user, delta)
+        return response
+
     result = await db.execute(
         select(UserNotification)
         .where(UserNotification.id == notification_id)
@@ -78,41 +223,95 @@ async def mark_notification_read(
             detail="Notification not found"
         )
 
+    delta = 0 if notification.is_read else -1
     notification.is_read = True
+    await adjust_unread_counter(db, current_user.id, delta)
     await db.commit()
     await db.refresh(notification)
 
-    return UserNotificationResponse.model_validate(notification)
+    response = UserNotificationResponse.model_validate(notification)
+    response.unread_count = await update_unread_count(db, current_user, delta)
+    return response
 
 
 @router.post("/read-all")
 async def mark_all_read(
+    up_to: Optional[datetime] = Query(
+        None,
+        description="Only mark notifications created at or before this time (e.g. the newest one the client has shown)",
+    ),
     current_user: CurrentUser = None,
     db: DatabaseSession = None,
 ):
-    """Mark all notifications as read for current user."""
-    result = await db.execute(
-        select(UserNotification)
+    """Mark all notifications as read for current user.
+
+    Personal notifications are flipped with a single UPDATE ... WHERE and
+    broadcasts by moving the read watermark, so the cost does not depend on
+    how many notifications are unread.
+    """
+    personal_update = (
+        update(UserNotification)
         .where(UserNotification.user_id == current_user.id)
         .where(UserNotification.is_read == False)
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
     )
-    notifications = result.scalars().all()
+    latest_query = select(func.max(BroadcastNotification.id))
+    if up_to is not None:
+        # Stored timestamps are naive UTC
+        if up_to.tzinfo is not None:
+            up_to = up_to.astimezone(timezone.utc).replace(tzinfo=None)
+        personal_update = personal_update.where(UserNotification.created_at <= up_to)
+        latest_query = latest_query.where(BroadcastNotification.created_at <= up_to)
+
+    result = await db.execute(personal_update)
+    marked = result.rowcount
 
-    for notification in notifications:
-        notification.is_read = True
+    # Broadcasts: move the read watermark instead of writing one row per broadcast
+    latest_result = await db.execute(latest_query)
+    latest_broadcast_id = latest_result.scalar() or 0
+    state = await db.get(UserNotificationState, current_user.id)
+    if state is None:
+        db.add(UserNotificationState(user_id=current_user.id, broadcast_read_upto=latest_broadcast_id))
+    elif state.broadcast_read_upto < latest_broadcast_id:
+        state.broadcast_read_upto = latest_broadcast_id
 
+    if up_to is None:
+        unread_count = 0
+    else:
+        # Newer notifications stay unread: recount once instead of tracking deltas
+        await db.flush()
+        unread_count = await count_unread(db, current_user)
+    await reset_unread_counter(db, current_user.id, unread_count)
     await db.commit()
 
-    return {"message": f"Marked {len(notifications)} notifications as read"}
+    unread_count = await unread_counter.reset(current_user.id, unread_count)
+    await push_unread_count(current_user.id, unread_count)
+
+    return {
+        "message": f"Marked {marked} notifications as read",
+        "unread_count": unread_count,
+    }
 
 
 @router.delete("/{notification_id}")
 async def delete_notification(
     notification_id: int,
+    source: NotificationSource = Query("personal", description="personal or broadcast"),
     current_user: CurrentUser = None,
     db: DatabaseSession = None,
 ):
     """Delete a notification."""
+    if source == "broadcast":
+        # Broadcasts are shared: hide it for this user only
+        broadcast, receipt_read = await get_visible_broadcast(db, current_user, notification_id)
+        delta = 0 if await broadcast_is_read(db, current_user.id, broadcast, receipt_read) else -1
+        await upsert_receipt(db, current_user.id, notification_id, is_dismissed=True)
+        await adjust_unread_counter(db, current_user.id, delta)
+        await db.commit()
+        unread_count = await update_unread_count(db, current_user, delta)
+        return {"message": "Notification deleted", "unread_count": unread_count}
+
     result = await db.execute(
         select(UserNotification)
         .where(UserNotification.id == notification_id)
@@ -126,7 +325,10 @@ async def delete_notification(
             detail="Notification not found"
         )
 
+    delta = 0 if notification.is_read else -1
     await db.delete(notification)
+    await adjust_unread_counter(db, current_user.id, delta)
     await db.commit()
 
-    return {"message": "Notification deleted"}
+    unread_count = await update_unread_count(db, current_user, delta)
+    return {"message": "Notification deleted", "unread_count": unread_count}
@@ -1,13 +1,10 @@
 from typing import Annotated, Optional
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-import pandas as pd
-import io
+from sqlalchemy import select, update, func
 import datetime
 
-from app.core.security import verify_password, get_password_hash
+from app.core.security import verify_password_async, get_password_hash_async
 from app.db.database import get_db
 from app.models.user import User
 from app.schemas.user import (
@@ -15,6 +12,12 @@ from app.schemas.user import (
     UserStatusUpdate, UserBulkDelete, UserBulkUpdate
 )
 from app.api.deps import get_current_user, get_current_admin
+from app.api.principal_cache import principal_cache
+from app.api.unread_counts import delete_notification_state
+from app.api.pagination import CursorParam, keyset_query, page_rows, set_next_cursor
+from app.api.exports import ExportColumn, ExportFormat, export_response, format_datetime
+from app.api.export_jobs import ExportJobResponse, export_job_engine
+from app.api.user_import import import_roster
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
@@ -43,6 +46,7 @@ async def update_current_user_profile(
         setattr(current_user, field, value)
 
     await db.commit()
+    await principal_cache.invalidate(current_user.id)
     await db.refresh(current_user)
 
     return UserResponse.model_validate(current_user)
@@ -56,15 +60,16 @@ async def change_password(
 ):
     """Change user password."""
     # Verify old password
-    if not verify_password(password_data.old_password, current_user.hashed_password):
+    if not await verify_password_async(password_data.old_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect password"
         )
 
     # Update password
-    current_user.hashed_password = get_password_hash(password_data.new_password)
+    current_user.hashed_password = await get_password_hash_async(password_data.new_password)
     await db.commit()
+    await principal_cache.invalidate(current_user.id)
 
     return {"message": "Password changed successfully"}
 
@@ -76,10 +81,16 @@ async def get_users(
     search: Optional[str] = None,
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
+    cursor: CursorParam = None,
+    response: Response = None,
     current_admin: CurrentAdmin = None,
     db: DatabaseSession = None,
 ):
-    """Get all users with filtering options (admin only)."""
+    """Get all users with filtering options (admin only).
+
+    Pass ``cursor`` to use keyset pagination; the next page's cursor is
+    returned in the X-Next-Cursor header.
+    """
     query = select(User)
 
     # Apply filters
@@ -94,12 +105,71 @@ async def get_users(
     if is_active is not None:
         query = query.where(User.is_active == is_active)
 
-    query = query.offset(skip).limit(limit).order_by(User.created_at.desc())
+    if cursor is not None:
+        query = keyset_query(query, User.created_at, User.id, cursor, limit)
+    else:
+        query = query.offset(skip).limit(limit).order_by(User.created_at.desc(), User.id.desc())
     result = await db.execute(query)
     users = result.scalars().all()
+    if cursor is not None:
+        users, next_cursor = page_rows(users, limit)
+        set_next_cursor(response, next_cursor)
     return [UserResponse.model_validate(u) for u in users]
 
 
+# Columns of the user export; rows are projections of USER_EXPORT_QUERY
+USER_EXPORT_COLUMNS = [
+    ExportColumn("ID", lambda row: row.id),
+    ExportColumn("学号", lambda row: row.student_id),
+    ExportColumn("姓名", lambda row: row.name),
+    ExportColumn("邮箱", lambda row: row.email),
+    ExportColumn("角色", lambda row: row.role),
+    ExportColumn("专业", lambda row: row.major or ""),
+    ExportColumn("状态", lambda row: "启用" if row.is_active else "禁用"),
+    ExportColumn("注册时间", lambda row: format_datetime(row.created_at)),
+]
+
+USER_EXPORT_QUERY = select(
+    User.id, User.student_id, User.name, User.email,
+    User.role, User.major, User.is_active, User.created_at,
+).order_by(User.created_at.desc(), User.id.desc())
+
+
+# Must be defined BEFORE /{user_id}, otherwise "export" is parsed as a user id
+@router.get("/export")
+async def export_users(
+    export_format: ExportFormat = "xlsx",
+    current_admin: CurrentAdmin = None,
+):
+    """Export users to Excel or CSV (admin only).
+
+    Rows are streamed from the database in chunks; see ``app.api.exports``.
+    """
+    # Generate filename with timestamp
+    filename_stem = f"users_export_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    return await export_response(USER_EXPORT_QUERY, USER_EXPORT_COLUMNS, export_format, filename_stem, sheet_name='用户数据')
+
+
+@router.post("/export", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_users_export(
+    export_format: ExportFormat = "xlsx",
+    current_admin: CurrentAdmin = None,
+):
+    """Start a background user export (admin only).
+
+    Poll ``/api/exports/{id}`` or wait for the ``export_ready`` WebSocket
+    event, then download from ``/api/exports/{id}/download``.
+    """
+    job = export_job_engine.submit(
+        "users", {}, export_format,
+        USER_EXPORT_QUERY, USER_EXPORT_COLUMNS,
+        f"users_export_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}",
+        requested_by=current_admin.id,
+        sheet_name='用户数据',
+    )
+    return job.to_response()
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
@@ -135,10 +205,12 @@ async def import_users(
     Expected columns:
     - name (required)
     - email (required)
-    - student_id (optional)
-    - role (optional, defaults to 'user')
+    - student_id (required)
+    - role (optional, 'user' or 'admin', defaults to 'user')
     - major (optional)
     - password (optional, defaults to '123456')
+
+    Rows are validated in bulk and inserted in chunks; see ``app.api.user_import``.
     """
     # Check file type
     if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
@@ -148,68 +220,19 @@ async def import_users(
         )
 
     try:
-        # Read file
         content = await file.read()
-
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(content), encoding='utf-8')
-        else:
-            df = pd.read_excel(io.BytesIO(content))
-
-        # Validate required columns
-        required_columns = ['name', 'email']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Missing required columns: {', '.join(missing_columns)}"
-            )
-
-        # Import users
-        results = {
-            "success": 0,
-            "failed": 0,
-            "errors": []
-        }
-
-        for _, row in df.iterrows():
-            try:
-                # Check if email already exists
-                existing = await db.execute(
-                    select(User).where(User.email == str(row['email']).strip())
-                )
-                if existing.scalar_one_or_none():
-                    results["errors"].append(f"Row {_ + 2}: Email '{row['email']}' already exists")
-                    results["failed"] += 1
-                    continue
-
-                # Create user
-                user = User(
-                    name=str(row['name']).strip(),
-                    email=str(row['email']).strip().lower(),
-                    student_id=str(row.get('student_id', '')).strip() or None,
-                    role=str(row.get('role', 'user')).strip() if pd.notna(row.get('role')) else 'user',
-                    major=str(row.get('major', '')).strip() or None if pd.notna(row.get('major')) else None,
-                    hashed_password=get_password_hash(str(row.get('password', '123456')).strip()),
-                    is_verified=True
-                )
-
-                db.add(user)
-                await db.flush()
-                results["success"] += 1
-
-            except Exception as e:
-                results["failed"] += 1
-                results["errors"].append(f"Row {_ + 2}: {str(e)}")
-
+        results = await import_roster(db, content, file.filename)
         await db.commit()
-
         return results
 
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         await db.rollback()
-        if isinstance(e, HTTPException):
-            raise
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing file: {str(e)}"
@@ -238,6 +261,7 @@ async def update_user_status(
         user.is_active = status_data.is_active
 
     await db.commit()
+    await principal_cache.invalidate(user.id)
     await db.refresh(user)
 
     return UserResponse.model_validate(user)
@@ -249,25 +273,34 @@ async def bulk_update_users(
     current_admin: CurrentAdmin = None,
     db: DatabaseSession = None,
 ):
-    """Bulk update users (admin only)."""
-    result = await db.execute(
-        select(User).where(User.id.in_(bulk_data.user_ids))
-    )
-    users = result.scalars().all()
+    """Bulk update users (admin only).
 
-    if not users:
+    Applied with a single UPDATE ... WHERE id IN (...); the matched row count
+    is returned without loading the users.
+    """
+    values = bulk_data.model_dump(exclude={"user_ids"}, exclude_none=True)
+    if values:
+        result = await db.execute(
+            update(User)
+            .where(User.id.in_(bulk_data.user_ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        updated_count = result.rowcount
+    else:
+        result = await db.execute(
+            select(func.count(User.id)).where(User.id.in_(bulk_data.user_ids))
+        )
+        updated_count = result.scalar() or 0
+
+    if not updated_count:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No users found"
         )
 
-    updated_count = 0
-    for user in users:
-        if bulk_data.is_active is not None:
-            user.is_active = bulk_data.is_active
-        updated_count += 1
-
     await db.commit()
+    await principal_cache.invalidate(*bulk_data.user_ids)
 
     return {"updated": updated_count}
 
@@ -298,62 +331,18 @@ async def bulk_delete_users(
                 detail=f"Cannot delete admin user: {user.email}"
             )
 
+    await delete_notification_state(db, (user.id for user in users))
     deleted_count = 0
     for user in users:
         await db.delete(user)
         deleted_count += 1
 
     await db.commit()
+    await principal_cache.invalidate(*(user.id for user in users))
 
     return {"deleted": deleted_count}
 
 
-@router.get("/export")
-async def export_users(
-    current_admin: CurrentAdmin = None,
-    db: DatabaseSession = None,
-):
-    """Export users to Excel (admin only)."""
-    result = await db.execute(
-        select(User).order_by(User.created_at.desc())
-    )
-    users = result.scalars().all()
-
-    # Create DataFrame
-    data = []
-    for user in users:
-        data.append({
-            "ID": user.id,
-            "学号": user.student_id,
-            "姓名": user.name,
-            "邮箱": user.email,
-            "角色": user.role,
-            "专业": user.major or "",
-            "状态": "启用" if user.is_active else "禁用",
-            "注册时间": user.created_at.strftime("%Y-%m-%d %H:%M:%S")
-        })
-
-    df = pd.DataFrame(data)
-
-    # Convert to Excel
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='用户数据')
-
-    output.seek(0)
-
-    # Generate filename with timestamp
-    filename = f"users_export_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
-    )
-
-
 @router.delete("/{user_id}", response_model=dict)
 async def delete_user(
     user_id: int,
@@ -377,7 +366,9 @@ async def delete_user(
             detail="Cannot delete admin users"
         )
 
+    await delete_notification_state(db, [user.id])
     await db.delete(user)
     await db.commit()
+    await principal_cache.invalidate(user_id)
 
     return {"deleted": user_id}
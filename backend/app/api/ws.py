@@ -2,65 +2,328 @@
 
 提供基于 WebSocket 的实时通知推送能力，替代前端 30 秒轮询。
 使用内存字典管理在线用户连接，通过 JWT query parameter 认证。
+同一用户可同时保持多个连接（手机、电脑、多个标签页），推送会投递到该用户的全部连接。
+
+发送模型：每个连接拥有一个有界发送队列和独立的 writer 任务。
+推送方只负责把预先序列化好的文本放入队列（O(1)），慢客户端不会阻塞其他用户；
+队列满时按 WS_SLOW_CONSUMER_POLICY 丢弃最旧消息或断开该连接。
+
+心跳：由一个时间轮任务（HeartbeatWheel）统一调度，连接按 ID 分散到各个槽位，
+每 WS_HEARTBEAT_INTERVAL 秒向每个连接发送一次 "ping"；客户端的任何消息都会刷新 last_seen，
+只有超过 WS_HEARTBEAT_TIMEOUT 仍无响应的连接才会被回收，空闲但存活的连接不会被断开。
+
+跨进程：send_to_user / broadcast 先发布到 backplane（见 app/core/backplane.py），
+每个 worker 收到后只投递给自己持有的连接，因此多 worker / 多节点部署下推送同样可达。
 """
 import asyncio
+import itertools
+import json
 import logging
+import time
 from datetime import datetime
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from sqlalchemy import select, func
+from sqlalchemy import select
 
+from app.core.backplane import Backplane, InProcessBackplane, create_backplane
+from app.core.config import settings
 from app.core.security import decode_access_token
-from app.db.database import async_session_maker
+from app.db.database import async_session_maker, has_pending_writes
 from app.models.user import User
-from app.models.user_notification import UserNotification
+from app.api.unread_counts import unread_counter
+from app.api.principal_cache import principal_cache
+from app.api.feed_cache import feed_cache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# backplane 频道名
+WS_CHANNEL = "campus_hub:ws"
+# 广播目标标记（否则为逗号分隔的 user_id 列表）
+BROADCAST_TARGET = "*"
 
-class ConnectionManager:
-    """管理 WebSocket 连接，支持按 user_id 定向推送。"""
+# 进程内连接 ID 生成器
+_connection_ids = itertools.count(1)
+
+# 心跳时间轮槽位数：每个 tick 只检查一个槽位，把 ping 分散到整个心跳间隔内
+HEARTBEAT_WHEEL_SLOTS = 10
+HEARTBEAT_PING = "ping"
+
+
+def encode_message(message: dict) -> str:
+    """序列化推送消息（与 WebSocket.send_json 的编码方式一致）。"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+class Connection:
+    """单个 WebSocket 连接：有界发送队列 + 独立 writer 任务。"""
+
+    def __init__(self, manager: "ConnectionManager", user_id: int, websocket: WebSocket):
+        self.manager = manager
+        self.id = next(_connection_ids)
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE_SIZE)
+        self.dropped = 0
+        self.closed = False
+        self.last_seen = time.monotonic()
+        self._writer_task: asyncio.Task | None = None
+        self._close_task: asyncio.Task | None = None
+
+    def start(self):
+        self._writer_task = asyncio.create_task(self._writer())
+
+    def touch(self):
+        """收到客户端消息时刷新存活时间。"""
+        self.last_seen = time.monotonic()
+
+    def enqueue(self, text: str) -> bool:
+        """非阻塞入队。返回 False 表示连接已关闭或因慢消费被断开。"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if settings.WS_SLOW_CONSUMER_POLICY == "close":
+            logger.warning(
+                "WebSocket slow consumer closed: user_id=%d, connection_id=%d",
+                self.user_id, self.id,
+            )
+            self.close_nowait(1013, "slow_consumer")
+            return False
+
+        # drop_oldest：丢弃最旧的一条，保证最新消息能送达
+        try:
+            self.queue.get_nowait()
+            self.dropped += 1
+        except asyncio.QueueEmpty:
+            pass
+        self.queue.put_nowait(text)
+        return True
+
+    async def _writer(self):
+        try:
+            while True:
+                text = await self.queue.get()
+                await asyncio.wait_for(
+                    self.websocket.send_text(text),
+                    timeout=settings.WS_SEND_TIMEOUT,
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # 发送失败或超时：连接已不可用
+            await self.close(code=1011, reason="send_failed")
+
+    def stop(self):
+        """停止 writer 任务，之后的消息不再入队。"""
+        self.closed = True
+        if self._writer_task is not None and self._writer_task is not asyncio.current_task():
+            self._writer_task.cancel()
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        """关闭连接并从管理器中移除。"""
+        if self.closed:
+            return
+        self.manager.disconnect(self)
+        await self._close_socket(code, reason)
+
+    def close_nowait(self, code: int, reason: str):
+        """立即从管理器移除，并在后台关闭底层 socket（供同步上下文调用）。"""
+        if self.closed:
+            return
+        self.manager.disconnect(self)
+        self._close_task = asyncio.create_task(self._close_socket(code, reason))
+
+    async def _close_socket(self, code: int, reason: str):
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+
+class HeartbeatWheel:
+    """心跳时间轮：单个后台任务负责全部连接的保活与死连接回收。
 
-    def __init__(self):
-        self.active_connections: dict[int, WebSocket] = {}
+    连接按 connection_id 落入 HEARTBEAT_WHEEL_SLOTS 个槽位之一，
+    每 interval / slots 秒处理一个槽位，因此每个连接每个 interval 被检查一次。
+    """
+
+    def __init__(self, interval: float, timeout: float, slots: int = HEARTBEAT_WHEEL_SLOTS):
+        self.interval = interval
+        self.timeout = timeout
+        self.slots: list[dict[int, Connection]] = [{} for _ in range(slots)]
+        self.cursor = 0
+        self.reaped = 0
+        self._task: asyncio.Task | None = None
+
+    def add(self, connection: Connection):
+        self.slots[connection.id % len(self.slots)][connection.id] = connection
+
+    def remove(self, connection: Connection):
+        self.slots[connection.id % len(self.slots)].pop(connection.id, None)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
 
-    async def connect(self, user_id: int, websocket: WebSocket):
-        """建立连接，同一用户重连时关闭旧连接。"""
-        if user_id in self.active_connections:
-            old_ws = self.active_connections[user_id]
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        tick_interval = self.interval / len(self.slots)
+        while True:
+            await asyncio.sleep(tick_interval)
             try:
-                await old_ws.close(code=4000, reason="replaced_by_new_connection")
-            except Exception:
-                pass
+                self.tick()
+            except Exception as e:
+                logger.error("WebSocket heartbeat tick failed: %s", e)
+
+    def tick(self, now: float | None = None):
+        """处理当前槽位：超时的连接回收，其余发送 ping。"""
+        now = time.monotonic() if now is None else now
+        slot = self.slots[self.cursor]
+        self.cursor = (self.cursor + 1) % len(self.slots)
+        for connection in list(slot.values()):
+            if now - connection.last_seen > self.timeout:
+                self.reaped += 1
+                logger.info(
+                    "WebSocket heartbeat timeout: user_id=%d, connection_id=%d",
+                    connection.user_id, connection.id,
+                )
+                connection.close_nowait(1001, "heartbeat_timeout")
+            else:
+                connection.enqueue(HEARTBEAT_PING)
+
+
+class ConnectionManager:
+    """管理 WebSocket 连接，支持按 user_id 定向推送。
+
+    active_connections 为 user_id → {connection_id: Connection} 的两级索引，
+    同一用户的多个设备互不影响，定向推送投递到该用户的全部连接。
+    推送消息格式为 "<目标>\n<JSON 文本>" 发布到 backplane，
+    目标为 "*"（广播）或逗号分隔的 user_id 列表。
+    """
+
+    def __init__(self, backplane: Backplane | None = None):
+        self.active_connections: dict[int, dict[int, Connection]] = {}
+        self._subscriptions: list[tuple[str, object]] = [(WS_CHANNEL, self._deliver)]
+        self.backplane = backplane or InProcessBackplane()
+        self.backplane.subscribe(WS_CHANNEL, self._deliver)
+        self.heartbeat = HeartbeatWheel(
+            interval=settings.WS_HEARTBEAT_INTERVAL,
+            timeout=settings.WS_HEARTBEAT_TIMEOUT,
+        )
+
+    async def start(self):
+        """应用启动时按配置切换 backplane、开始订阅并启动心跳任务。"""
+        if settings.WS_BACKPLANE_URL:
+            self.backplane = create_backplane(settings.WS_BACKPLANE_URL)
+            for channel, handler in self._subscriptions:
+                self.backplane.subscribe(channel, handler)
+        await self.backplane.start()
+        await self.heartbeat.start()
+
+    async def stop(self):
+        await self.heartbeat.stop()
+        await self.backplane.stop()
+
+    def subscribe(self, channel: str, handler):
+        """为其他模块注册 backplane 频道（切换 backplane 时自动重新订阅）。"""
+        self._subscriptions.append((channel, handler))
+        self.backplane.subscribe(channel, handler)
+
+    async def publish(self, channel: str, message: str):
+        await self.backplane.publish(channel, message)
+
+    @property
+    def connection_count(self) -> int:
+        """本进程持有的连接总数（同一用户的多个设备分别计数）。"""
+        return sum(len(connections) for connections in self.active_connections.values())
+
+    def user_connections(self, user_id: int) -> list[Connection]:
+        """返回用户在本进程的全部连接。"""
+        return list(self.active_connections.get(user_id, {}).values())
+
+    async def connect(self, user_id: int, websocket: WebSocket) -> Connection:
+        """建立连接并加入该用户的连接集合（不影响该用户的其他设备）。"""
         await websocket.accept()
-        self.active_connections[user_id] = websocket
-        logger.info("WebSocket connected: user_id=%d, total=%d", user_id, len(self.active_connections))
+        connection = Connection(self, user_id, websocket)
+        connection.start()
+        self.active_connections.setdefault(user_id, {})[connection.id] = connection
+        self.heartbeat.add(connection)
+        logger.info(
+            "WebSocket connected: user_id=%d, connection_id=%d, devices=%d, total=%d",
+            user_id, connection.id,
+            len(self.active_connections[user_id]), self.connection_count,
+        )
+        return connection
 
-    def disconnect(self, user_id: int):
-        """断开连接。"""
-        self.active_connections.pop(user_id, None)
-        logger.info("WebSocket disconnected: user_id=%d, total=%d", user_id, len(self.active_connections))
+    def disconnect(self, connection: Connection):
+        """断开连接（重复调用安全）。"""
+        connection.stop()
+        self.heartbeat.remove(connection)
+        connections = self.active_connections.get(connection.user_id)
+        if connections is None or connections.pop(connection.id, None) is None:
+            return
+        if not connections:
+            del self.active_connections[connection.user_id]
+        logger.info(
+            "WebSocket disconnected: user_id=%d, connection_id=%d, total=%d",
+            connection.user_id, connection.id, self.connection_count,
+        )
+
+    async def _deliver(self, envelope: str):
+        """backplane 回调：投递给本进程持有的连接。"""
+        target, _, text = envelope.partition("\n")
+        if target == BROADCAST_TARGET:
+            for connections in list(self.active_connections.values()):
+                for connection in list(connections.values()):
+                    connection.enqueue(text)
+            return
+        for user_id in target.split(","):
+            for connection in self.user_connections(int(user_id)):
+                connection.enqueue(text)
 
     async def send_to_user(self, user_id: int, message: dict):
-        """向指定用户发送 JSON 消息。连接断开时静默处理。"""
-        websocket = self.active_connections.get(user_id)
-        if websocket is None:
+        """向指定用户的全部设备发送 JSON 消息。连接断开时静默处理。"""
+        await self.backplane.publish(WS_CHANNEL, f"{user_id}\n{encode_message(message)}")
+
+    async def send_to_users(self, user_ids, message: dict | str):
+        """向一组用户发送同一条消息，只序列化一次（message 可为已序列化的文本）。"""
+        user_ids = list(user_ids)
+        if not user_ids:
             return
-        try:
-            await websocket.send_json(message)
-        except Exception:
-            self.disconnect(user_id)
+        text = message if isinstance(message, str) else encode_message(message)
+        target = ",".join(str(user_id) for user_id in user_ids)
+        await self.backplane.publish(WS_CHANNEL, f"{target}\n{text}")
 
-    async def broadcast(self, message: dict):
-        """向所有在线用户广播。"""
-        for user_id in list(self.active_connections.keys()):
-            await self.send_to_user(user_id, message)
+    async def broadcast(self, message: dict | str):
+        """向所有在线用户广播（包括其他 worker 上的连接），只序列化一次。"""
+        text = message if isinstance(message, str) else encode_message(message)
+        await self.backplane.publish(WS_CHANNEL, f"{BROADCAST_TARGET}\n{text}")
 
 
 # 模块级单例
 manager = ConnectionManager()
+unread_counter.attach(manager)
+principal_cache.attach(manager)
+feed_cache.attach(manager)
+
+
+async def push_unread_count(user_id: int, unread_count: int):
+    """把最新未读数同步到用户的全部设备。"""
+    await manager.send_to_user(user_id, {
+        "type": "unread_count",
+        "data": {"unread_count": unread_count},
+    })
 
 
 @router.websocket("/ws/notifications")
@@ -68,7 +331,8 @@ async def websocket_notifications(websocket: WebSocket):
     """WebSocket 通知端点。
 
     认证方式：query parameter ?token=<jwt>
-    连接后立即发送当前未读数，之后通过 receive 循环保持连接。
+    连接后立即发送当前未读数，之后通过 receive 循环保持连接；
+    保活由 HeartbeatWheel 负责，这里只记录客户端活动时间。
     """
     # 1. 从 query parameter 提取并验证 token
     token = websocket.query_params.get("token")
@@ -81,10 +345,12 @@ async def websocket_notifications(websocket: WebSocket):
         await websocket.close(code=4001, reason="invalid_token")
         return
 
-    user_id: int | None = payload.get("sub")
-    if user_id is None:
+    sub = payload.get("sub")
+    if sub is None or not str(sub).isdigit():
         await websocket.close(code=4001, reason="invalid_token_payload")
         return
+    # token 中的 sub 为字符串，连接表与推送目标统一按 int 用户 ID 索引
+    user_id = int(sub)
 
     # 2. 查询用户
     async with async_session_maker() as db:
@@ -95,41 +361,33 @@ async def websocket_notifications(websocket: WebSocket):
             return
 
     # 3. 建立连接
-    await manager.connect(user_id, websocket)
+    connection = await manager.connect(user_id, websocket)
 
-    # 4. 发送当前未读数
+    # 4. 发送当前未读数（只发给本次建立的连接）
     try:
         async with async_session_maker() as db:
-            count_result = await db.execute(
-                select(func.count()).select_from(UserNotification).where(
-                    UserNotification.user_id == user_id,
-                    UserNotification.is_read == False,
-                )
-            )
-            unread_count = count_result.scalar() or 0
-        await manager.send_to_user(user_id, {
+            unread_count = await unread_counter.get(db, user_id, user)
+            # 首次读取时会初始化计数行
+            if has_pending_writes(db):
+                await db.commit()
+        connection.enqueue(encode_message({
             "type": "connection_established",
             "data": {"unread_count": unread_count},
-        })
+        }))
     except Exception:
-        manager.disconnect(user_id)
+        await connection.close(code=1011, reason="init_failed")
         return
 
-    # 5. 保持连接 + 心跳
+    # 5. 保持连接：客户端的任何消息（包括对服务端 ping 的 pong）都视为存活
     try:
         while True:
-            # 接收客户端消息（用于心跳），设置 30s 超时
-            data = await asyncio.wait_for(websocket.receive_text(), timeout=30)
+            data = await websocket.receive_text()
+            connection.touch()
             if data == "ping":
-                await websocket.send_text("pong")
-    except asyncio.TimeoutError:
-        # 30s 无消息，发送一次 ping 检测连接
-        try:
-            await websocket.send_text("ping")
-        except Exception:
-            pass
-        manager.disconnect(user_id)
+                connection.enqueue("pong")
     except WebSocketDisconnect:
-        manager.disconnect(user_id)
+        pass
     except Exception:
-        manager.disconnect(user_id)
+        pass
+    finally:
+        manager.disconnect(connection)
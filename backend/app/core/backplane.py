@@ -0,0 +1,203 @@
+"""跨进程消息总线（backplane）。
+
+多个 uvicorn worker / 多个容器各自持有一部分 WebSocket 连接，
+推送消息需要先发布到总线，再由每个进程投递给自己持有的连接。
+
+- InProcessBackplane：单进程部署（默认），发布即本地分发
+- RedisBackplane：使用 Redis 协议（RESP）的 PUBLISH / SUBSCRIBE，
+  支持 redis://[:password@]host:port 与 unix:///path/to/redis.sock，
+  可对接 Redis 或任意兼容 RESP pub/sub 的本地替身服务
+"""
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+from urllib.parse import urlparse, unquote
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str], Awaitable[None]]
+
+
+class BackplaneError(Exception):
+    """Backplane 服务端返回的错误。"""
+
+
+class Backplane(ABC):
+    """消息总线接口：按频道发布文本消息，并把收到的消息分发给本进程的订阅者。"""
+
+    def __init__(self):
+        self._handlers: dict[str, list[MessageHandler]] = {}
+
+    def subscribe(self, channel: str, handler: MessageHandler):
+        """注册频道处理函数（需在 start() 之前调用）。"""
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str):
+        """向频道发布消息（所有进程的订阅者都会收到，包括本进程）。"""
+
+    async def _dispatch(self, channel: str, message: str):
+        for handler in self._handlers.get(channel, []):
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.error("Backplane handler for %s failed: %s", channel, e)
+
+
+class InProcessBackplane(Backplane):
+    """进程内实现：发布即直接分发给本进程订阅者。"""
+
+    async def publish(self, channel: str, message: str):
+        await self._dispatch(channel, message)
+
+
+def _encode_command(*args: str | bytes) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg.encode("utf-8") if isinstance(arg, str) else arg
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("backplane connection closed")
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b"+":
+        return payload.decode("utf-8")
+    if prefix == b"-":
+        raise BackplaneError(payload.decode("utf-8"))
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length == -1:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        length = int(payload)
+        if length == -1:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise BackplaneError(f"unexpected reply: {line!r}")
+
+
+class RedisBackplane(Backplane):
+    """基于 RESP 协议的 pub/sub 实现（发布和订阅各使用一条连接）。"""
+
+    RECONNECT_MIN_DELAY = 0.5
+    RECONNECT_MAX_DELAY = 5.0
+
+    def __init__(self, url: str):
+        super().__init__()
+        parsed = urlparse(url)
+        self.url = url
+        self.unix_path = parsed.path if parsed.scheme == "unix" else None
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+
+        self._pub_reader: asyncio.StreamReader | None = None
+        self._pub_writer: asyncio.StreamWriter | None = None
+        self._pub_lock = asyncio.Lock()
+        self._sub_task: asyncio.Task | None = None
+        self._subscribed = asyncio.Event()
+
+    async def _open(self):
+        if self.unix_path:
+            reader, writer = await asyncio.open_unix_connection(self.unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            writer.write(_encode_command("AUTH", self.password))
+            await writer.drain()
+            await _read_reply(reader)
+        return reader, writer
+
+    async def start(self):
+        self._sub_task = asyncio.create_task(self._subscribe_loop())
+        # 等待首次订阅完成，避免启动后立即发布的消息丢失
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            logger.warning("Backplane %s not reachable yet, retrying in background", self.url)
+
+    async def stop(self):
+        if self._sub_task is not None:
+            self._sub_task.cancel()
+            await asyncio.gather(self._sub_task, return_exceptions=True)
+            self._sub_task = None
+        await self._close_publisher()
+
+    async def publish(self, channel: str, message: str):
+        async with self._pub_lock:
+            for attempt in range(2):
+                try:
+                    if self._pub_writer is None:
+                        self._pub_reader, self._pub_writer = await self._open()
+                    self._pub_writer.write(_encode_command("PUBLISH", channel, message))
+                    await self._pub_writer.drain()
+                    await _read_reply(self._pub_reader)
+                    return
+                except (OSError, ConnectionError, asyncio.IncompleteReadError) as e:
+                    await self._close_publisher()
+                    if attempt == 1:
+                        logger.error("Backplane publish to %s failed: %s", channel, e)
+
+    async def _close_publisher(self):
+        if self._pub_writer is not None:
+            self._pub_writer.close()
+            try:
+                await self._pub_writer.wait_closed()
+            except Exception:
+                pass
+        self._pub_reader = self._pub_writer = None
+
+    async def _subscribe_loop(self):
+        if not self._handlers:
+            self._subscribed.set()
+            return
+        delay = self.RECONNECT_MIN_DELAY
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._open()
+                writer.write(_encode_command("SUBSCRIBE", *self._handlers.keys()))
+                await writer.drain()
+                for _ in self._handlers:
+                    await _read_reply(reader)  # subscribe 确认
+                self._subscribed.set()
+                delay = self.RECONNECT_MIN_DELAY
+
+                while True:
+                    reply = await _read_reply(reader)
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                        channel = reply[1].decode("utf-8")
+                        await self._dispatch(channel, reply[2].decode("utf-8"))
+            except asyncio.CancelledError:
+                raise
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, BackplaneError) as e:
+                logger.warning("Backplane subscription lost (%s), reconnecting in %.1fs", e, delay)
+            finally:
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+
+
+def create_backplane(url: str) -> Backplane:
+    """根据配置创建 backplane：空字符串 / memory:// 为进程内实现。"""
+    if not url or url.startswith("memory://"):
+        return InProcessBackplane()
+    if url.startswith(("redis://", "unix://")):
+        return RedisBackplane(url)
+    raise ValueError(f"Unsupported backplane URL: {url}")
@@ -0,0 +1,106 @@
+"""进程内缓存的公共部分。
+
+未读数、已认证用户、首页动态三个缓存结构相同：key -> (值, 写入时间)，超过 ttl 视为过期；
+写操作提交后使本进程的条目失效，并通过 backplane 频道通知其他 worker（消息格式 "<来源进程>\n<目标>"，
+忽略自己发出的消息）；generation 在每次失效时递增，加载期间发生过失效的结果不写入缓存。
+"""
+import time
+import uuid
+from typing import Any, Hashable, Iterable, Optional
+
+
+def hit_stats(hits: int, misses: int, size: int, **extra) -> dict:
+    """缓存命中统计（/api/metrics 使用）。"""
+    lookups = hits + misses
+    return {
+        "size": size,
+        **extra,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+class BackplaneCache:
+    """按 ttl 过期、通过 backplane 在 worker 之间同步失效的进程内缓存。
+
+    子类设置 channel；其他 worker 发来的目标默认是逗号分隔的整数 key，
+    需要其他含义时重写 _on_remote。
+    """
+
+    channel: str
+
+    def __init__(self, ttl: float, max_entries: Optional[int] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.origin = uuid.uuid4().hex
+        self.hits = 0
+        self.misses = 0
+        # 每次失效递增；加载期间发生过失效的结果不写入缓存，避免覆盖为旧数据
+        self.generation = 0
+        # key -> (值, 写入时间)
+        self._entries: dict[Hashable, tuple[Any, float]] = {}
+        self._bus = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def attach(self, bus):
+        """接入 ConnectionManager 的 backplane，用于在 worker 之间同步失效。"""
+        self._bus = bus
+        bus.subscribe(self.channel, self._on_message)
+
+    def stats(self) -> dict:
+        return hit_stats(self.hits, self.misses, len(self))
+
+    def get(self, key: Hashable) -> Any:
+        """返回未过期的值（不存在或已过期时返回 None），并计入命中统计。"""
+        value = self._fresh(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any, generation: int):
+        """写入缓存（generation 为开始加载前读取的 self.generation）。"""
+        if self.ttl > 0 and generation == self.generation:
+            self._store(key, value)
+
+    def clear(self):
+        """丢弃本进程的全部条目。"""
+        self.generation += 1
+        self._entries.clear()
+
+    def _fresh(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def _store(self, key: Hashable, value: Any, stored_at: Optional[float] = None):
+        if self.max_entries is not None and len(self._entries) >= self.max_entries and key not in self._entries:
+            # 先淘汰过期条目，仍然超出时清空
+            now = time.monotonic()
+            for expired in [k for k, (_, ts) in self._entries.items() if now - ts > self.ttl]:
+                del self._entries[expired]
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+        self._entries[key] = (value, stored_at or time.monotonic())
+
+    def _drop(self, keys: Iterable[Hashable]):
+        self.generation += 1
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def _publish(self, target: str):
+        if self._bus is not None:
+            await self._bus.publish(self.channel, f"{self.origin}\n{target}")
+
+    async def _on_message(self, message: str):
+        origin, _, target = message.partition("\n")
+        if origin != self.origin:
+            self._on_remote(target)
+
+    def _on_remote(self, target: str):
+        self._drop(int(key) for key in target.split(","))
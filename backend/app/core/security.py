@@ -1,13 +1,23 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core.cache import hit_stats
 from app.core.config import settings
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so hashing in a thread pool keeps the event loop
+# responsive. The semaphore bounds how many requests wait on the pool at once.
+_password_executor: Optional[ThreadPoolExecutor] = None
+_password_semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_CONCURRENCY)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
@@ -19,6 +29,51 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def get_password_executor() -> ThreadPoolExecutor:
+    """Return the thread pool used for password hashing (created on first use)."""
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash",
+        )
+    return _password_executor
+
+
+def shutdown_password_executor():
+    """Release the password hashing pool on application shutdown."""
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False, cancel_futures=True)
+        _password_executor = None
+
+
+async def _run_password_task(func, *args):
+    async with _password_semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_password_executor(), func, *args)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop."""
+    return await _run_password_task(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    return await _run_password_task(get_password_hash, password)
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hash a batch of passwords."""
+    return [pwd_context.hash(password) for password in passwords]
+
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    """Hash a batch of passwords as one task on the password hashing pool."""
+    return await _run_password_task(hash_passwords, passwords)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -32,10 +87,69 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+class TokenCache:
+    """Bounded LRU cache of verified token -> claims.
+
+    Entries expire at the token's ``exp`` claim, so a cached token is never
+    accepted after it would have failed verification.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        claims, expires_at = entry
+        if time.time() >= expires_at:
+            del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return dict(claims)
+
+    def put(self, token: str, claims: dict):
+        expires_at = claims.get("exp")
+        if self.max_size <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        self._entries[token] = (dict(claims), float(expires_at))
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return hit_stats(
+            self.hits, self.misses, len(self._entries),
+            max_size=self.max_size, evictions=self.evictions,
+        )
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
+
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT access token."""
+    """Decode and verify a JWT access token.
+
+    Verified claims are cached until the token expires, so repeated requests
+    with the same token skip signature verification.
+    """
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    token_cache.put(token, payload)
+    return payload
@@ -1,20 +1,67 @@
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 
 from app.core.config import settings
+from app.db.pool import engine_options
 
 
-# Create async engine
+# Create async engine (pool settings: see app/db/pool.py)
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
+    echo=settings.DB_ECHO,
     future=True,
+    **engine_options(settings.DATABASE_URL),
 )
 
+
+class TrackedSession(Session):
+    """Session that records whether it has written anything since the last commit.
+
+    Sessions connect lazily (on the first statement), so a request that never
+    touches the database never checks out a pooled connection; ``get_db`` uses
+    the write flag to skip the COMMIT round-trip for read-only requests.
+    """
+
+
+_WRITES_KEY = "has_writes"
+
+
+@event.listens_for(TrackedSession, "after_flush")
+def _flushed(session, flush_context):
+    session.info[_WRITES_KEY] = True
+
+
+@event.listens_for(TrackedSession, "do_orm_execute")
+def _executed(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE and textual statements bypass the flush
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[_WRITES_KEY] = True
+
+
+@event.listens_for(TrackedSession, "after_transaction_end")
+def _transaction_ended(session, transaction):
+    # Only the root transaction: a rolled-back SAVEPOINT leaves earlier
+    # writes of the enclosing transaction pending
+    if transaction.parent is None:
+        session.info.pop(_WRITES_KEY, None)
+
+
+def has_pending_writes(session: AsyncSession) -> bool:
+    """Whether the session has uncommitted writes (flushed or still pending)."""
+    return bool(
+        session.info.get(_WRITES_KEY)
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
+
 # Create async session factory
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=TrackedSession,
     expire_on_commit=False,
 )
 
@@ -25,13 +72,20 @@ class Base(DeclarativeBase):
 
 
 async def get_db() -> AsyncSession:
-    """Dependency function to get database session."""
+    """Dependency function to get database session.
+
+    Commits only if the handler left uncommitted writes; read-only and
+    DB-free requests end without a COMMIT (closing the session returns any
+    checked-out connection to the pool, which resets it).
+    """
     async with async_session_maker() as session:
         try:
             yield session
-            await session.commit()
+            if has_pending_writes(session):
+                await session.commit()
         except Exception:
-            await session.rollback()
+            if session.in_transaction():
+                await session.rollback()
             raise
         finally:
             await session.close()
@@ -0,0 +1,112 @@
+"""Connection pool configuration and telemetry for the async engine."""
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+
+from app.core.config import settings
+
+# SQLite serialises writers, so more connections to a file database only
+# add lock contention: cap the pool and never overflow.
+SQLITE_MAX_POOL_SIZE = 5
+
+
+class PoolStats:
+    """Counters for connection acquisition from one pool."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float):
+        self.acquisitions += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict:
+        return {
+            "acquisitions": self.acquisitions,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait / self.acquisitions * 1000, 3) if self.acquisitions else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that times how long each checkout waits for a connection.
+
+    The wait includes opening a new connection when the pool grows. Each
+    pool keeps its own ``stats``; they carry over when the engine is
+    disposed and the pool recreated.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.record(time.perf_counter() - start)
+
+
+def engine_options(database_url: str) -> dict:
+    """Pool keyword arguments for ``create_async_engine``.
+
+    SQLite is a local file (or in-process memory database), so recycling
+    and pre-ping do not apply: in-memory databases share a single
+    connection, file databases keep a small queue pool (at most
+    SQLITE_MAX_POOL_SIZE connections, no overflow). DB_POOL_SIZE and
+    DB_MAX_OVERFLOW size the MySQL pool.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            return {"poolclass": StaticPool}
+        return {
+            "poolclass": InstrumentedPool,
+            "pool_size": max(1, min(settings.DB_POOL_SIZE, SQLITE_MAX_POOL_SIZE)),
+            "max_overflow": 0,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+        }
+    return {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def pool_metrics(engine) -> dict:
+    """Current pool occupancy plus acquisition statistics."""
+    pool = engine.pool
+    metrics = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        metrics.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+        })
+    if isinstance(pool, InstrumentedPool):
+        metrics.update(pool.stats.snapshot())
+    return metrics
@@ -1,7 +1,23 @@
 from app.models.user import User
 from app.models.notification import Notification
 from app.models.activity import Activity
+from app.models.activity_transition import ActivityTransition
 from app.models.lost_item import LostItem
 from app.models.user_notification import UserNotification
+from app.models.broadcast_notification import BroadcastNotification
+from app.models.broadcast_receipt import BroadcastReceipt
+from app.models.user_notification_state import UserNotificationState
+from app.models.user_unread_counter import UserUnreadCounter
 
-__all__ = ["User", "Notification", "Activity", "LostItem", "UserNotification"]
+__all__ = [
+    "User",
+    "Notification",
+    "Activity",
+    "ActivityTransition",
+    "LostItem",
+    "UserNotification",
+    "BroadcastNotification",
+    "BroadcastReceipt",
+    "UserNotificationState",
+    "UserUnreadCounter",
+]
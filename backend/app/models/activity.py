@@ -1,5 +1,6 @@
 from datetime import datetime
-from sqlalchemy import String, Text, ForeignKey, DateTime, Index
+from typing import Optional
+from sqlalchemy import String, Text, ForeignKey, DateTime, Index, and_, case
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.database import Base
@@ -12,6 +13,9 @@ class Activity(Base):
     __table_args__ = (
         Index('ft_activities', 'title', 'description', 'organizer', 'location',
               mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+        # Keyset pagination: (filter..., created_at, id)
+        Index('ix_activities_created', 'created_at', 'id'),
+        Index('ix_activities_creator_created', 'created_by', 'created_at', 'id'),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -68,5 +72,30 @@ class Activity(Base):
         # Default fallback
         return "报名中"
 
+    @classmethod
+    def status_expression(cls, now: datetime):
+        """SQL CASE equivalent of ``calculate_status`` evaluated at ``now``.
+
+        Used to filter by the time-derived status and to bring the stored
+        column up to date in a single UPDATE.
+        """
+        registration_window = and_(cls.registration_start.is_not(None), cls.registration_end.is_not(None))
+        return case(
+            (and_(cls.activity_end.is_not(None), cls.activity_end <= now), "已结束"),
+            (cls.activity_start <= now, "进行中"),
+            (and_(registration_window, cls.registration_start > now), "即将开始报名"),
+            (and_(registration_window, cls.registration_end > now), "报名中"),
+            (registration_window, "报名截止"),
+            else_="报名中",
+        )
+
+    def next_transition(self, now: datetime) -> Optional[datetime]:
+        """The next time after ``now`` at which ``calculate_status`` can change."""
+        boundaries = [self.activity_start, self.activity_end]
+        if self.registration_start and self.registration_end:
+            boundaries += [self.registration_start, self.registration_end]
+        upcoming = [boundary for boundary in boundaries if boundary is not None and boundary > now]
+        return min(upcoming, default=None)
+
     def __repr__(self) -> str:
         return f"<Activity(id={self.id}, title={self.title})>"
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, ForeignKey, Integer
+from sqlalchemy import String, ForeignKey, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.database import Base
@@ -14,6 +14,10 @@ class ActivityRegistration(Base):
     """
 
     __tablename__ = "activity_registrations"
+    __table_args__ = (
+        # Keyset pagination of an activity's registrations
+        Index('ix_activity_registrations_activity_created', 'activity_id', 'created_at', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     activity_id: Mapped[int] = mapped_column(ForeignKey("activities.id"), nullable=False, index=True)
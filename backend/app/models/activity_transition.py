@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import ForeignKey, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class ActivityTransition(Base):
+    """Next time an activity's time-derived status changes.
+
+    Persisted so the status scheduler in app/api/activity_status.py survives
+    restarts and still fires (and pushes) transitions that fell due while no
+    worker was running. Workers claim a transition by moving ``fire_at``
+    forward, so each one is applied once.
+    """
+
+    __tablename__ = "activity_transitions"
+    __table_args__ = (
+        Index('ix_activity_transitions_fire_at', 'fire_at'),
+    )
+
+    activity_id: Mapped[int] = mapped_column(ForeignKey("activities.id"), primary_key=True)
+    fire_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ActivityTransition(activity_id={self.activity_id}, fire_at={self.fire_at})>"
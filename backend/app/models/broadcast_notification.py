@@ -0,0 +1,32 @@
+from datetime import datetime
+from sqlalchemy import String, Text, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class BroadcastNotification(Base):
+    """Broadcast notification shared by all users.
+
+    One row is stored per publish (course notification, new activity, ...)
+    instead of one UserNotification copy per user. Per-user read/dismiss
+    state lives in BroadcastReceipt and UserNotificationState.
+    """
+
+    __tablename__ = "broadcast_notifications"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+
+    # Notification type and content
+    type: Mapped[str] = mapped_column(String(50), nullable=False)  # activity, course
+    title: Mapped[str] = mapped_column(String(200), nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    link_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, index=True)
+
+    # Optional reference to related entity
+    related_id: Mapped[int | None] = mapped_column(Integer, nullable=True)  # e.g., activity_id, notification_id
+
+    def __repr__(self) -> str:
+        return f"<BroadcastNotification(id={self.id}, type={self.type})>"
@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class BroadcastReceipt(Base):
+    """Sparse per-user read/dismiss state for a broadcast notification.
+
+    A row only exists once a user has read or deleted a single broadcast;
+    "mark all as read" moves the user's watermark instead of writing rows.
+    """
+
+    __tablename__ = "broadcast_receipts"
+    __table_args__ = (
+        UniqueConstraint("user_id", "broadcast_id", name="uq_broadcast_receipt_user"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+    broadcast_id: Mapped[int] = mapped_column(ForeignKey("broadcast_notifications.id"), nullable=False)
+
+    is_read: Mapped[bool] = mapped_column(Boolean, default=False)
+    is_dismissed: Mapped[bool] = mapped_column(Boolean, default=False)  # deleted by the user
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<BroadcastReceipt(user_id={self.user_id}, broadcast_id={self.broadcast_id})>"
@@ -12,6 +12,9 @@ class LostItem(Base):
     __table_args__ = (
         Index('ft_lost_items', 'title', 'description', 'location',
               mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+        # Keyset pagination: (filter..., created_at, id); lists always filter by review_status
+        Index('ix_lost_items_review_created', 'review_status', 'created_at', 'id'),
+        Index('ix_lost_items_creator_created', 'created_by', 'created_at', 'id'),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -12,6 +12,9 @@ class Notification(Base):
     __table_args__ = (
         Index('ft_notifications', 'title', 'content', 'course',
               mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+        # Keyset pagination: (filter..., created_at, id)
+        Index('ix_notifications_created', 'created_at', 'id'),
+        Index('ix_notifications_creator_created', 'created_by', 'created_at', 'id'),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
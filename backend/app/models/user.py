@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, Boolean
+from sqlalchemy import String, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.database import Base
@@ -9,6 +9,10 @@ class User(Base):
     """User model for authentication and profile."""
 
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination of the admin user list
+        Index('ix_users_created', 'created_at', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     student_id: Mapped[str] = mapped_column(String(50), unique=True, index=True, nullable=False)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, Boolean, Text, ForeignKey, Integer
+from sqlalchemy import String, Boolean, Text, ForeignKey, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.database import Base
@@ -9,6 +9,10 @@ class UserNotification(Base):
     """User notification model for personal notifications."""
 
     __tablename__ = "user_notifications"
+    __table_args__ = (
+        # Keyset pagination of a user's inbox
+        Index('ix_user_notifications_user_created', 'user_id', 'created_at', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
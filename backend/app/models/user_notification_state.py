@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class UserNotificationState(Base):
+    """Per-user notification state (broadcast read watermark)."""
+
+    __tablename__ = "user_notification_states"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+
+    # All broadcasts with id <= this value count as read
+    broadcast_read_upto: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<UserNotificationState(user_id={self.user_id}, broadcast_read_upto={self.broadcast_read_upto})>"
@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class UserUnreadCounter(Base):
+    """Materialised unread notification count per user.
+
+    Kept in step with user_notifications / broadcast read state by atomic
+    increments in the same transaction as each change; the repair job in
+    app/api/unread_counts.py recomputes it from the source tables.
+    """
+
+    __tablename__ = "user_unread_counters"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    unread_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<UserUnreadCounter(user_id={self.user_id}, unread_count={self.unread_count})>"
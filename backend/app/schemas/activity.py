@@ -52,6 +52,7 @@ class ActivityResponse(ActivityBase):
     """Activity response schema."""
     id: int
     created_at: datetime
+    fanout_job_id: Optional[str] = None  # 创建时返回的用户通知扇出任务 ID
 
     class Config:
         from_attributes = True
@@ -44,3 +44,4 @@ class RegistrationListResponse(BaseModel):
     registrations: list[ActivityRegistrationResponse]
     total: int
     activity_name: Optional[str] = None
+    next_cursor: Optional[str] = None  # set in cursor pagination mode when more rows exist
@@ -34,6 +34,7 @@ class NotificationResponse(NotificationBase):
     created_at: datetime
     attachment: Optional[str] = None
     attachment_name: Optional[str] = None
+    fanout_job_id: Optional[str] = None  # 创建时返回的用户通知扇出任务 ID
 
     class Config:
         from_attributes = True
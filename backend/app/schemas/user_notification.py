@@ -29,6 +29,8 @@ class UserNotificationResponse(UserNotificationBase):
     is_read: bool
     created_at: datetime
     related_id: Optional[int] = None
+    source: str = "personal"  # personal, broadcast
+    unread_count: Optional[int] = None  # only set on mark-read responses
 
     @field_serializer('created_at')
     def serialize_created_at(self, dt: datetime, _info):
@@ -6,7 +6,9 @@ from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
 from app.db.database import init_db
-from app.api import auth, notifications, activities, lost_items, users, uploads, user_notifications, activity_registrations, feed, search, ws, lost_item_matching
+from app.core.security import shutdown_password_executor
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api import auth, notifications, activities, lost_items, users, uploads, user_notifications, activity_registrations, feed, search, ws, lost_item_matching, fanout, unread_counts, export_jobs, metrics, activity_status
 
 
 @asynccontextmanager
@@ -14,9 +16,17 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
     # Startup
     await init_db()
+    await ws.manager.start()
+    await unread_counts.repair_scheduler.start()
+    await activity_status.activity_scheduler.start()
     yield
     # Shutdown
-    pass
+    await activity_status.activity_scheduler.stop()
+    await unread_counts.repair_scheduler.stop()
+    await fanout.fanout_engine.shutdown()
+    await export_jobs.export_job_engine.shutdown()
+    shutdown_password_executor()
+    await ws.manager.stop()
 
 
 # Create FastAPI app
@@ -33,6 +43,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -47,6 +58,10 @@ app.include_router(lost_item_matching.router)  # Must be before lost_items.route
 app.include_router(lost_items.router)
 app.include_router(users.router)
 app.include_router(uploads.router)
+app.include_router(fanout.router)
+app.include_router(unread_counts.router)
+app.include_router(export_jobs.router)
+app.include_router(metrics.router)
 app.include_router(ws.router)  # WebSocket endpoint
 
 # Mount static files directory for uploaded images
@@ -1,10 +1,15 @@
 """
 测试配置 — 连接本地已运行的后端服务 (http://localhost:8000)。
 测试前请确保后端已启动: python -m uvicorn main:app --reload --port 8000
+直接调用接口函数的测试使用 memory_db（进程内 SQLite 内存库），无需启动后端。
 """
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.db.database import Base, TrackedSession
 
 BASE_URL = "http://localhost:8000"
 
@@ -43,3 +48,28 @@ async def admin_headers(admin_token: str):
 @pytest_asyncio.fixture
 async def user_headers(user_token: str):
     return {"Authorization": f"Bearer {user_token}"}
+
+
+class MemoryDatabase:
+    """已建表的内存库：engine、与应用相同配置的会话工厂，以及执行过的 SQL 语句。"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.maker = async_sessionmaker(
+            engine, class_=AsyncSession, sync_session_class=TrackedSession, expire_on_commit=False
+        )
+        # 测试数据写入后调用 statements.clear()，只统计被测代码的语句
+        self.statements: list[str] = []
+        event.listen(
+            engine.sync_engine, "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(statement),
+        )
+
+
+@pytest_asyncio.fixture
+async def memory_db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield MemoryDatabase(engine)
+    await engine.dispose()
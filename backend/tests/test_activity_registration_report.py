@@ -0,0 +1,77 @@
+"""
+活动报名名单查询测试 — 用户信息通过 JOIN 一次取回
+使用进程内 SQLite 内存库直接调用接口函数，无需启动后端。
+"""
+from datetime import datetime
+
+import pytest
+
+from app.models.user import User
+from app.models.activity import Activity
+from app.models.activity_registration import ActivityRegistration
+from app.api.activity_registrations import get_activity_registrations
+
+
+@pytest.fixture
+async def session(memory_db):
+    maker = memory_db.maker
+
+    async with maker() as db:
+        for i in range(20):
+            db.add(User(
+                id=i + 1,
+                student_id=f"S{i}",
+                email=f"u{i}@campus.edu",
+                name=f"用户{i}",
+                hashed_password="x",
+            ))
+        db.add(Activity(
+            id=1, title="讲座", description="desc", activity_start=datetime(2030, 1, 1),
+            date="2030年1月1日", location="礼堂", organizer="学生会", image="x", category="讲座",
+        ))
+        for i in range(20):
+            db.add(ActivityRegistration(
+                activity_id=1,
+                user_id=i + 1,
+                name=f"报名人{i}",
+                student_id=f"S{i}",
+                status="cancelled" if i % 4 == 0 else "confirmed",
+            ))
+        await db.commit()
+
+    statements = memory_db.statements
+    statements.clear()
+    async with maker() as db:
+        yield db, statements
+
+
+async def list_registrations(db, limit, status_filter=None, cursor=None):
+    return await get_activity_registrations(
+        activity_id=1, skip=0, limit=limit, status_filter=status_filter,
+        cursor=cursor, current_admin=None, db=db,
+    )
+
+
+@pytest.mark.parametrize("limit", [5, 20])
+async def test_registration_list_query_count_is_constant(session, limit):
+    db, statements = session
+    response = await list_registrations(db, limit)
+
+    assert len(response.registrations) == limit
+    # 查活动 + 计数 + 报名与用户 JOIN，与页大小无关
+    assert len(statements) == 3
+    for reg in response.registrations:
+        assert reg.user_email == f"u{reg.user_id - 1}@campus.edu"
+        assert reg.user_name == f"用户{reg.user_id - 1}"
+
+
+async def test_registration_cursor_walk_with_join(session):
+    db, _ = session
+    seen, cursor = [], ""
+    while cursor is not None:
+        response = await list_registrations(db, 6, status_filter="confirmed", cursor=cursor)
+        seen.extend(reg.id for reg in response.registrations)
+        cursor = response.next_cursor
+
+    assert response.total == 15
+    assert len(seen) == len(set(seen)) == 15
@@ -0,0 +1,199 @@
+"""
+活动状态测试 — SQL CASE 与 calculate_status 一致、读接口不写库、调度器在时间边界更新状态并推送
+使用进程内 SQLite 内存库直接调用接口函数与调度器，无需启动后端。
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models.user import User
+from app.models.activity import Activity
+from app.models.activity_registration import ActivityRegistration
+from app.models.activity_transition import ActivityTransition
+from app.api import activities, activity_status
+from app.api.activity_status import ActivityStatusScheduler
+
+
+def make_activity(title: str, status: str = "报名中", **times) -> Activity:
+    return Activity(
+        title=title, description="描述", date="", location="礼堂", organizer="学生会",
+        image="", category="讲座", status=status, **times,
+    )
+
+
+@pytest.fixture
+async def maker(memory_db):
+    maker = memory_db.maker
+
+    now = datetime.now()
+    hour = timedelta(hours=1)
+    async with maker() as db:
+        db.add_all([
+            make_activity("已结束", activity_start=now - 3 * hour, activity_end=now - hour),
+            make_activity("进行中", activity_start=now - hour, activity_end=now + hour),
+            make_activity("即将开始报名", registration_start=now + hour, registration_end=now + 2 * hour,
+                          activity_start=now + 3 * hour),
+            make_activity("报名中", status="即将开始报名", registration_start=now - hour,
+                          registration_end=now + hour, activity_start=now + 2 * hour),
+            make_activity("报名截止", registration_start=now - 2 * hour, registration_end=now - hour,
+                          activity_start=now + hour),
+            make_activity("无报名时间", activity_start=now + hour),
+        ])
+        await db.commit()
+
+    statements = memory_db.statements
+    statements.clear()
+    yield maker, statements
+
+
+async def test_sql_status_matches_python(maker):
+    maker, _ = maker
+    now = datetime.now()
+    async with maker() as db:
+        result = await db.execute(select(Activity, Activity.status_expression(now)))
+        rows = result.all()
+
+    assert len(rows) == 6
+    for activity, sql_status in rows:
+        assert sql_status == activity.calculate_status()
+    assert {activity.title: sql_status for activity, sql_status in rows}["无报名时间"] == "报名中"
+
+
+async def test_reads_do_not_write(maker):
+    maker, statements = maker
+    async with maker() as db:
+        listed = await activities.get_activities(category=None, status_filter="报名中", created_by=None, db=db)
+        detail = await activities.get_activity(activity_id=4, db=db)
+
+    # 存储的列过期（即将开始报名），过滤与返回都按时间计算
+    assert sorted(a.title for a in listed) == ["报名中", "无报名时间"]
+    assert detail.status == "报名中"
+    assert all(s.lstrip().upper().startswith("SELECT") for s in statements)
+
+
+class FakeManager:
+    def __init__(self):
+        self.sent = []
+
+    async def send_to_users(self, user_ids, message):
+        self.sent.append((sorted(user_ids), message))
+
+
+@pytest.fixture
+def pushed(monkeypatch):
+    fake = FakeManager()
+    monkeypatch.setattr(activity_status, "manager", fake)
+    return fake.sent
+
+
+async def test_scheduler_catches_up_and_persists(maker, pushed):
+    maker, _ = maker
+    scheduler = ActivityStatusScheduler(session_factory=maker)
+
+    # 启动追平：除“无报名时间”外存储的状态都已过期（没有调度记录，不推送）
+    assert await scheduler.sync() == 5
+    assert pushed == []
+    # 每个尚未结束的活动保存一个下一时刻
+    async with maker() as db:
+        transitions = (await db.execute(select(ActivityTransition))).scalars().all()
+    assert len(transitions) == len(scheduler) == 5
+
+
+async def test_transition_fires_once_and_pushes(maker, pushed):
+    maker, _ = maker
+    first = ActivityStatusScheduler(session_factory=maker)
+    second = ActivityStatusScheduler(session_factory=maker)
+    await first.sync()
+
+    async with maker() as db:
+        activity = await db.get(Activity, 6)
+        activity.activity_start = datetime.now() + timedelta(milliseconds=200)
+        db.add_all([
+            User(id=1, student_id="S1", email="u1@campus.edu", name="用户1", hashed_password="x"),
+            User(id=2, student_id="S2", email="u2@campus.edu", name="用户2", hashed_password="x"),
+        ])
+        db.add_all([
+            ActivityRegistration(activity_id=6, user_id=1, name="用户1", student_id="S1"),
+            ActivityRegistration(activity_id=6, user_id=2, name="用户2", student_id="S2", status="cancelled"),
+        ])
+        await first.schedule(db, activity)
+        await db.commit()
+    # 另一个 worker 从表中加载到同一时刻
+    await second.load()
+
+    await asyncio.sleep(0.3)
+    assert await first.fire_due() + await second.fire_due() == 1
+    async with maker() as db:
+        assert (await db.get(Activity, 6)).status == "进行中"
+        # 没有后续时刻，调度记录删除
+        assert await db.get(ActivityTransition, 6) is None
+    assert pushed == [([1], {"type": "activity_status", "data": {
+        "activity_id": 6, "title": "无报名时间", "status": "进行中", "previous_status": "报名中",
+        "link_url": "/activities/6",
+    }})]
+
+
+async def test_reload_keeps_transitions_planned_meanwhile(maker, pushed):
+    maker, _ = maker
+    scheduler = ActivityStatusScheduler(session_factory=maker)
+    await scheduler.sync()
+
+    @asynccontextmanager
+    async def racing_factory():
+        async with maker() as db:
+            yield db
+        # 重新加载的查询已返回旧时刻，合并之前另一个请求修改了报名开始时间
+        async with maker() as db:
+            activity = await db.get(Activity, 3)
+            activity.registration_start = datetime.now() + timedelta(milliseconds=100)
+            await scheduler.schedule(db, activity)
+            await db.commit()
+
+    scheduler.session_factory = racing_factory
+    await scheduler.load()
+    scheduler.session_factory = maker
+
+    await asyncio.sleep(0.2)
+    assert await scheduler.fire_due() == 1
+    async with maker() as db:
+        assert (await db.get(Activity, 3)).status == "报名中"
+
+
+async def test_missed_transition_fires_after_restart(maker, pushed):
+    maker, _ = maker
+    await ActivityStatusScheduler(session_factory=maker).sync()
+
+    # 停机期间报名开始
+    async with maker() as db:
+        activity = await db.get(Activity, 3)
+        activity.registration_start = datetime.now() - timedelta(minutes=1)
+        transition = await db.get(ActivityTransition, 3)
+        transition.fire_at = activity.registration_start
+        await db.commit()
+
+    restarted = ActivityStatusScheduler(session_factory=maker)
+    assert await restarted.sync() == 1
+    assert [message["data"]["status"] for _, message in pushed] == ["报名中"]
+    async with maker() as db:
+        assert (await db.get(ActivityTransition, 3)).fire_at == activity.registration_end
+
+
+async def test_scheduler_loop(maker, pushed):
+    maker, _ = maker
+    scheduler = ActivityStatusScheduler(session_factory=maker)
+    await scheduler.start()
+    try:
+        async with maker() as db:
+            activity = await db.get(Activity, 3)
+            activity.registration_start = datetime.now() + timedelta(milliseconds=100)
+            await scheduler.schedule(db, activity)
+            await db.commit()
+        await asyncio.sleep(0.4)
+    finally:
+        await scheduler.stop()
+
+    async with maker() as db:
+        assert (await db.get(Activity, 3)).status == "报名中"
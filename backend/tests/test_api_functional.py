@@ -75,6 +75,20 @@ class TestNotifications:
         data = resp.json()
         assert isinstance(data, list)
 
+    async def test_list_notifications_cursor(self, client):
+        full = (await client.get("/api/notifications", params={"limit": 1000})).json()
+        seen, cursor = [], ""
+        while cursor is not None:
+            resp = await client.get("/api/notifications", params={"limit": 2, "cursor": cursor})
+            assert resp.status_code == 200
+            seen += [n["id"] for n in resp.json()]
+            cursor = resp.headers.get("X-Next-Cursor")
+        assert seen == [n["id"] for n in full]
+
+    async def test_list_notifications_invalid_cursor(self, client):
+        resp = await client.get("/api/notifications", params={"cursor": "not-a-cursor"})
+        assert resp.status_code == 400
+
     async def test_create_notification_admin(self, client, admin_headers):
         resp = await client.post("/api/notifications", headers=admin_headers, json={
             "title": "pytest测试通知",
@@ -190,6 +204,22 @@ class TestUserNotifications:
         r = await client.patch("/api/notifications/me/read-all", headers=user_headers)
         assert r.status_code in (200, 405)  # 405 if endpoint uses different method
 
+    async def test_unread_counter_matches_repair(self, client, user_headers, admin_headers):
+        # 读取计数后立即修复：物化计数与源表一致时不应有修正
+        await client.get("/api/notifications/me/unread-count", headers=user_headers)
+        r = await client.post("/api/unread-counters/repair", headers=admin_headers)
+        assert r.status_code == 200
+        assert r.json()["corrected"] == 0
+
+        r = await client.post("/api/notifications/me/read-all", headers=user_headers)
+        assert r.json()["unread_count"] == 0
+        resp = await client.get("/api/notifications/me/unread-count", headers=user_headers)
+        assert resp.json()["unread_count"] == 0
+
+    async def test_repair_requires_admin(self, client, user_headers):
+        r = await client.post("/api/unread-counters/repair", headers=user_headers)
+        assert r.status_code == 403
+
 
 class TestUserProfile:
     """用户资料接口测试。"""
@@ -0,0 +1,149 @@
+"""
+批量写接口测试 — 全部已读（up_to 截止时间与返回的计数）、批量更新用户（集合式 UPDATE 与计数）、
+删除用户时一并删除未读计数、广播水位与回执
+使用进程内 SQLite 内存库直接调用接口函数，无需启动后端。
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.models.user import User
+from app.models.user_notification import UserNotification
+from app.models.broadcast_notification import BroadcastNotification
+from app.models.user_notification_state import UserNotificationState
+from app.models.user_unread_counter import UserUnreadCounter
+from app.models.broadcast_receipt import BroadcastReceipt
+from app.api import user_notifications, users
+from app.api.unread_counts import UnreadCounter
+from app.api.principal_cache import PrincipalCache
+from app.schemas.user import UserBulkDelete, UserBulkUpdate
+
+BASE = datetime(2024, 1, 1, 12, 0)
+
+
+@pytest.fixture
+async def maker(memory_db, monkeypatch):
+    maker = memory_db.maker
+    async with maker() as db:
+        for i in (1, 2, 3):
+            db.add(User(
+                id=i, student_id=f"S{i}", email=f"u{i}@campus.edu", name=f"用户{i}",
+                hashed_password="x", created_at=BASE - timedelta(days=1),
+            ))
+        db.add_all([
+            UserNotification(
+                user_id=1, type="system", title=f"个人{m}", content="内容",
+                created_at=BASE + timedelta(minutes=m),
+            )
+            for m in (0, 1, 2)
+        ])
+        db.add_all([
+            BroadcastNotification(
+                id=m, type="activity", title=f"广播{m}", content="内容",
+                created_at=BASE + timedelta(minutes=m),
+            )
+            for m in (1, 3)
+        ])
+        await db.commit()
+
+    pushed = []
+
+    async def push_unread_count(user_id, unread_count):
+        pushed.append((user_id, unread_count))
+
+    monkeypatch.setattr(user_notifications, "unread_counter", UnreadCounter(ttl=60))
+    monkeypatch.setattr(user_notifications, "push_unread_count", push_unread_count)
+    monkeypatch.setattr(users, "principal_cache", PrincipalCache(ttl=60))
+    memory_db.statements.clear()
+    yield maker, memory_db.statements, pushed
+
+
+async def mark_all_read(maker, up_to=None) -> dict:
+    async with maker() as db:
+        user = await db.get(User, 1)
+        return await user_notifications.mark_all_read(up_to=up_to, current_user=user, db=db)
+
+
+async def test_mark_all_read_up_to(maker):
+    maker, _, pushed = maker
+    # 带时区的截止时间换算为 UTC：个人通知 0、1 分与广播 1 标记为已读
+    up_to = (BASE + timedelta(seconds=90)).replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=8)))
+    result = await mark_all_read(maker, up_to)
+
+    assert result == {"message": "Marked 2 notifications as read", "unread_count": 2}
+    assert pushed == [(1, 2)]
+    async with maker() as db:
+        assert (await db.get(UserNotificationState, 1)).broadcast_read_upto == 1
+        assert (await db.get(UserUnreadCounter, 1)).unread_count == 2
+
+    # 不带截止时间：剩余的全部已读，已读的不重复计数
+    assert await mark_all_read(maker) == {"message": "Marked 1 notifications as read", "unread_count": 0}
+    assert pushed[-1] == (1, 0)
+    async with maker() as db:
+        assert (await db.get(UserNotificationState, 1)).broadcast_read_upto == 3
+        assert (await db.get(UserUnreadCounter, 1)).unread_count == 0
+
+
+async def test_bulk_update_is_one_statement(maker):
+    maker, statements, _ = maker
+    async with maker() as db:
+        result = await users.bulk_update_users(
+            bulk_data=UserBulkUpdate(user_ids=[1, 2, 99], is_active=False), current_admin=None, db=db,
+        )
+
+    # 不存在的 ID 不计数，也不逐个加载用户
+    assert result == {"updated": 2}
+    assert [s.split()[0] for s in statements] == ["UPDATE"]
+    async with maker() as db:
+        assert [(await db.get(User, i)).is_active for i in (1, 2, 3)] == [False, False, True]
+
+
+async def test_bulk_update_without_values_counts_users(maker):
+    maker, statements, _ = maker
+    async with maker() as db:
+        result = await users.bulk_update_users(
+            bulk_data=UserBulkUpdate(user_ids=[1, 3]), current_admin=None, db=db,
+        )
+
+    assert result == {"updated": 2}
+    assert all(s.lstrip().upper().startswith("SELECT") for s in statements)
+
+
+@pytest.mark.parametrize("is_active", [False, None])
+async def test_bulk_update_no_users_found(maker, is_active):
+    maker, _, _ = maker
+    async with maker() as db:
+        with pytest.raises(HTTPException) as exc:
+            await users.bulk_update_users(
+                bulk_data=UserBulkUpdate(user_ids=[98, 99], is_active=is_active), current_admin=None, db=db,
+            )
+    assert exc.value.status_code == 404
+
+
+async def test_delete_users_removes_notification_state(maker, memory_db):
+    maker, _, _ = maker
+    async with memory_db.engine.connect() as conn:
+        # 与 MySQL 一样检查外键
+        await conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+    async with maker() as db:
+        for user_id in (2, 3):
+            db.add_all([
+                UserUnreadCounter(user_id=user_id, unread_count=1),
+                UserNotificationState(user_id=user_id, broadcast_read_upto=1),
+                BroadcastReceipt(user_id=user_id, broadcast_id=3, is_read=True),
+            ])
+        await db.commit()
+
+    async with maker() as db:
+        assert await users.delete_user(user_id=2, current_admin=None, db=db) == {"deleted": 2}
+    async with maker() as db:
+        result = await users.bulk_delete_users(
+            bulk_data=UserBulkDelete(user_ids=[3]), current_admin=None, db=db,
+        )
+    assert result == {"deleted": 1}
+
+    async with maker() as db:
+        for model in (UserUnreadCounter, UserNotificationState, BroadcastReceipt):
+            assert (await db.execute(select(model))).scalars().all() == []
@@ -0,0 +1,60 @@
+"""
+连接池配置与指标测试
+"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.db.pool import SQLITE_MAX_POOL_SIZE, InstrumentedPool, engine_options, pool_metrics
+
+
+def test_engine_options_by_backend():
+    mysql = engine_options("mysql+aiomysql://campus:x@localhost:3306/campus_hub")
+    assert mysql["poolclass"] is InstrumentedPool
+    assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping"} <= set(mysql)
+
+    sqlite_file = engine_options("sqlite+aiosqlite:///./campus_hub.db")
+    assert sqlite_file["poolclass"] is InstrumentedPool
+    assert "pool_pre_ping" not in sqlite_file and "pool_recycle" not in sqlite_file
+    # SQLite 串行写入：小连接池，不临时扩容
+    assert 1 <= sqlite_file["pool_size"] <= SQLITE_MAX_POOL_SIZE
+    assert sqlite_file["max_overflow"] == 0
+    assert mysql["pool_size"] == settings.DB_POOL_SIZE and mysql["max_overflow"] == settings.DB_MAX_OVERFLOW
+
+    assert engine_options("sqlite+aiosqlite://")["poolclass"] is StaticPool
+
+
+async def test_pool_metrics(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        **engine_options(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"),
+    )
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        metrics = pool_metrics(engine)
+        assert metrics["pool_class"] == "InstrumentedPool"
+        assert metrics["checked_out"] == 1
+
+    assert pool_metrics(engine)["checked_out"] == 0
+    assert pool_metrics(engine)["acquisitions"] == 1
+    await engine.dispose()
+    # 统计在 dispose 重建连接池后保留
+    assert pool_metrics(engine)["acquisitions"] == 1
+    await engine.dispose()
+
+
+async def test_pool_stats_are_per_engine(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+    busy = create_async_engine(url, **engine_options(url))
+    idle = create_async_engine(url, poolclass=InstrumentedPool, pool_size=1, max_overflow=3)
+    for _ in range(2):
+        async with busy.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    assert pool_metrics(busy)["acquisitions"] == 2
+    assert pool_metrics(idle)["acquisitions"] == 0
+    # 报告连接池自身的配置，而不是全局设置
+    assert pool_metrics(idle)["max_overflow"] == 3
+    await busy.dispose()
+    await idle.dispose()
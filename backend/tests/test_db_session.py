@@ -0,0 +1,77 @@
+"""
+请求会话写入跟踪测试 — 只读请求不提交，有写入时才提交
+使用进程内 SQLite 内存库，无需启动后端。
+"""
+import pytest
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.db import database
+from app.db.database import has_pending_writes
+from app.models.user import User
+
+
+@pytest.fixture
+def maker(memory_db):
+    checkouts = []
+    event.listen(memory_db.engine.sync_engine, "checkout", lambda *args: checkouts.append(1))
+    return memory_db.maker, checkouts
+
+
+def new_user(n: int) -> User:
+    return User(student_id=f"S{n}", email=f"u{n}@campus.edu", name="用户", hashed_password="x")
+
+
+async def test_unused_session_never_connects(maker):
+    maker, checkouts = maker
+    async with maker() as db:
+        assert not has_pending_writes(db)
+    assert checkouts == []
+
+
+async def test_read_only_session_has_no_writes(maker):
+    maker, _ = maker
+    async with maker() as db:
+        await db.execute(select(User))
+        assert not has_pending_writes(db)
+
+
+@pytest.mark.parametrize("write", ["add", "flush", "bulk_update"])
+async def test_writes_are_tracked(maker, write):
+    maker, _ = maker
+    async with maker() as db:
+        if write == "bulk_update":
+            await db.execute(update(User).values(name="新"))
+        else:
+            db.add(new_user(1))
+            if write == "flush":
+                await db.flush()
+        assert has_pending_writes(db)
+
+
+async def test_commit_clears_write_flag(maker):
+    maker, _ = maker
+    async with maker() as db:
+        db.add(new_user(1))
+        await db.commit()
+        await db.execute(select(User))
+        assert not has_pending_writes(db)
+
+
+async def test_failed_savepoint_keeps_outer_writes(maker, monkeypatch):
+    maker, _ = maker
+    monkeypatch.setattr(database, "async_session_maker", maker)
+
+    sessions = database.get_db()
+    db = await anext(sessions)
+    await db.execute(insert(User).values(student_id="S1", email="u1@campus.edu", name="用户", hashed_password="x"))
+    with pytest.raises(IntegrityError):
+        async with db.begin_nested():
+            db.add(new_user(1))
+    assert db.in_transaction()
+    assert has_pending_writes(db)
+    with pytest.raises(StopAsyncIteration):
+        await anext(sessions)
+
+    async with maker() as db:
+        assert (await db.execute(select(User.student_id))).scalars().all() == ["S1"]
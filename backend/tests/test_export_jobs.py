@@ -0,0 +1,107 @@
+"""
+后台导出任务测试 — 去重复用、文件落盘与过期清理
+使用进程内 SQLite 内存库直接调用任务引擎，无需启动后端。
+"""
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.models.user import User
+from app.api.exports import ExportColumn
+from app.api import export_jobs
+from app.api.export_jobs import ExportJobEngine
+
+COLUMNS = [ExportColumn("ID", lambda row: row.id), ExportColumn("姓名", lambda row: row.name)]
+QUERY = select(User.id, User.name).order_by(User.id)
+
+
+@pytest.fixture
+async def engine(memory_db, tmp_path):
+    maker = memory_db.maker
+    async with maker() as db:
+        for i in range(3):
+            db.add(User(id=i + 1, student_id=f"S{i}", email=f"u{i}@campus.edu", name=f"用户{i}", hashed_password="x"))
+        await db.commit()
+
+    jobs = ExportJobEngine(directory=str(tmp_path), reuse_window=60, retention=600, session_factory=maker)
+    yield jobs
+    await jobs.shutdown()
+
+
+def submit(jobs, fmt="csv", requested_by=1):
+    return jobs.submit("users", {}, fmt, QUERY, COLUMNS, "users_export", requested_by=requested_by)
+
+
+async def wait_finished(job):
+    for _ in range(100):
+        if job.status in ("completed", "failed"):
+            return
+        await asyncio.sleep(0.01)
+
+
+async def test_identical_requests_reuse_artifact(engine):
+    first = submit(engine, requested_by=1)
+    second = submit(engine, requested_by=2)
+    await wait_finished(first)
+
+    assert second is first
+    assert first.subscribers == {1, 2}
+    assert first.status == "completed"
+    assert first.path.read_bytes().decode("utf-8-sig").splitlines()[1] == "1,用户0"
+
+    # 不同格式是不同的导出
+    other = submit(engine, fmt="xlsx")
+    assert other is not first
+    await wait_finished(other)
+    assert other.path.is_file()
+
+
+async def test_reuse_window_and_retention(engine):
+    job = submit(engine)
+    await wait_finished(job)
+
+    job.submitted_at -= 61
+    assert submit(engine) is not job
+
+    engine.purge(now=time.monotonic() + 601)
+    assert engine.get(job.id) is None
+    assert not job.path.exists()
+
+
+async def test_purge_only_removes_own_leftovers(engine):
+    # 导出目录中的遗留导出文件（进程重启前生成）与其他文件
+    leftover = engine.directory / f"{'a' * 32}.csv"
+    foreign = [engine.directory / name for name in ("report.csv", "notes.txt", f"{'a' * 32}.csv.bak")]
+    for path in [leftover, *foreign]:
+        path.write_text("x")
+        old = time.time() - 601
+        os.utime(path, (old, old))
+
+    engine.purge()
+    assert not leftover.exists()
+    assert all(path.exists() for path in foreign)
+
+
+async def test_only_finished_jobs_are_evicted(engine, monkeypatch):
+    monkeypatch.setattr(export_jobs, "MAX_TRACKED_JOBS", 2)
+    first = engine.submit("users", {"n": 1}, "csv", QUERY, COLUMNS, "users_export", requested_by=1)
+    second = engine.submit("users", {"n": 2}, "csv", QUERY, COLUMNS, "users_export", requested_by=1)
+
+    # 两个任务都未结束：拒绝新的导出，而不是淘汰仍在写文件的任务
+    with pytest.raises(HTTPException) as exc:
+        engine.submit("users", {"n": 3}, "csv", QUERY, COLUMNS, "users_export", requested_by=1)
+    assert exc.value.status_code == 503
+    assert engine.get(first.id) is first
+
+    await wait_finished(first)
+    await wait_finished(second)
+    third = engine.submit("users", {"n": 3}, "csv", QUERY, COLUMNS, "users_export", requested_by=1)
+    assert engine.get(first.id) is None
+    assert not first.path.exists()
+    assert engine.get(second.id) is second
+    await wait_finished(third)
+    assert third.status == "completed"
@@ -0,0 +1,67 @@
+"""
+流式导出引擎测试 — 按块读取、CSV / Excel 输出与列宽
+使用进程内 SQLite 内存库直接调用导出函数，无需启动后端。
+"""
+import csv
+import io
+
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy import select
+
+from app.models.user import User
+from app.api.exports import ExportColumn, export_chunks, csv_stream, write_xlsx
+
+COLUMNS = [
+    ExportColumn("ID", lambda row: row.id),
+    ExportColumn("姓名", lambda row: row.name),
+    ExportColumn("专业", lambda row: row.major or ""),
+]
+QUERY = select(User.id, User.name, User.major).order_by(User.id)
+
+
+@pytest.fixture
+async def session_factory(memory_db):
+    maker = memory_db.maker
+
+    async with maker() as db:
+        for i in range(25):
+            db.add(User(
+                id=i + 1,
+                student_id=f"S{i}",
+                email=f"u{i}@campus.edu",
+                name=f"用户{i}",
+                hashed_password="x",
+                major="计算机科学与技术" if i == 7 else None,
+            ))
+        await db.commit()
+
+    yield maker
+
+
+async def test_export_reads_in_chunks(session_factory):
+    chunks = [rows async for rows in export_chunks(QUERY, COLUMNS, chunk_size=10, session_factory=session_factory)]
+
+    assert [len(rows) for rows in chunks] == [10, 10, 5]
+    assert chunks[0][0] == [1, "用户0", ""]
+
+
+async def test_csv_stream(session_factory):
+    body = b"".join([chunk async for chunk in csv_stream(QUERY, COLUMNS, session_factory=session_factory)])
+    rows = list(csv.reader(io.StringIO(body.decode("utf-8-sig"))))
+
+    assert rows[0] == ["ID", "姓名", "专业"]
+    assert len(rows) == 26
+    assert rows[8] == ["8", "用户7", "计算机科学与技术"]
+
+
+async def test_xlsx_export_with_column_widths(session_factory, tmp_path):
+    path = str(tmp_path / "users.xlsx")
+    await write_xlsx(QUERY, COLUMNS, path, sheet_name="用户数据", session_factory=session_factory)
+
+    worksheet = load_workbook(path)["用户数据"]
+    assert worksheet.max_row == 26
+    assert [cell.value for cell in worksheet[9]] == [8, "用户7", "计算机科学与技术"]
+    # 列宽 = 最长值 + 2
+    assert worksheet.column_dimensions["B"].width == len("用户10") + 2
+    assert worksheet.column_dimensions["C"].width == len("计算机科学与技术") + 2
@@ -0,0 +1,111 @@
+"""
+通知扇出测试 — 任务生命周期（pending → running → completed / failed）、广播写入、计数行 +1 与在线推送
+使用进程内 SQLite 内存库直接调用扇出引擎，无需启动后端。
+"""
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.models.user import User
+from app.models.broadcast_notification import BroadcastNotification
+from app.models.user_unread_counter import UserUnreadCounter
+from app.api import fanout
+from app.api.fanout import FanoutEngine
+from app.api.unread_counts import UnreadCounter, increment_all_unread_counters
+
+
+class FakeManager:
+    def __init__(self):
+        self.broadcasts = []
+
+    async def broadcast(self, message):
+        self.broadcasts.append(json.loads(message))
+
+
+@pytest.fixture
+async def maker(memory_db, monkeypatch):
+    maker = memory_db.maker
+    async with maker() as db:
+        for i in (1, 2, 3):
+            db.add(User(id=i, student_id=f"S{i}", email=f"u{i}@campus.edu", name=f"用户{i}", hashed_password="x"))
+        # 用户 3 还没有计数行（首次读取时从源表计算）
+        db.add_all([UserUnreadCounter(user_id=1, unread_count=0), UserUnreadCounter(user_id=2, unread_count=3)])
+        await db.commit()
+    yield maker
+
+
+@pytest.fixture
+def pushed(monkeypatch):
+    manager = FakeManager()
+    counter = UnreadCounter(ttl=60)
+    counter._store(1, 0)
+    monkeypatch.setattr(fanout, "manager", manager)
+    monkeypatch.setattr(fanout, "unread_counter", counter)
+    return manager.broadcasts, counter
+
+
+async def wait_finished(job):
+    for _ in range(100):
+        if job.status in ("completed", "failed"):
+            return
+        await asyncio.sleep(0.01)
+
+
+async def counters(maker) -> dict:
+    async with maker() as db:
+        result = await db.execute(select(UserUnreadCounter.user_id, UserUnreadCounter.unread_count))
+        return dict(result.all())
+
+
+async def test_fanout_publishes_broadcast(maker, pushed, monkeypatch):
+    broadcasts, counter = pushed
+    release = asyncio.Event()
+
+    async def slow_increment(db):
+        await release.wait()
+        return await increment_all_unread_counters(db)
+
+    monkeypatch.setattr(fanout, "increment_all_unread_counters", slow_increment)
+    engine = FanoutEngine(session_factory=maker)
+    job = engine.submit("course", "调课通知", "周三改到周四", link_url="/notifications", related_id=7)
+    assert engine.get(job.id) is job
+    assert job.status == "pending"
+
+    await asyncio.sleep(0.01)
+    assert (job.status, job.progress) == ("running", 0.0)
+    release.set()
+    await wait_finished(job)
+
+    assert job.status == "completed"
+    assert (job.total, job.processed, job.progress) == (2, 2, 1.0)
+    assert job.finished_at is not None and job.error is None
+    async with maker() as db:
+        broadcast = await db.get(BroadcastNotification, job.broadcast_id)
+    assert (broadcast.type, broadcast.title, broadcast.related_id) == ("course", "调课通知", 7)
+    # 已有计数行 +1，缓存同步 +1，在线用户收到一次广播
+    assert await counters(maker) == {1: 1, 2: 4}
+    assert counter._fresh(1) == 1
+    assert broadcasts == [{"type": "new_notification", "data": {
+        "type": "course", "title": "调课通知", "content": "周三改到周四", "link_url": "/notifications",
+    }}]
+    assert job.to_response().broadcast_id == job.broadcast_id
+
+
+async def test_failed_insert_marks_job_failed(maker, pushed):
+    broadcasts, counter = pushed
+    engine = FanoutEngine(session_factory=maker)
+    # title 不可为空：写入广播失败
+    job = engine.submit("course", None, "内容")
+    await wait_finished(job)
+
+    assert job.status == "failed"
+    assert "NOT NULL" in job.error
+    assert job.broadcast_id is None and job.finished_at is not None
+    async with maker() as db:
+        assert (await db.execute(select(BroadcastNotification))).scalars().all() == []
+    # 整个事务回滚，不推送也不改缓存
+    assert await counters(maker) == {1: 0, 2: 3}
+    assert counter._fresh(1) == 0
+    assert broadcasts == []
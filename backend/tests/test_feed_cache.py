@@ -0,0 +1,80 @@
+"""
+首页动态缓存测试 — 按 limit 档位命中、写入后失效、并发失效时不缓存旧结果
+使用进程内 SQLite 内存库直接调用接口函数，无需启动后端。
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.notification import Notification
+from app.models.lost_item import LostItem
+from app.api import feed
+from app.api.feed_cache import FeedCache
+
+
+@pytest.fixture
+async def maker(memory_db, monkeypatch):
+    maker = memory_db.maker
+
+    now = datetime.utcnow()
+    async with maker() as db:
+        for i in range(3):
+            db.add(Notification(
+                title=f"通知{i}", content="内容", course="课程", author="老师",
+                created_at=now - timedelta(minutes=i),
+            ))
+        db.add(LostItem(
+            title="待审核", type="lost", category="证件", description="校园卡",
+            location="图书馆", time="今天", created_at=now,
+        ))
+        await db.commit()
+
+    statements = memory_db.statements
+    statements.clear()
+    monkeypatch.setattr(feed, "feed_cache", FeedCache(ttl=60))
+    yield maker, statements
+
+
+async def test_cached_feed_skips_queries(maker):
+    maker, statements = maker
+
+    async with maker() as db:
+        first = await feed.get_latest_feed(limit=2, db=db)
+    queries = len(statements)
+    async with maker() as db:
+        second = await feed.get_latest_feed(limit=5, db=db)
+
+    # limit 2 和 5 落在同一档位（10），第二次不查询数据库
+    assert len(statements) == queries
+    assert [item["title"] for item in first["items"]] == ["通知0", "通知1"]
+    assert second["total"] == 3
+    assert second["items"][0]["time"] == "刚刚"
+    # 未审核的失物招领不出现在首页
+    assert all(item["type"] != "lost_item" for item in second["items"])
+    assert (feed.feed_cache.hits, feed.feed_cache.misses) == (1, 1)
+
+
+async def test_invalidate_drops_entries(maker):
+    maker, _ = maker
+
+    async with maker() as db:
+        await feed.get_latest_feed(limit=10, db=db)
+        db.add(Notification(title="新通知", content="内容", course="课程", author="老师"))
+        await db.commit()
+        await feed.feed_cache.invalidate()
+        result = await feed.get_latest_feed(limit=10, db=db)
+
+    assert result["items"][0]["title"] == "新通知"
+    assert result["total"] == 4
+
+
+async def test_stale_build_not_cached():
+    cache = FeedCache(ttl=60)
+    generation = cache.generation
+    await cache.invalidate()
+    cache.put(10, [], generation)
+    assert len(cache) == 0
+
+    assert cache.bucket_for(1) == 10
+    assert cache.bucket_for(21) == 50
+    assert cache.bucket_for(101) is None
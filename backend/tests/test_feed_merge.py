@@ -0,0 +1,137 @@
+"""
+首页动态归并测试 — 跨来源按时间排序、按需分页读取、只投影需要的列且不写数据库
+使用进程内 SQLite 内存库直接调用归并函数，无需启动后端。
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.notification import Notification
+from app.models.activity import Activity
+from app.models.lost_item import LostItem
+from app.api import feed
+from app.api.feed_merge import merge_feed
+from app.api.pagination import encode_cursor
+
+BASE = datetime(2024, 1, 1, 12, 0)
+
+
+def notification(minute: int, **kwargs) -> Notification:
+    return Notification(
+        title=f"通知{minute}", content=kwargs.pop("content", "内容"), course="课程", author="老师",
+        created_at=BASE + timedelta(minutes=minute), **kwargs,
+    )
+
+
+def activity(minute: int) -> Activity:
+    return Activity(
+        title=f"活动{minute}", description="描述", date="", location="礼堂", organizer="学生会",
+        image="", category="文艺", status="报名中", activity_start=datetime(2000, 1, 1),
+        activity_end=datetime(2000, 1, 2), created_at=BASE + timedelta(minutes=minute),
+    )
+
+
+def lost_item(minute: int, review_status: str = "approved") -> LostItem:
+    return LostItem(
+        title=f"失物{minute}", type="found", category="证件", description="校园卡", location="食堂",
+        time="今天", review_status=review_status, created_at=BASE + timedelta(minutes=minute),
+    )
+
+
+@pytest.fixture
+async def maker(memory_db):
+    maker = memory_db.maker
+    async with maker() as db:
+        db.add_all([notification(m) for m in range(0, 60, 2)])
+        db.add(notification(100, content="长" * 150, is_important=True))
+        db.add_all([activity(m) for m in (1, 3, 5)])
+        db.add_all([lost_item(7), lost_item(9, review_status="pending")])
+        await db.commit()
+
+    statements = memory_db.statements
+    statements.clear()
+    yield maker, statements
+
+
+async def titles(maker, limit: int, **kwargs) -> list[str]:
+    async with maker() as db:
+        merged = await merge_feed(db, limit, **kwargs)
+    return [source.to_item(row)["title"] for source, row in merged]
+
+
+async def test_merge_orders_across_sources(maker):
+    maker, statements = maker
+    result = await titles(maker, 40, page_size=4)
+
+    assert result[:8] == ["通知100", "通知58", "通知56", "通知54", "通知52", "通知50", "通知48", "通知46"]
+    assert result[-9:] == ["通知8", "失物7", "通知6", "活动5", "通知4", "活动3", "通知2", "活动1", "通知0"]
+    # 待审核的失物招领不出现
+    assert "失物9" not in result
+    assert len(result) == 35
+    # 只读：不产生任何写语句
+    assert all(sql.lstrip().upper().startswith("SELECT") for sql in statements)
+
+
+async def test_merge_reads_pages_lazily(maker):
+    maker, statements = maker
+    await titles(maker, 5, page_size=5)
+
+    # 通知源一页就足够，活动与失物招领各只读第一页
+    assert len(statements) == 3
+    # 只投影需要的列，描述在数据库端截取
+    assert "substr(notifications.content" in statements[0]
+    assert "notifications.author" not in statements[0]
+
+
+async def test_item_projection(maker):
+    maker, _ = maker
+    async with maker() as db:
+        merged = await merge_feed(db, 40)
+    items = {item["title"]: item for item in (source.to_item(row) for source, row in merged)}
+
+    assert items["通知100"]["tag"] == "重要"
+    assert items["通知100"]["description"] == "长" * 100 + "..."
+    assert items["活动5"]["tag"] == "已结束"
+    assert items["活动5"]["link_url"].startswith("/activities/")
+    assert items["失物7"]["tag"] == "招领"
+
+
+async def test_deep_page_is_range_scan(maker):
+    maker, statements = maker
+    async with maker() as db:
+        first = await feed.get_feed(limit=30, db=db)
+        statements.clear()
+        page = await feed.get_feed(limit=4, cursor=first["next_cursor"], db=db)
+
+    assert [item["title"] for item in page["items"]] == ["通知4", "活动3", "通知2", "活动1"]
+    # 每个来源一次从游标位置开始的范围查询，与翻页深度无关
+    assert len(statements) == 3
+    assert all("created_at <" in sql for sql in statements)
+
+
+async def test_cursor_walk_matches_merge(maker):
+    maker, _ = maker
+    async with maker() as db:
+        # created_at 相同的不同来源（游标需要按来源和 id 区分）
+        db.add_all([notification(5), lost_item(5), lost_item(5)])
+        await db.commit()
+        expected = [source.to_item(row)["id"] for source, row in await merge_feed(db, 100)]
+
+        walked, cursor = [], None
+        while True:
+            page = await feed.get_feed(limit=3, cursor=cursor, db=db)
+            walked += [item["id"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+    assert walked == expected
+
+
+async def test_invalid_cursor(maker):
+    maker, _ = maker
+    async with maker() as db:
+        with pytest.raises(HTTPException) as exc:
+            await feed.get_feed(limit=3, cursor=encode_cursor(BASE, "unknown", 1), db=db)
+    assert exc.value.status_code == 400
@@ -0,0 +1,73 @@
+"""
+失物招领发布者批量解析测试 — 查询次数回归
+使用进程内 SQLite 内存库直接调用接口函数，无需启动后端。
+"""
+import pytest
+from fastapi import Response
+
+from app.models.user import User
+from app.models.lost_item import LostItem
+from app.api.lost_items import get_lost_items
+
+
+@pytest.fixture
+async def session(memory_db):
+    maker = memory_db.maker
+
+    async with maker() as db:
+        for i in range(5):
+            db.add(User(
+                id=i + 1,
+                student_id=f"S{i}",
+                email=f"u{i}@campus.edu",
+                name=f"用户{i}",
+                hashed_password="x",
+                phone=f"1380000000{i}",
+                show_phone_in_lost_item=(i % 2 == 0),
+            ))
+        for i in range(30):
+            db.add(LostItem(
+                title=f"物品{i}",
+                type="lost",
+                category="电子数码",
+                description="desc",
+                location="图书馆",
+                time="今天",
+                review_status="approved",
+                created_by=(i % 5) + 1,
+            ))
+        await db.commit()
+
+    statements = memory_db.statements
+    statements.clear()
+    async with maker() as db:
+        yield db, statements
+
+
+async def list_items(db, limit):
+    return await get_lost_items(
+        item_type=None, category=None, created_by=None, review_status=None,
+        skip=0, limit=limit, cursor=None, response=Response(),
+        current_user=None, db=db,
+    )
+
+
+@pytest.mark.parametrize("limit", [5, 30])
+async def test_lost_item_list_query_count_is_constant(session, limit):
+    db, statements = session
+    items = await list_items(db, limit)
+
+    assert len(items) == limit
+    # 一条查物品 + 一条 IN 查发布者，与页大小无关
+    assert len(statements) == 2
+
+
+async def test_publisher_privacy_applied(session):
+    db, _ = session
+    items = await list_items(db, 30)
+
+    by_user = {item.publisher["id"]: item.publisher for item in items}
+    assert len(by_user) == 5
+    assert by_user[1]["phone"] == "13800000000"
+    assert by_user[2]["phone"] is None
+    assert by_user[2]["name"] == "用户1"
@@ -0,0 +1,100 @@
+"""
+游标分页测试 — 格式错误的游标返回 400，不会把任意 JSON 值带进 SQL 参数
+使用进程内 SQLite 内存库直接调用接口函数，无需启动后端。
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.models.notification import Notification
+from app.api import notifications
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+BASE = datetime(2024, 1, 1, 12, 0)
+
+
+def raw_cursor(values) -> str:
+    """按游标编码方式直接编码任意 JSON 值（模拟客户端伪造的游标）。"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+INVALID_CURSORS = [
+    "not-base64!",
+    raw_cursor({"created_at": "2030-01-01T00:00:00"}),
+    raw_cursor(["2030-01-01T00:00:00"]),
+    raw_cursor(["2030-01-01T00:00:00", [1]]),
+    raw_cursor(["2030-01-01T00:00:00", "1"]),
+    raw_cursor(["2030-01-01T00:00:00", 1.5]),
+    raw_cursor(["2030-01-01T00:00:00", True]),
+    raw_cursor([20300101, 1]),
+    raw_cursor(["yesterday", 1]),
+]
+
+
+@pytest.fixture
+async def maker(memory_db):
+    maker = memory_db.maker
+    async with maker() as db:
+        db.add_all([
+            Notification(
+                title=f"通知{m}", content="内容", course="课程", author="老师",
+                created_at=BASE + timedelta(minutes=m),
+            )
+            for m in range(5)
+        ])
+        await db.commit()
+    yield maker
+
+
+@pytest.mark.parametrize("cursor", INVALID_CURSORS)
+def test_decode_rejects_malformed_cursor(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("values", [
+    ["2030-01-01T00:00:00", "unknown", 1],
+    ["2030-01-01T00:00:00", ["personal"], 1],
+    ["2030-01-01T00:00:00", "personal", {"id": 1}],
+])
+def test_decode_rejects_unknown_source(values):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(raw_cursor(values), sources=("personal", "broadcast"))
+    assert exc.value.status_code == 400
+
+
+def test_decode_round_trip():
+    assert decode_cursor(encode_cursor(BASE, 7)) == (BASE, 7)
+    assert decode_cursor(encode_cursor(BASE, "broadcast", 7), sources=("personal", "broadcast")) == (
+        BASE, "broadcast", 7,
+    )
+
+
+async def list_notifications(maker, cursor: str, limit: int = 2):
+    response = Response()
+    async with maker() as db:
+        items = await notifications.get_notifications(
+            created_by=None, skip=0, limit=limit, cursor=cursor, response=response, db=db,
+        )
+    return [item.title for item in items], response.headers.get(NEXT_CURSOR_HEADER)
+
+
+@pytest.mark.parametrize("cursor", INVALID_CURSORS)
+async def test_list_rejects_malformed_cursor(maker, cursor):
+    with pytest.raises(HTTPException) as exc:
+        await list_notifications(maker, cursor)
+    assert exc.value.status_code == 400
+
+
+async def test_cursor_walk(maker):
+    titles, cursor = await list_notifications(maker, "")
+    assert titles == ["通知4", "通知3"]
+    titles, cursor = await list_notifications(maker, cursor)
+    assert titles == ["通知2", "通知1"]
+    titles, cursor = await list_notifications(maker, cursor)
+    assert titles == ["通知0"]
+    assert cursor is None
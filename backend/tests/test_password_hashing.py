@@ -0,0 +1,31 @@
+"""
+异步密码哈希测试 — bcrypt 在线程池中执行，不阻塞事件循环
+"""
+import asyncio
+
+from app.core.security import get_password_hash_async, verify_password_async
+
+
+async def test_async_password_roundtrip():
+    hashed = await get_password_hash_async("secret")
+
+    assert await verify_password_async("secret", hashed)
+    assert not await verify_password_async("wrong", hashed)
+
+
+async def test_hashing_does_not_block_event_loop():
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    await asyncio.gather(*(get_password_hash_async("secret") for _ in range(2)))
+    task.cancel()
+
+    # 每次 bcrypt 约 200ms 以上，事件循环在此期间应持续调度其他协程
+    assert ticks > 5
@@ -0,0 +1,64 @@
+"""
+已认证用户缓存测试 — 命中时不查询数据库，修改后失效
+使用进程内 SQLite 内存库直接调用缓存，无需启动后端。
+"""
+import pytest
+
+from app.models.user import User
+from app.api.principal_cache import PrincipalCache
+
+
+@pytest.fixture
+async def maker(memory_db):
+    maker = memory_db.maker
+    async with maker() as db:
+        db.add(User(id=1, student_id="S1", email="u1@campus.edu", name="用户1", hashed_password="x"))
+        await db.commit()
+
+    statements = memory_db.statements
+    statements.clear()
+    yield maker, statements
+
+
+async def test_cached_principal_skips_select(maker):
+    maker, statements = maker
+    cache = PrincipalCache(ttl=60)
+
+    async with maker() as db:
+        assert (await cache.load(db, 1)).name == "用户1"
+    async with maker() as db:
+        user = await cache.load(db, 1)
+
+    assert user.name == "用户1"
+    assert len([s for s in statements if s.startswith("SELECT")]) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_changes_on_cached_principal_are_persisted(maker):
+    maker, statements = maker
+    cache = PrincipalCache(ttl=60)
+    async with maker() as db:
+        await cache.load(db, 1)
+
+    async with maker() as db:
+        user = await cache.load(db, 1)
+        user.name = "新名字"
+        await db.commit()
+    await cache.invalidate(1)
+
+    async with maker() as db:
+        assert (await cache.load(db, 1)).name == "新名字"
+    assert cache.misses == 2
+
+
+async def test_stale_load_is_not_cached_after_invalidation(maker):
+    maker, _ = maker
+    cache = PrincipalCache(ttl=60)
+    async with maker() as db:
+        user = await db.get(User, 1)
+
+    generation = cache.generation
+    await cache.invalidate(1)
+    cache.put(user, generation)
+
+    assert cache.get(1) is None
@@ -0,0 +1,48 @@
+"""
+令牌缓存测试 — 已验证的声明按 LRU 缓存，并在令牌过期时失效
+"""
+import time
+from datetime import timedelta
+
+from app.core.security import TokenCache, create_access_token, decode_access_token, token_cache
+
+
+def test_decode_uses_cache():
+    token = create_access_token({"sub": "1"})
+    hits = token_cache.hits
+
+    first = decode_access_token(token)
+    second = decode_access_token(token)
+
+    assert first == second and first["sub"] == "1"
+    assert token_cache.hits == hits + 1
+    # 返回副本，调用方修改不影响缓存
+    second["sub"] = "2"
+    assert decode_access_token(token)["sub"] == "1"
+
+
+def test_invalid_token_is_not_cached():
+    size = token_cache.stats()["size"]
+    assert decode_access_token("not-a-token") is None
+    assert token_cache.stats()["size"] == size
+
+
+def test_lru_eviction_and_expiry():
+    cache = TokenCache(max_size=2)
+    now = time.time()
+    cache.put("a", {"sub": "1", "exp": now + 60})
+    cache.put("b", {"sub": "2", "exp": now + 60})
+    cache.get("a")
+    cache.put("c", {"sub": "3", "exp": now + 60})
+
+    assert cache.get("b") is None  # 最久未使用的被淘汰
+    assert cache.get("a")["sub"] == "1"
+    assert cache.stats()["evictions"] == 1
+
+    cache.put("expired", {"sub": "4", "exp": now - 1})
+    assert cache.get("expired") is None
+
+
+def test_expired_token_rejected():
+    token = create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=-1))
+    assert decode_access_token(token) is None
@@ -0,0 +1,61 @@
+"""
+物化未读数测试 — 读取不提交调用方事务，修复任务不覆盖并发变更
+使用进程内 SQLite 内存库直接调用计数函数，无需启动后端。
+"""
+import pytest
+from sqlalchemy import event, select
+
+from app.models.user import User
+from app.models.user_unread_counter import UserUnreadCounter
+from app.api.unread_counts import read_unread_counter, repair_unread_counters
+
+
+@pytest.fixture
+async def maker(memory_db):
+    maker = memory_db.maker
+    async with maker() as db:
+        for i in (1, 2):
+            db.add(User(id=i, student_id=f"S{i}", email=f"u{i}@campus.edu", name=f"用户{i}", hashed_password="x"))
+        await db.commit()
+    yield maker, memory_db.engine
+
+
+async def counts(maker) -> dict:
+    async with maker() as db:
+        result = await db.execute(select(UserUnreadCounter.user_id, UserUnreadCounter.unread_count))
+        return dict(result.all())
+
+
+async def test_read_leaves_commit_to_caller(maker, monkeypatch):
+    maker, _ = maker
+    async with maker() as db:
+        commits = []
+        monkeypatch.setattr(db, "commit", lambda: commits.append(True))
+        assert await read_unread_counter(db, 1) == 0
+        # 计数行已写入当前事务，但不提交调用方的事务
+        assert commits == []
+        assert db.in_transaction()
+        assert await db.get(UserUnreadCounter, 1) is not None
+
+
+async def test_repair_skips_rows_changed_concurrently(maker):
+    maker, engine = maker
+    async with maker() as db:
+        db.add_all([UserUnreadCounter(user_id=1, unread_count=5), UserUnreadCounter(user_id=2, unread_count=3)])
+        await db.commit()
+
+    # 读取现有计数之后，另一个请求为用户 1 记入了新的未读数
+    def concurrent_adjust(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT user_unread_counters.user_id") and not changed:
+            changed.append(True)
+            conn.exec_driver_sql("UPDATE user_unread_counters SET unread_count = 6 WHERE user_id = 1")
+
+    changed = []
+    event.listen(engine.sync_engine, "after_cursor_execute", concurrent_adjust)
+    async with maker() as db:
+        result = await repair_unread_counters(db)
+
+    assert changed
+    assert result == {"checked": 2, "created": 0, "corrected": 1}
+    # 用户 2 被修正；用户 1 的并发变更没有被旧的重算结果覆盖
+    assert await counts(maker) == {1: 6, 2: 0}
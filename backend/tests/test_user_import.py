@@ -0,0 +1,80 @@
+"""
+批量导入用户测试 — 向量化校验、逐行错误报告与批量写入
+使用进程内 SQLite 内存库直接调用导入流程，无需启动后端。
+"""
+import pytest
+from sqlalchemy import select
+
+from app.core.security import verify_password
+from app.models.user import User
+from app.api import user_import
+from app.api.user_import import import_roster
+
+ROSTER = """name,email,student_id,role,major,password
+张三, Zhang@Campus.edu ,2024001,,计算机,secret1
+李四,li@campus.edu,2024002,admin,,
+,nobody@campus.edu,2024003,,,
+王五,not-an-email,2024004,,,
+赵六,zhang@campus.edu,2024005,,,
+钱七,taken@campus.edu,2024006,,,
+孙八,sun@campus.edu,2024007,teacher,,
+周九,zhou@campus.edu,EXISTING01,,,
+吴十,wu@campus.edu,2024009,,,
+"""
+
+
+@pytest.fixture
+async def session(memory_db):
+    maker = memory_db.maker
+
+    async with maker() as db:
+        db.add(User(student_id="EXISTING01", email="taken@campus.edu", name="老用户", hashed_password="x"))
+        await db.commit()
+
+    statements = memory_db.statements
+    statements.clear()
+    async with maker() as db:
+        yield db, statements
+
+
+async def test_import_reports_row_errors(session):
+    db, _ = session
+    results = await import_roster(db, ROSTER.encode("utf-8"), "roster.csv")
+    await db.commit()
+
+    assert results["success"] == 3
+    assert results["failed"] == 6
+    assert results["errors"] == [
+        "Row 4: Missing name",
+        "Row 5: Invalid email 'not-an-email'",
+        "Row 6: Email 'zhang@campus.edu' is duplicated in the file",
+        "Row 7: Email 'taken@campus.edu' already exists",
+        "Row 8: Invalid role 'teacher'",
+        "Row 9: Student ID 'EXISTING01' already exists",
+    ]
+
+    users = {u.email: u for u in (await db.execute(select(User))).scalars()}
+    zhang = users["zhang@campus.edu"]
+    assert (zhang.name, zhang.student_id, zhang.role, zhang.major) == ("张三", "2024001", "user", "计算机")
+    assert zhang.is_verified
+    assert verify_password("secret1", zhang.hashed_password)
+    assert users["li@campus.edu"].role == "admin"
+    assert verify_password("123456", users["wu@campus.edu"].hashed_password)
+
+
+async def test_import_query_count_is_constant(session, monkeypatch):
+    db, statements = session
+    monkeypatch.setattr(user_import, "INSERT_CHUNK_SIZE", 2)
+    await import_roster(db, ROSTER.encode("utf-8"), "roster.csv")
+
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    # 3 行有效数据，每批 2 行 -> 2 条多行 INSERT；只查询一次已有用户
+    assert len(inserts) == 2
+    assert len(selects) == 1
+
+
+async def test_missing_columns(session):
+    db, _ = session
+    with pytest.raises(ValueError, match="student_id"):
+        await import_roster(db, "name,email\na,a@b.cn\n".encode("utf-8"), "roster.csv")
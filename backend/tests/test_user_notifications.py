@@ -0,0 +1,122 @@
+"""
+个人通知列表测试 — 个人通知与广播归并排序、游标翻页、已读状态（回执 / 水位）、隐藏广播与可见范围
+使用进程内 SQLite 内存库直接调用接口函数，无需启动后端。
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.models.user import User
+from app.models.user_notification import UserNotification
+from app.models.broadcast_notification import BroadcastNotification
+from app.models.broadcast_receipt import BroadcastReceipt
+from app.models.user_notification_state import UserNotificationState
+from app.api import user_notifications
+from app.api.unread_counts import UnreadCounter
+from app.api.pagination import NEXT_CURSOR_HEADER
+
+BASE = datetime(2024, 1, 1, 12, 0)
+
+# 用户 1 注册后的完整列表：created_at 相同时个人通知在前
+EXPECTED = [
+    ("broadcast", 5), ("broadcast", 4), ("broadcast", 3),
+    ("personal", 3), ("personal", 2), ("broadcast", 2), ("personal", 1),
+]
+
+
+def at(minutes: int) -> datetime:
+    return BASE + timedelta(minutes=minutes)
+
+
+@pytest.fixture
+async def maker(memory_db, monkeypatch):
+    maker = memory_db.maker
+    async with maker() as db:
+        db.add_all([
+            User(id=1, student_id="S1", email="u1@campus.edu", name="用户1", hashed_password="x", created_at=at(0)),
+            User(id=2, student_id="S2", email="u2@campus.edu", name="用户2", hashed_password="x", created_at=at(10)),
+        ])
+        db.add_all([
+            UserNotification(id=m, user_id=1, type="system", title=f"个人{m}", content="内容", created_at=at(m))
+            for m in (1, 2, 3)
+        ])
+        # 广播 1 早于两个用户注册
+        db.add_all([
+            BroadcastNotification(id=i, type="activity", title=f"广播{i}", content="内容", created_at=at(m))
+            for i, m in ((1, -5), (2, 2), (3, 4), (4, 5), (5, 11))
+        ])
+        await db.commit()
+
+    async def push_unread_count(user_id, unread_count):
+        pass
+
+    monkeypatch.setattr(user_notifications, "unread_counter", UnreadCounter(ttl=60))
+    monkeypatch.setattr(user_notifications, "push_unread_count", push_unread_count)
+    yield maker
+
+
+async def list_page(maker, user_id: int = 1, limit: int = 20, cursor=None):
+    response = Response()
+    async with maker() as db:
+        user = await db.get(User, user_id)
+        items = await user_notifications.get_my_notifications(
+            current_user=user, db=db, skip=0, limit=limit, cursor=cursor, response=response,
+        )
+    return items, response.headers.get(NEXT_CURSOR_HEADER)
+
+
+async def call(maker, endpoint, notification_id: int, user_id: int = 1):
+    async with maker() as db:
+        user = await db.get(User, user_id)
+        return await endpoint(notification_id, source="broadcast", current_user=user, db=db)
+
+
+async def test_personal_and_broadcast_merge_order(maker):
+    items, _ = await list_page(maker)
+    assert [(n.source, n.id) for n in items] == EXPECTED
+
+
+async def test_cursor_walk_matches_list(maker):
+    walked, cursor = [], ""
+    while cursor is not None:
+        items, cursor = await list_page(maker, limit=2, cursor=cursor)
+        walked += [(n.source, n.id) for n in items]
+    assert walked == EXPECTED
+
+
+async def test_receipt_and_watermark_mark_read(maker):
+    async with maker() as db:
+        db.add(UserNotificationState(user_id=1, broadcast_read_upto=2))
+        db.add(BroadcastReceipt(user_id=1, broadcast_id=4, is_read=True))
+        await db.commit()
+
+    read = await call(maker, user_notifications.mark_notification_read, 3)
+    assert read.is_read and read.source == "broadcast"
+
+    items, _ = await list_page(maker)
+    broadcasts = {n.id: n.is_read for n in items if n.source == "broadcast"}
+    # 2 由水位覆盖，3 由接口写入的回执，4 由已有回执，5 未读
+    assert broadcasts == {2: True, 3: True, 4: True, 5: False}
+
+
+async def test_dismissed_broadcast_is_hidden(maker):
+    result = await call(maker, user_notifications.delete_notification, 4)
+    assert result["message"] == "Notification deleted"
+
+    items, _ = await list_page(maker)
+    assert ("broadcast", 4) not in [(n.source, n.id) for n in items]
+    for endpoint in (user_notifications.delete_notification, user_notifications.mark_notification_read):
+        with pytest.raises(HTTPException) as exc:
+            await call(maker, endpoint, 4)
+        assert exc.value.status_code == 404
+
+
+async def test_only_broadcasts_after_registration_are_visible(maker):
+    items, _ = await list_page(maker, user_id=2)
+    assert [(n.source, n.id) for n in items] == [("broadcast", 5)]
+
+    for user_id, broadcast_id in ((1, 1), (2, 4)):
+        with pytest.raises(HTTPException) as exc:
+            await call(maker, user_notifications.mark_notification_read, broadcast_id, user_id=user_id)
+        assert exc.value.status_code == 404
@@ -0,0 +1,264 @@
+"""
+WebSocket 跨进程推送总线（backplane）测试
+使用进程内的 RESP pub/sub 替身服务模拟 Redis，无需启动后端或 Redis。
+"""
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.backplane import InProcessBackplane, RedisBackplane, create_backplane, _read_reply
+from app.api.ws import ConnectionManager
+from app.api.unread_counts import UnreadCounter
+
+
+class FakeRedis:
+    """最小 RESP pub/sub 替身：支持 SUBSCRIBE / PUBLISH / PING。"""
+
+    def __init__(self):
+        self.subscribers: dict[str, set[asyncio.StreamWriter]] = {}
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                command = await _read_reply(reader)
+                name = command[0].decode().upper()
+                args = [a.decode() for a in command[1:]]
+                if name == "SUBSCRIBE":
+                    for i, channel in enumerate(args, 1):
+                        self.subscribers.setdefault(channel, set()).add(writer)
+                        writer.write(self._array(b"subscribe", channel.encode(), i))
+                elif name == "PUBLISH":
+                    receivers = self.subscribers.get(args[0], set())
+                    for sub in receivers:
+                        sub.write(self._array(b"message", args[0].encode(), args[1].encode()))
+                    writer.write(b":%d\r\n" % len(receivers))
+                elif name == "PING":
+                    writer.write(b"+PONG\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for subs in self.subscribers.values():
+                subs.discard(writer)
+
+    @staticmethod
+    def _array(*items) -> bytes:
+        out = [b"*%d\r\n" % len(items)]
+        for item in items:
+            if isinstance(item, int):
+                out.append(b":%d\r\n" % item)
+            else:
+                out.append(b"$%d\r\n%s\r\n" % (len(item), item))
+        return b"".join(out)
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent: list[str] = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        pass
+
+
+class SlowWebSocket(FakeWebSocket):
+    """send_text 阻塞到 release 被设置为止，模拟不读取消息的慢客户端。"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+        self.closed_with = None
+
+    async def send_text(self, text: str):
+        await self.release.wait()
+        await super().send_text(text)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.closed_with = (code, reason)
+
+
+@pytest.fixture
+def small_queue(monkeypatch):
+    monkeypatch.setattr(settings, "WS_SEND_QUEUE_SIZE", 2)
+
+
+@pytest.fixture
+async def fake_redis():
+    server = FakeRedis()
+    port = await server.start()
+    yield port
+    await server.stop()
+
+
+def test_create_backplane_from_url():
+    assert isinstance(create_backplane(""), InProcessBackplane)
+    assert isinstance(create_backplane("redis://localhost:6379/0"), RedisBackplane)
+    with pytest.raises(ValueError):
+        create_backplane("kafka://localhost")
+
+
+async def test_in_process_backplane_delivers_locally():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+    await manager.connect(7, ws)
+
+    await manager.send_to_user(7, {"type": "new_notification"})
+    await manager.send_to_user(8, {"type": "new_notification"})
+    await asyncio.sleep(0.05)
+
+    assert ws.sent == ['{"type":"new_notification"}']
+
+
+async def test_redis_backplane_fans_out_across_workers(fake_redis):
+    # 两个“worker”，各自持有一个用户的连接
+    worker_a = ConnectionManager(RedisBackplane(f"redis://127.0.0.1:{fake_redis}"))
+    worker_b = ConnectionManager(RedisBackplane(f"redis://127.0.0.1:{fake_redis}"))
+    await worker_a.backplane.start()
+    await worker_b.backplane.start()
+    try:
+        ws_a, ws_b = FakeWebSocket(), FakeWebSocket()
+        await worker_a.connect(1, ws_a)
+        await worker_b.connect(2, ws_b)
+
+        # worker A 发给只连接在 worker B 上的用户
+        await worker_a.send_to_user(2, {"type": "new_notification", "data": {"title": "跨进程"}})
+        # 广播到达两个 worker
+        await worker_b.broadcast({"type": "ping"})
+        await asyncio.sleep(0.1)
+
+        assert ws_a.sent == ['{"type":"ping"}']
+        assert ws_b.sent == [
+            '{"type":"new_notification","data":{"title":"跨进程"}}',
+            '{"type":"ping"}',
+        ]
+    finally:
+        await worker_a.backplane.stop()
+        await worker_b.backplane.stop()
+
+
+async def test_same_user_multiple_devices():
+    manager = ConnectionManager()
+    phone, laptop = FakeWebSocket(), FakeWebSocket()
+    conn_phone = await manager.connect(3, phone)
+    await manager.connect(3, laptop)
+    assert manager.connection_count == 2
+
+    await manager.send_to_user(3, {"type": "new_notification"})
+    await asyncio.sleep(0.05)
+    assert phone.sent == laptop.sent == ['{"type":"new_notification"}']
+
+    # 一台设备断开不影响另一台
+    manager.disconnect(conn_phone)
+    manager.disconnect(conn_phone)
+    await manager.broadcast({"type": "ping"})
+    await asyncio.sleep(0.05)
+    assert phone.sent == ['{"type":"new_notification"}']
+    assert laptop.sent[-1] == '{"type":"ping"}'
+    assert manager.connection_count == 1
+
+
+def test_slow_consumer_policy_is_validated():
+    with pytest.raises(ValueError):
+        type(settings)(WS_SLOW_CONSUMER_POLICY="block")
+
+
+async def test_slow_consumer_drops_oldest(small_queue, monkeypatch):
+    monkeypatch.setattr(settings, "WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+    manager = ConnectionManager()
+    ws = SlowWebSocket()
+    connection = await manager.connect(1, ws)
+    connection.enqueue("m0")
+    # writer 取走 m0 后阻塞在发送上
+    await asyncio.sleep(0.01)
+
+    assert all(connection.enqueue(f"m{i}") for i in range(1, 5))
+    # 队列有界，只保留最新的两条
+    assert connection.queue.qsize() == 2
+    assert connection.dropped == 2
+
+    ws.release.set()
+    await asyncio.sleep(0.05)
+    assert ws.sent == ["m0", "m3", "m4"]
+    assert manager.user_connections(1) == [connection]
+
+
+async def test_slow_consumer_closed(small_queue, monkeypatch):
+    monkeypatch.setattr(settings, "WS_SLOW_CONSUMER_POLICY", "close")
+    manager = ConnectionManager()
+    slow, fast = SlowWebSocket(), FakeWebSocket()
+    connection = await manager.connect(1, slow)
+    await manager.connect(2, fast)
+
+    # 第一条在发送中，两条排队，第四条溢出
+    for i in range(4):
+        await manager.broadcast({"n": i})
+        await asyncio.sleep(0.01)
+
+    assert slow.closed_with == (1013, "slow_consumer")
+    assert manager.user_connections(1) == []
+    assert not connection.enqueue("late")
+    # 慢客户端不影响其他连接
+    assert fast.sent == [f'{{"n":{i}}}' for i in range(4)]
+
+
+async def test_heartbeat_wheel_pings_idle_and_reaps_dead():
+    manager = ConnectionManager()
+    wheel = manager.heartbeat
+    idle_ws, dead_ws = FakeWebSocket(), FakeWebSocket()
+    idle = await manager.connect(4, idle_ws)
+    dead = await manager.connect(5, dead_ws)
+
+    now = idle.last_seen + wheel.timeout / 2
+    dead.last_seen = now - wheel.timeout - 1
+    # 转满一圈，每个连接恰好被检查一次
+    for _ in range(len(wheel.slots)):
+        wheel.tick(now)
+    await asyncio.sleep(0.05)
+
+    assert idle_ws.sent == ["ping"]
+    assert dead_ws.sent == []
+    assert manager.user_connections(4) == [idle]
+    assert manager.user_connections(5) == []
+    assert wheel.reaped == 1
+
+
+async def test_unread_counter_syncs_across_workers(fake_redis):
+    worker_a = ConnectionManager(RedisBackplane(f"redis://127.0.0.1:{fake_redis}"))
+    worker_b = ConnectionManager(RedisBackplane(f"redis://127.0.0.1:{fake_redis}"))
+    counter_a, counter_b = UnreadCounter(ttl=60), UnreadCounter(ttl=60)
+    counter_a.attach(worker_a)
+    counter_b.attach(worker_b)
+    await worker_a.backplane.start()
+    await worker_b.backplane.start()
+    try:
+        counter_a._store(1, 3)
+        counter_b._store(1, 3)
+        counter_b._store(2, 0)
+
+        # 缓存命中时按增量更新，不访问数据库
+        assert await counter_a.apply(None, 1, -1) == 2
+        await counter_a.broadcast_published()
+        await asyncio.sleep(0.1)
+
+        # 其他 worker：单用户变更使缓存失效，广播使其余条目 +1
+        assert 1 not in counter_b._entries
+        assert await counter_b.get(None, 2) == 1
+        assert await counter_a.get(None, 1) == 3
+    finally:
+        await worker_a.backplane.stop()
+        await worker_b.backplane.stop()
@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { userNotificationsService, UserNotification } from '../services/userNotifications.service';
+import { userNotificationsService, UserNotification, NotificationSource } from '../services/userNotifications.service';
 import { useAuth } from '../contexts/AuthContext';
 import { useWebSocketContext } from '../contexts/WebSocketContext';
 
@@ -38,11 +38,10 @@ export const NotificationBell: React.FC = () => {
     setUnreadCount(wsUnreadCount);
   }, [wsUnreadCount]);
 
-  // 收到新通知时 prepend 到列表 + 直接递增本地未读数
+  // 收到新通知时 prepend 到列表（未读数由 WebSocket 推送同步）
   useEffect(() => {
     if (lastNotification?.type === 'new_notification') {
       const data = lastNotification.data;
-      setUnreadCount(prev => prev + 1);
       setNotifications(prev => [
         {
           id: Date.now(),
@@ -93,14 +92,14 @@ export const NotificationBell: React.FC = () => {
     }
   };
 
-  const handleMarkAsRead = async (id: number, linkUrl: string | null) => {
+  const handleMarkAsRead = async (id: number, source: NotificationSource | undefined, linkUrl: string | null) => {
     try {
-      await userNotificationsService.markAsRead(id);
+      const updated = await userNotificationsService.markAsRead(id, source);
       // Update local state
       setNotifications(prev =>
-        prev.map(n => n.id === id ? { ...n, is_read: true } : n)
+        prev.map(n => n.id === id && n.source === source ? { ...n, is_read: true } : n)
       );
-      setUnreadCount(prev => Math.max(0, prev - 1));
+      setUnreadCount(prev => updated.unread_count ?? Math.max(0, prev - 1));
 
       // Navigate if there's a link
       if (linkUrl) {
@@ -114,11 +113,11 @@ export const NotificationBell: React.FC = () => {
 
   const handleMarkAllAsRead = async () => {
     try {
-      await userNotificationsService.markAllAsRead();
+      const result = await userNotificationsService.markAllAsRead();
       setNotifications(prev =>
         prev.map(n => ({ ...n, is_read: true }))
       );
-      setUnreadCount(0);
+      setUnreadCount(result.unread_count);
     } catch (error) {
       console.error('Failed to mark all as read:', error);
     }
@@ -222,8 +221,8 @@ export const NotificationBell: React.FC = () => {
               <div className="divide-y divide-slate-100">
                 {notifications.map((notification) => (
                   <div
-                    key={notification.id}
-                    onClick={() => handleMarkAsRead(notification.id, notification.link_url)}
+                    key={`${notification.source ?? 'personal'}-${notification.id}`}
+                    onClick={() => handleMarkAsRead(notification.id, notification.source, notification.link_url)}
                     className={`flex gap-3 p-4 cursor-pointer transition-colors ${
                       !notification.is_read ? 'bg-blue-50/30' : 'hover:bg-slate-50'
                     }`}
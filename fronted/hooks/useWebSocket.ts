@@ -66,13 +66,20 @@ export function useWebSocket({ user }: UseWebSocketOptions): UseWebSocketReturn
 
       ws.onmessage = (event) => {
         if (cancelled) return;
+        // server heartbeat: answer so the connection is kept alive
+        if (event.data === 'ping') {
+          ws.send('pong');
+          return;
+        }
         try {
           const msg: WSMessage = JSON.parse(event.data);
 
-          if (msg.type === 'connection_established') {
+          if (msg.type === 'connection_established' || msg.type === 'unread_count') {
             setUnreadCount((msg.data.unread_count as number) || 0);
           } else if (msg.type === 'new_notification') {
-            setUnreadCount((prev) => prev + 1);
+            // personal pushes carry the new count; shared broadcasts do not
+            const count = msg.data.unread_count;
+            setUnreadCount((prev) => (typeof count === 'number' ? count : prev + 1));
             setLastMessage(msg);
           }
         } catch {
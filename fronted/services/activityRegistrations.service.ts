@@ -29,11 +29,11 @@ export interface RegistrationListResponse {
 }
 
 const activityRegistrationsService = {
-  // Export registrations to Excel
-  exportRegistrations: async (activityId: number, params?: { status_filter?: string }) => {
+  // Export registrations to Excel or CSV
+  exportRegistrations: async (activityId: number, params?: { status_filter?: string; format?: 'xlsx' | 'csv' }) => {
     const queryString = params ? new URLSearchParams(params as any).toString() : '';
     const url = `/api/activities/${activityId}/registrations/export${queryString ? `?${queryString}` : ''}`;
-    await apiClient.download(url, `报名名单_${activityId}.xlsx`);
+    await apiClient.download(url, `报名名单_${activityId}.${params?.format || 'xlsx'}`);
   },
 
   // Register for an activity
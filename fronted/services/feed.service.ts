@@ -17,12 +17,23 @@ export interface FeedResponse {
   total: number;
 }
 
+export interface FeedPageResponse extends FeedResponse {
+  next_cursor: string | null;
+}
+
 class FeedService {
   private baseUrl = '/api/feed';
 
   async getLatest(limit: number = 10): Promise<FeedResponse> {
     return apiClient.get(`${this.baseUrl}/latest?limit=${limit}`);
   }
+
+  // 无限滚动：第一页不传 cursor，之后传上一页的 next_cursor
+  async getPage(cursor?: string | null, limit: number = 20): Promise<FeedPageResponse> {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) params.set('cursor', cursor);
+    return apiClient.get(`${this.baseUrl}?${params.toString()}`);
+  }
 }
 
 export default new FeedService();
@@ -14,8 +14,12 @@ export interface UserNotification {
   is_read: boolean;
   created_at: string;
   related_id: number | null;
+  source?: NotificationSource;
+  unread_count?: number | null;
 }
 
+export type NotificationSource = 'personal' | 'broadcast';
+
 export const userNotificationsService = {
   /**
    * Get current user's notifications
@@ -44,21 +48,22 @@ export const userNotificationsService = {
   /**
    * Mark notification as read
    */
-  async markAsRead(id: number): Promise<UserNotification> {
-    return apiClient.patch<UserNotification>(`/api/notifications/me/${id}/read`, {});
+  async markAsRead(id: number, source: NotificationSource = 'personal'): Promise<UserNotification> {
+    return apiClient.patch<UserNotification>(`/api/notifications/me/${id}/read?source=${source}`, {});
   },
 
   /**
-   * Mark all notifications as read
+   * Mark all notifications as read (optionally only those created at or before `upTo`)
    */
-  async markAllAsRead(): Promise<{ message: string }> {
-    return apiClient.post<{ message: string }>('/api/notifications/me/read-all', {});
+  async markAllAsRead(upTo?: string): Promise<{ message: string; unread_count: number }> {
+    const query = upTo ? `?up_to=${encodeURIComponent(upTo)}` : '';
+    return apiClient.post<{ message: string; unread_count: number }>(`/api/notifications/me/read-all${query}`, {});
   },
 
   /**
    * Delete notification
    */
-  async delete(id: number): Promise<void> {
-    return apiClient.delete(`/api/notifications/me/${id}`);
+  async delete(id: number, source: NotificationSource = 'personal'): Promise<void> {
+    return apiClient.delete(`/api/notifications/me/${id}?source=${source}`);
   },
 };
@@ -110,13 +110,13 @@ export const usersService = {
   },
 
   /**
-   * Export users to Excel (admin only)
+   * Export users to Excel or CSV (admin only)
    */
-  async exportUsers(): Promise<void> {
+  async exportUsers(format: 'xlsx' | 'csv' = 'xlsx'): Promise<void> {
     const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
     const token = localStorage.getItem('auth_token');
 
-    const response = await fetch(`${API_BASE_URL}/api/users/export`, {
+    const response = await fetch(`${API_BASE_URL}/api/users/export?format=${format}`, {
       method: 'GET',
       headers: {
         'Authorization': `Bearer ${token}`,
@@ -135,7 +135,7 @@ export const usersService = {
     const url = URL.createObjectURL(blob);
     const a = document.createElement('a');
     a.href = url;
-    a.download = response.headers.get('Content-Disposition')?.split('filename=')[1] || 'users_export.xlsx';
+    a.download = response.headers.get('Content-Disposition')?.split('filename=')[1]?.replace(/"/g, '') || `users_export.${format}`;
     a.click();
     URL.revokeObjectURL(url);
   },